@@ -95,6 +95,20 @@ class ClearMemoryResponse(BaseModel):
         }
 
 
+class MemoryStatusResponse(BaseModel):
+    """Response model for long-term memory status."""
+    active_memories: int = Field(..., description="Number of active long-term memories")
+    ready: bool = Field(..., description="Whether at least min_count memories are stored")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "active_memories": 3,
+                "ready": True
+            }
+        }
+
+
 class ConversationInfo(BaseModel):
     """Information about a conversation."""
     id: UUID
@@ -1,6 +1,7 @@
 """FastAPI route handlers."""
 
 import json
+from json.encoder import encode_basestring_ascii
 import logging
 from typing import AsyncIterator, Optional
 from fastapi import APIRouter, Depends, HTTPException, Request, Query
@@ -10,7 +11,7 @@ from uuid import UUID
 from app.api.models import (
     ChatRequest, ChatResponse,
     ResetConversationRequest, ResetConversationResponse,
-    ClearMemoryRequest, ClearMemoryResponse,
+    ClearMemoryRequest, ClearMemoryResponse, MemoryStatusResponse,
     ListConversationsResponse, ConversationInfo,
     UserPreferencesRequest, UserPreferencesResponse,
     EmotionHistoryResponse, EmotionStatistics, EmotionTrendsResponse,
@@ -51,6 +52,30 @@ logger = logging.getLogger(__name__)
 # Create router
 router = APIRouter()
 
+# Key order of the streamed token events built by ChatService.stream_chat
+_CHUNK_EVENT_KEYS = ("type", "chunk", "conversation_id")
+
+
+def _sse_frame(event: dict) -> str:
+    """
+    Serialize one stream event as an SSE `data:` frame.
+    
+    Token events (the bulk of a stream) are assembled around the two
+    JSON-escaped strings instead of running json.dumps over the whole
+    dict; the output is byte-for-byte what json.dumps(event) gives.
+    """
+    if (
+        event.get("type") == "chunk"
+        and tuple(event) == _CHUNK_EVENT_KEYS
+        and isinstance(event["chunk"], str)
+        and isinstance(event["conversation_id"], str)
+    ):
+        return (
+            f'data: {{"type": "chunk", "chunk": {encode_basestring_ascii(event["chunk"])}, '
+            f'"conversation_id": {encode_basestring_ascii(event["conversation_id"])}}}\n\n'
+        )
+    return f"data: {json.dumps(event)}\n\n"
+
 
 @router.post("/chat")
 @limiter.limit(f"{settings.rate_limit_requests_per_minute}/minute")
@@ -93,8 +118,7 @@ async def chat_endpoint(
             ):
                 # Event is already a dictionary with type, data, etc.
                 # Send as SSE
-                data = json.dumps(event)
-                yield f"data: {data}\n\n"
+                yield _sse_frame(event)
             
         except Exception as e:
             logger.error(f"Error in chat stream: {e}", exc_info=True)
@@ -178,6 +202,43 @@ async def clear_memory_endpoint(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/memory/status", response_model=MemoryStatusResponse)
+async def memory_status_endpoint(
+    min_count: int = Query(1, ge=1, description="Memories needed to report ready"),
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Count the authenticated user's active long-term memories.
+    
+    Lets clients poll for background memory extraction instead of
+    sleeping a fixed time.
+    """
+    from app.models.database import MemoryModel
+    from app.core.auth import get_user_db_id
+    from sqlalchemy import func, select
+    
+    try:
+        user_db_id = await get_user_db_id(db, user_id)
+        
+        active_memories = 0
+        if user_db_id:
+            result = await db.execute(
+                select(func.count()).select_from(MemoryModel)
+                .where(MemoryModel.user_id == user_db_id)
+                .where(MemoryModel.is_active == True)
+            )
+            active_memories = result.scalar()
+        
+        return MemoryStatusResponse(
+            active_memories=active_memories,
+            ready=active_memories >= min_count
+        )
+    except Exception as e:
+        logger.error(f"Error getting memory status: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """
@@ -38,6 +38,12 @@ class Settings(BaseSettings):
     # Embedding Configuration
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
     embedding_dimension: int = 384
+    embedding_num_threads: int = 0  # 0 = auto: min(8, CPU count); encode slows down above ~8 threads
+    embedding_coalesce_window_ms: float = 5.0  # Wait this long to batch concurrent single-text embeddings
+    embedding_device: str = "auto"  # "auto" (cuda if available), "cpu", "cuda", "cuda:1", ...
+    embedding_batch_size: int = 32  # Texts per forward pass in batch_generate_embeddings
+    embedding_cache_size: int = 10000  # In-process LRU of text -> embedding (0 disables)
+    embedding_cache_ttl: int = 3600  # Seconds embeddings stay in the shared Redis cache (when Redis is enabled)
     
     # Memory Configuration
     short_term_memory_size: int = 10
@@ -70,6 +76,7 @@ class Settings(BaseSettings):
     content_llm_judge_enabled: bool = True  # Enable LLM judge for borderline classifications
     content_llm_judge_threshold: float = 0.7  # Use LLM if pattern confidence below this
     content_llm_judge_provider: str = "openai"  # LLM provider for judge ("openai" or "local")
+    content_llm_judge_cache_size: int = 8192  # In-process LRU of normalized text -> judge result (0 disables)
     
     # System Configuration
 
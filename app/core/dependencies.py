@@ -18,11 +18,13 @@ from app.services.user_preference_service import UserPreferenceService
 from app.services.emotion_service import EmotionService
 from app.services.personality_service import PersonalityService
 from app.services.personality_cache import PersonalityCache
+from app.services.preference_cache import PreferenceCache
 from app.models.database import UserModel
 
 
 # Singletons
 _personality_cache: Optional[PersonalityCache] = None
+_preference_cache: Optional[PreferenceCache] = None
 
 def get_embedding_generator_dep() -> EmbeddingGenerator:
     """Get embedding generator dependency."""
@@ -52,6 +54,14 @@ def get_personality_cache_dep() -> Optional[PersonalityCache]:
     return _personality_cache
 
 
+def get_preference_cache_dep() -> Optional[PreferenceCache]:
+    """Get preference cache dependency (Redis-based singleton)."""
+    global _preference_cache
+    if _preference_cache is None and settings.redis_enabled and settings.redis_url:
+        _preference_cache = PreferenceCache(redis_url=settings.redis_url)
+    return _preference_cache
+
+
 # Database-dependent services
 def get_vector_store(
     db: AsyncSession = Depends(get_db),
@@ -76,10 +86,11 @@ def get_long_term_memory(
 
 def get_preference_service(
     db: AsyncSession = Depends(get_db),
-    llm_client: LLMClient = Depends(get_llm_client_dep)
+    llm_client: LLMClient = Depends(get_llm_client_dep),
+    cache: Optional[PreferenceCache] = Depends(get_preference_cache_dep)
 ) -> UserPreferenceService:
-    """Get user preference service dependency."""
-    return UserPreferenceService(db, llm_client=llm_client)
+    """Get user preference service dependency with Redis caching."""
+    return UserPreferenceService(db, llm_client=llm_client, cache=cache)
 
 
 def get_emotion_service(
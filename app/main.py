@@ -70,6 +70,7 @@ async def lifespan(app: FastAPI):
                 await asyncio.wait_for(job_task, timeout=10)
             except asyncio.TimeoutError:
                 job_task.cancel()
+        await get_embedding_generator().close()
         await close_db()
         logger.info("Database connections closed")
     except Exception as e:
@@ -177,6 +178,7 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=8000,
+        loop="uvloop",
         reload=False,
         log_level=settings.log_level.lower()
     )
@@ -2,22 +2,62 @@
 
 from datetime import datetime
 from sqlalchemy import (
-    Column, String, Integer, Float, Boolean, DateTime, Text, Enum as SQLEnum,
-    ForeignKey, Index, func
+    DDL, Column, String, Integer, Float, Boolean, DateTime, Text, Enum as SQLEnum,
+    ForeignKey, Index, CheckConstraint, UniqueConstraint, LargeBinary, Computed, FetchedValue, TypeDecorator, event, func, text
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB, ENUM as PG_ENUM
 from sqlalchemy.ext.asyncio import AsyncAttrs
-from sqlalchemy.orm import DeclarativeBase, relationship
-from pgvector.sqlalchemy import Vector
+from sqlalchemy.orm import DeclarativeBase, relationship, deferred
+from pgvector.sqlalchemy import BIT, HALFVEC
+import numpy as np
+import os
+import time
 import uuid
 import enum
 
 
+def uuid7() -> uuid.UUID:
+    """
+    Generate a time-ordered UUIDv7 (RFC 9562).
+    
+    48-bit Unix millisecond timestamp followed by 74 random bits, so new
+    keys land on the rightmost btree page instead of a random one.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value &= ~(0xF << 76) & ~(0x3 << 62)
+    value |= 0x7 << 76 | 0x2 << 62  # version 7, RFC 4122 variant
+    return uuid.UUID(int=value)
+
+
 class Base(AsyncAttrs, DeclarativeBase):
     """Base class for all database models."""
     pass
 
 
+class HalfVector(TypeDecorator):
+    """
+    pgvector halfvec column (fp16 storage) that reads back as float32 ndarrays.
+    
+    Every bound value (stored embeddings and query vectors alike) is
+    L2-normalized, so inner product (<#>) equals cosine similarity and the
+    indexes can skip per-probe normalization.
+    """
+    impl = HALFVEC
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        vector = np.asarray(value, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return value.to_numpy().astype(np.float32)
+
+
 class MemoryTypeEnum(str, enum.Enum):
     """Memory type enumeration - values match database enum."""
     FACT = "fact"
@@ -62,7 +102,7 @@ class ConversationModel(Base):
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
-    personality_id = Column(UUID(as_uuid=True), ForeignKey("personality_profiles.id", ondelete="CASCADE"), nullable=True, index=True)  # Link to personality
+    personality_id = Column(UUID(as_uuid=True), ForeignKey("personality_profiles.id", ondelete="CASCADE"), nullable=True)  # Link to personality
     title = Column(String(255), nullable=True)  # Optional conversation title
     created_at = Column(DateTime, nullable=False, default=func.now())
     updated_at = Column(DateTime, nullable=False, default=func.now(), onupdate=func.now())
@@ -76,8 +116,9 @@ class ConversationModel(Base):
     
     __table_args__ = (
         Index("ix_conversations_user_id", "user_id"),
-        Index("ix_conversations_personality_id", "personality_id"),
-        Index("ix_conversations_user_personality", "user_id", "personality_id"),
+        # personality-leading: serves user+personality lookups and the
+        # personality_id-only FK cascade on profile deletion
+        Index("ix_conversations_personality_user", "personality_id", "user_id"),
         Index("ix_conversations_updated_at", "updated_at"),
     )
 
@@ -89,9 +130,18 @@ class MemoryModel(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     conversation_id = Column(UUID(as_uuid=True), ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
-    personality_id = Column(UUID(as_uuid=True), ForeignKey("personality_profiles.id", ondelete="CASCADE"), nullable=True, index=True)  # Link to personality
+    personality_id = Column(UUID(as_uuid=True), ForeignKey("personality_profiles.id", ondelete="CASCADE"), nullable=True)  # Link to personality
     content = Column(Text, nullable=False)
-    embedding = Column(Vector(384), nullable=False)  # 384-dimensional vector for all-MiniLM-L6-v2
+    # md5 of lower(trim(content)), maintained by Postgres; used for exact-duplicate detection
+    content_hash = Column(LargeBinary, Computed("decode(md5(lower(trim(content))), 'hex')", persisted=True))
+    embedding = Column(HalfVector(384), nullable=False)  # 384-dimensional unit-norm halfvec for all-MiniLM-L6-v2
+    # Binary-quantized embedding for the coarse HNSW pass of similarity search (not loaded by default)
+    embedding_bits = deferred(Column(BIT(384), Computed("binary_quantize(embedding)::bit(384)", persisted=True)))
+    # Int8 scalar-quantized embedding (per-vector scale/offset, see app.utils.quantization),
+    # maintained by a Postgres trigger from the stored embedding; compact copy for application-side reranking
+    embedding_i8 = deferred(Column(LargeBinary, FetchedValue(), FetchedValue(for_update=True), nullable=True), group="embedding_i8")
+    embedding_scale = deferred(Column(Float, FetchedValue(), FetchedValue(for_update=True), nullable=True), group="embedding_i8")
+    embedding_offset = deferred(Column(Float, FetchedValue(), FetchedValue(for_update=True), nullable=True), group="embedding_i8")
     # Use PostgreSQL ENUM type (must match database enum type name 'memorytypeenum')
     memory_type = Column(
         PG_ENUM('fact', 'preference', 'event', 'context', name='memorytypeenum', create_type=False),
@@ -133,25 +183,107 @@ class MemoryModel(Base):
     __table_args__ = (
         Index("ix_memories_conversation_id", "conversation_id"),
         Index("ix_memories_user_id", "user_id"),
-        Index("ix_memories_personality_id", "personality_id"),
-        Index("ix_memories_user_personality", "user_id", "personality_id"),  # Fast queries by user+personality
+        Index("ix_memories_personality_user", "personality_id", "user_id"),  # User+personality queries and FK cascade
         Index("ix_memories_created_at", "created_at"),
         Index("ix_memories_importance", "importance"),
         Index("ix_memories_category", "category"),
         Index("ix_memories_is_active", "is_active"),
-        Index("ix_memories_is_shared", "is_shared"),
+        Index("ix_memories_user_shared", "user_id", postgresql_where=text("is_shared")),  # Shared memories are the rare case
         Index("ix_memories_last_accessed", "last_accessed"),
-        # Vector similarity index (cosine distance)
+        Index("ix_memories_user_content_hash", "user_id", "content_hash"),  # Exact-duplicate lookups
         Index(
-            "ix_memories_embedding_cosine",
+            "ix_memories_user_active_created",
+            "user_id", "is_active", text("created_at DESC"),
+            postgresql_include=["importance"]
+        ),  # Per-user active-memory listings/stats
+        Index(
+            "ix_memories_user_active_importance",
+            "user_id", text("importance DESC"),
+            postgresql_where=text("is_active")
+        ),  # Active memories by importance
+        Index(
+            "ix_memories_user_personality_active_importance",
+            "user_id", "personality_id", text("importance DESC"),
+            postgresql_where=text("is_active")
+        ),  # Per-personality recall by importance
+        # Embeddings are stored unit-norm, or zero (<#> returns the negated inner product)
+        CheckConstraint(
+            "(embedding <#> embedding) = 0 OR abs(1 + (embedding <#> embedding)) < 0.01",
+            name="ck_memories_embedding_unit_norm"
+        ),
+        # Vector similarity indexes (inner product on unit vectors / Hamming
+        # on quantized bits), over active memories only since every search
+        # filters on it
+        Index(
+            "ix_memories_embedding_ip",
             "embedding",
-            postgresql_using="ivfflat",
-            postgresql_with={"lists": 100},
-            postgresql_ops={"embedding": "vector_cosine_ops"}
+            postgresql_using="hnsw",
+            postgresql_with={"m": 24, "ef_construction": 128},
+            postgresql_ops={"embedding": "halfvec_ip_ops"},
+            postgresql_where=text("is_active")
+        ),
+        Index(
+            "ix_memories_embedding_bits",
+            "embedding_bits",
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding_bits": "bit_hamming_ops"},
+            postgresql_where=text("is_active")
         ),
     )
 
 
+# Int8 copy of the embedding, derived in Postgres on every insert/update of
+# `embedding` (migration 020 installs the same trigger); installed here too
+# so tables built with create_all behave like migrated ones
+event.listen(
+    MemoryModel.__table__,
+    "after_create",
+    DDL("""
+        CREATE OR REPLACE FUNCTION memories_quantize_embedding() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            lo real;
+            hi real;
+        BEGIN
+            IF NEW.embedding IS NULL THEN
+                NEW.embedding_i8 := NULL;
+                NEW.embedding_scale := NULL;
+                NEW.embedding_offset := NULL;
+                RETURN NEW;
+            END IF;
+            
+            SELECT min(x), max(x) INTO lo, hi FROM unnest(NEW.embedding::real[]) AS x;
+            
+            SELECT decode(string_agg(
+                       lpad(to_hex(
+                           CASE WHEN hi > lo
+                                THEN round((e.x - lo) / (hi - lo) * 255)::int
+                                ELSE 0
+                           END # 128
+                       ), 2, '0'),
+                       '' ORDER BY e.ord
+                   ), 'hex')
+            INTO NEW.embedding_i8
+            FROM unnest(NEW.embedding::real[]) WITH ORDINALITY AS e(x, ord);
+            
+            NEW.embedding_scale := (hi - lo) / 255;
+            NEW.embedding_offset := lo;
+            RETURN NEW;
+        END
+        $$
+    """).execute_if(dialect="postgresql")
+)
+event.listen(
+    MemoryModel.__table__,
+    "after_create",
+    DDL("""
+        CREATE TRIGGER trg_memories_quantize_embedding
+        BEFORE INSERT OR UPDATE OF embedding ON memories
+        FOR EACH ROW EXECUTE FUNCTION memories_quantize_embedding()
+    """).execute_if(dialect="postgresql")
+)
+
+
 class MessageModel(Base):
     """Message audit log for conversations."""
     __tablename__ = "messages"
@@ -176,7 +308,7 @@ class EmotionHistoryModel(Base):
     """Emotion detection history for user messages."""
     __tablename__ = "emotion_history"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     conversation_id = Column(UUID(as_uuid=True), ForeignKey("conversations.id", ondelete="CASCADE"), nullable=True)
     emotion = Column(String(50), nullable=False)  # sad, happy, angry, etc.
@@ -184,13 +316,25 @@ class EmotionHistoryModel(Base):
     intensity = Column(String(20), nullable=False)  # low, medium, high
     indicators = Column(JSONB, nullable=True)  # ['keyword', 'emoji', 'phrase']
     message_snippet = Column(Text, nullable=True)  # First 100 chars of message
-    detected_at = Column(DateTime, nullable=False, default=func.now())
+    detected_at = Column(DateTime, nullable=False, default=func.now(), server_default=func.now())
     
     # Indexes for querying
     __table_args__ = (
         Index("ix_emotion_history_user_id", "user_id"),
         Index("ix_emotion_history_detected_at", "detected_at"),
+        Index(
+            "ix_emotion_history_detected_at_brin", "detected_at",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32}
+        ),
         Index("ix_emotion_history_emotion", "emotion"),
+        # Containment lookups on detection indicators (indicators @> ...)
+        Index(
+            "ix_emotion_history_indicators_gin",
+            "indicators",
+            postgresql_using="gin",
+            postgresql_ops={"indicators": "jsonb_path_ops"}
+        ),
     )
 
 
@@ -229,8 +373,8 @@ class PersonalityProfileModel(Base):
     celebrates_wins = Column(Boolean, nullable=True, default=True)  # Should AI celebrate achievements?
     
     # Metadata
-    created_at = Column(DateTime, nullable=False, default=func.now())
-    updated_at = Column(DateTime, nullable=False, default=func.now(), onupdate=func.now())
+    created_at = Column(DateTime, nullable=False, default=func.now(), server_default=func.now())
+    updated_at = Column(DateTime, nullable=False, default=func.now(), server_default=func.now(), onupdate=func.now())
     version = Column(Integer, nullable=False, default=1)  # Track personality evolution
     
     # Relationships
@@ -240,7 +384,7 @@ class PersonalityProfileModel(Base):
     # Indexes
     __table_args__ = (
         Index("ix_personality_profiles_user_id", "user_id"),
-        Index("ix_personality_profiles_user_personality", "user_id", "personality_name", unique=True),  # Unique constraint per user
+        UniqueConstraint("user_id", "personality_name", name="uq_personality_profiles_user_personality"),  # One profile name per user
     )
 
 
@@ -258,8 +402,8 @@ class RelationshipStateModel(Base):
     trust_level = Column(Float, nullable=False, default=5.0)  # 0-10, based on user engagement
     
     # Timeline
-    first_interaction = Column(DateTime, nullable=False, default=func.now())
-    last_interaction = Column(DateTime, nullable=False, default=func.now())
+    first_interaction = Column(DateTime, nullable=False, default=func.now(), server_default=func.now())
+    last_interaction = Column(DateTime, nullable=False, default=func.now(), server_default=func.now())
     days_known = Column(Integer, nullable=False, default=0)  # Auto-calculated
     
     # Milestones (JSONB array)
@@ -270,13 +414,13 @@ class RelationshipStateModel(Base):
     negative_reactions = Column(Integer, nullable=False, default=0)  # Thumbs down count
     
     # Metadata
-    updated_at = Column(DateTime, nullable=False, default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime, nullable=False, default=func.now(), server_default=func.now(), onupdate=func.now())
     
     # Indexes
     __table_args__ = (
         Index("ix_relationship_state_user_id", "user_id"),
         Index("ix_relationship_state_personality_id", "personality_id"),
-        Index("ix_relationship_state_user_personality", "user_id", "personality_id", unique=True),  # One relationship per user-personality pair
+        UniqueConstraint("user_id", "personality_id", name="uq_relationship_state_user_personality"),  # One relationship per user-personality pair
     )
 
 
@@ -323,9 +467,8 @@ class GoalModel(Base):
     
     # Indexes
     __table_args__ = (
-        Index("ix_goals_user_id", "user_id"),
-        Index("ix_goals_status", "status"),
-        Index("ix_goals_category", "category"),
+        Index("ix_goals_user_status_category", "user_id", "status", "category"),
+        Index("ix_goals_user_last_mentioned", "user_id", text("last_mentioned_at DESC")),
         Index("ix_goals_target_date", "target_date"),
         Index("ix_goals_last_mentioned_at", "last_mentioned_at"),
     )
@@ -335,7 +478,7 @@ class GoalProgressModel(Base):
     """Tracks individual progress updates for goals."""
     __tablename__ = "goal_progress"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     goal_id = Column(UUID(as_uuid=True), ForeignKey("goals.id", ondelete="CASCADE"), nullable=False)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
@@ -361,8 +504,12 @@ class GoalProgressModel(Base):
     # Indexes
     __table_args__ = (
         Index("ix_goal_progress_goal_id", "goal_id"),
-        Index("ix_goal_progress_user_id", "user_id"),
-        Index("ix_goal_progress_created_at", "created_at"),
+        Index("ix_goal_progress_user_created", "user_id", text("created_at DESC")),
+        Index(
+            "ix_goal_progress_created_at_brin", "created_at",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32}
+        ),
         Index("ix_goal_progress_progress_type", "progress_type"),
     )
 
@@ -21,6 +21,7 @@ class Message:
     role: str  # "user" or "assistant"
     content: str
     timestamp: datetime
+    metadata: Optional[Dict[str, Any]] = None
 
 
 @dataclass
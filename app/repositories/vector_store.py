@@ -3,8 +3,9 @@
 from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
-from sqlalchemy import select, delete, and_, func
+from sqlalchemy import select, delete, and_, func, cast, literal, true, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 import logging
 
 from app.models.database import MemoryModel, ConversationModel
@@ -18,6 +19,14 @@ logger = logging.getLogger(__name__)
 class VectorStoreRepository:
     """Repository for managing memories with vector embeddings in PostgreSQL."""
     
+    # Binary-index candidates fetched per requested result before exact rerank
+    COARSE_OVERFETCH = 10
+    
+    # hnsw.ef_search bounds: a recall floor above pgvector's default of 40,
+    # and pgvector's maximum
+    MIN_EF_SEARCH = 100
+    MAX_EF_SEARCH = 1000
+    
     def __init__(self, session: AsyncSession, llm_client=None):
         """
         Initialize vector store repository.
@@ -187,40 +196,33 @@ class VectorStoreRepository:
             if not personality_id:
                 personality_id = conversation.personality_id
             
-            # Use pgvector cosine similarity operator (<=>)
-            # Note: <=> returns distance, so lower is better (0 = identical)
-            # Similarity = 1 - distance
-            # Search across personality's memories (or shared memories)
-            # Only return active memories (exclude superseded/consolidated ones)
-            query_builder = (
-                select(
-                    MemoryModel,
-                    (1 - MemoryModel.embedding.cosine_distance(query_embedding)).label('similarity')
-                )
-                .where(MemoryModel.user_id == conversation.user_id)
-                .where(MemoryModel.is_active == True)
-                .where((1 - MemoryModel.embedding.cosine_distance(query_embedding)) >= min_similarity)
-            )
+            coarse_limit = top_k * self.COARSE_OVERFETCH
+            await self._set_ef_search(coarse_limit)
             
-            # Filter by personality: either matches personality_id OR is marked as shared
-            if personality_id:
-                query_builder = query_builder.where(
-                    (MemoryModel.personality_id == personality_id) | (MemoryModel.is_shared == True)
-                )
-            else:
-                # If no personality_id, only get shared memories
-                query_builder = query_builder.where(MemoryModel.is_shared == True)
-            
-            # Add user ownership check if user_external_id provided
-            if user_external_id:
-                from app.models.database import UserModel
-                query_builder = query_builder.join(ConversationModel).join(UserModel).where(
-                    UserModel.external_user_id == user_external_id
+            # Coarse pass: Hamming distance on the binary-quantized embeddings
+            # (HNSW bit index), overfetching candidates. Only active memories
+            # of this user (excludes superseded/consolidated ones).
+            query_vector = cast(query_embedding, MemoryModel.embedding.type)
+            candidates = (
+                self._scope_memories(
+                    select(MemoryModel.id), conversation.user_id, personality_id, user_external_id
                 )
+                .order_by(MemoryModel.embedding_bits.hamming_distance(func.binary_quantize(query_vector)))
+                .limit(coarse_limit)
+                .cte('candidates')
+            )
             
-            query = query_builder.order_by(
-                (1 - MemoryModel.embedding.cosine_distance(query_embedding)).desc()
-            ).limit(top_k)
+            # Rerank the candidates exactly. Embeddings are unit-norm, so
+            # cosine similarity = inner product = -(embedding <#> query)
+            negative_ip = MemoryModel.embedding.max_inner_product(query_vector)
+            query = (
+                select(MemoryModel, (-negative_ip).label('similarity'))
+                .options(defer(MemoryModel.embedding))  # Not returned; keep it off the wire
+                .join(candidates, MemoryModel.id == candidates.c.id)
+                .where(-negative_ip >= min_similarity)
+                .order_by(negative_ip)
+                .limit(top_k)
+            )
             
             logger.info(f"Executing similarity search for user {conversation.user_id} with threshold {min_similarity}")
             logger.debug(f"Query embedding type: {type(query_embedding)}, length: {len(query_embedding) if hasattr(query_embedding, '__len__') else 'N/A'}")
@@ -238,22 +240,9 @@ class VectorStoreRepository:
             
             # Convert to domain Memory objects
             memories = []
-            for row in rows:
-                memory_model, similarity = row
+            for memory_model, similarity in rows:
                 logger.debug(f"Memory: '{memory_model.content[:50]}...' similarity={similarity:.3f}")
-                # memory_type is now a plain string from the database
-                memory = Memory(
-                    id=memory_model.id,
-                    conversation_id=memory_model.conversation_id,
-                    content=memory_model.content,
-                    embedding=None,  # Don't return embedding in results
-                    memory_type=MemoryType(memory_model.memory_type),  # String value like 'preference'
-                    importance=memory_model.importance,
-                    created_at=memory_model.created_at,
-                    metadata=memory_model.extra_metadata or {},
-                    similarity_score=float(similarity)
-                )
-                memories.append(memory)
+                memories.append(self._to_search_result(memory_model, similarity))
             
             logger.debug(f"Found {len(memories)} similar memories for conversation {conversation_id}")
             return memories
@@ -262,6 +251,185 @@ class VectorStoreRepository:
             logger.error(f"Error searching memories: {e}")
             raise MemoryRetrievalError(f"Failed to search memories: {e}")
     
+    async def search_similar_multi(
+        self,
+        conversation_id: UUID,
+        query_embeddings: List[List[float]],
+        top_k: int = 5,
+        min_similarity: float = None,
+        user_external_id: Optional[str] = None,
+        personality_id: Optional[UUID] = None
+    ) -> List[List[Memory]]:
+        """
+        Search similar memories for several query embeddings in one round-trip.
+        
+        The queries are joined LATERAL to a per-query nearest-neighbour scan on
+        the inner-product HNSW index, so all of them run in a single statement.
+        
+        Args:
+            conversation_id: Conversation identifier
+            query_embeddings: Query vector embeddings
+            top_k: Number of results to return per query
+            min_similarity: Minimum similarity threshold (0.0 to 1.0), defaults to config value
+            user_external_id: Optional user ID for additional security check
+            personality_id: Optional personality UUID to filter memories
+            
+        Returns:
+            One list of similar memories (best first) per query embedding, in order
+            
+        Raises:
+            MemoryRetrievalError: If search fails
+        """
+        if min_similarity is None:
+            min_similarity = settings.memory_similarity_threshold
+        
+        if not len(query_embeddings):
+            return []
+        
+        try:
+            result = await self.session.execute(
+                select(ConversationModel).where(ConversationModel.id == conversation_id)
+            )
+            conversation = result.scalar_one_or_none()
+            
+            if not conversation:
+                logger.warning(f"Conversation {conversation_id} not found for memory search")
+                return [[] for _ in query_embeddings]
+            
+            if not personality_id:
+                personality_id = conversation.personality_id
+            
+            await self._set_ef_search(top_k)
+            
+            result = await self.session.execute(
+                self._similar_multi_query(
+                    query_embeddings, top_k, min_similarity,
+                    conversation.user_id, personality_id, user_external_id
+                )
+            )
+            
+            results: List[List[Memory]] = [[] for _ in query_embeddings]
+            for idx, memory_model, similarity in result:
+                results[idx].append(self._to_search_result(memory_model, similarity))
+            
+            logger.debug(
+                "Multi-query search for conversation %s: %s results",
+                conversation_id, [len(r) for r in results]
+            )
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error searching memories: {e}")
+            raise MemoryRetrievalError(f"Failed to search memories: {e}")
+    
+    async def _set_ef_search(self, limit: int) -> None:
+        """
+        Size the HNSW candidate list for the current transaction (SET LOCAL).
+        
+        An HNSW index scan returns at most ef_search rows, so a search's
+        LIMIT must fit in it; scoped to the transaction, nothing leaks to
+        other users of the pooled connection.
+        """
+        ef_search = min(max(limit, self.MIN_EF_SEARCH), self.MAX_EF_SEARCH)
+        await self.session.execute(
+            select(func.set_config('hnsw.ef_search', str(ef_search), True))
+        )
+    
+    @classmethod
+    def _similar_multi_query(
+        cls,
+        query_embeddings: List[List[float]],
+        top_k: int,
+        min_similarity: float,
+        user_id: UUID,
+        personality_id: Optional[UUID],
+        user_external_id: Optional[str]
+    ):
+        """Build the (idx, MemoryModel, similarity) statement for search_similar_multi."""
+        # (idx, vec) rows, one per query
+        query_rows = [
+            select(
+                literal(idx).label('idx'),
+                cast(embedding, MemoryModel.embedding.type).label('vec')
+            )
+            for idx, embedding in enumerate(query_embeddings)
+        ]
+        queries = (union_all(*query_rows) if len(query_rows) > 1 else query_rows[0]).subquery('q')
+        
+        # Unit-norm embeddings: similarity = -(embedding <#> query). The
+        # lateral correlates to the queries only; memories is scanned inside
+        # it (the outer query joins memories again for the full rows)
+        negative_ip = MemoryModel.embedding.max_inner_product(queries.c.vec)
+        nearest = (
+            cls._scope_memories(
+                select(MemoryModel.id.label('memory_id'), (-negative_ip).label('similarity')),
+                user_id, personality_id, user_external_id
+            )
+            .order_by(negative_ip)
+            .limit(top_k)
+            .correlate(queries)
+            .lateral('nearest')
+        )
+        
+        return (
+            select(queries.c.idx, MemoryModel, nearest.c.similarity)
+            .select_from(queries)
+            .join(nearest, true())
+            .join(MemoryModel, MemoryModel.id == nearest.c.memory_id)
+            .options(defer(MemoryModel.embedding))
+            .where(nearest.c.similarity >= min_similarity)
+            .order_by(queries.c.idx, nearest.c.similarity.desc())
+        )
+    
+    @staticmethod
+    def _scope_memories(stmt, user_id: UUID, personality_id: Optional[UUID], user_external_id: Optional[str]):
+        """
+        Restrict a memory query to what a conversation may see.
+        
+        Active memories of the user (excludes superseded/consolidated ones),
+        of the personality or shared, optionally checked against the external
+        user ID.
+        """
+        stmt = (
+            stmt
+            .where(MemoryModel.user_id == user_id)
+            .where(MemoryModel.is_active == True)
+        )
+        
+        # Filter by personality: either matches personality_id OR is marked as shared
+        if personality_id:
+            stmt = stmt.where(
+                (MemoryModel.personality_id == personality_id) | (MemoryModel.is_shared == True)
+            )
+        else:
+            # If no personality_id, only get shared memories
+            stmt = stmt.where(MemoryModel.is_shared == True)
+        
+        # Add user ownership check if user_external_id provided
+        if user_external_id:
+            from app.models.database import UserModel
+            stmt = stmt.join(ConversationModel, MemoryModel.conversation_id == ConversationModel.id).join(UserModel).where(
+                UserModel.external_user_id == user_external_id
+            )
+        
+        return stmt
+    
+    @staticmethod
+    def _to_search_result(memory_model: MemoryModel, similarity: float) -> Memory:
+        """Convert a matched memory row to a domain Memory with its score."""
+        # memory_type is now a plain string from the database
+        return Memory(
+            id=memory_model.id,
+            conversation_id=memory_model.conversation_id,
+            content=memory_model.content,
+            embedding=None,  # Don't return embedding in results
+            memory_type=MemoryType(memory_model.memory_type),  # String value like 'preference'
+            importance=memory_model.importance,
+            created_at=memory_model.created_at,
+            metadata=memory_model.extra_metadata or {},
+            similarity_score=float(similarity)
+        )
+    
     async def clear_conversation_memories(self, conversation_id: UUID) -> int:
         """
         Delete all memories for a conversation.
@@ -333,12 +501,11 @@ class VectorStoreRepository:
             if new_memory.memory_type not in ['preference', 'fact']:
                 return
             
-            # Get recent similar memories from same user
+            # Get recent similar memories from same user (unit-norm embeddings:
+            # similarity = -(embedding <#> other))
+            negative_ip = MemoryModel.embedding.max_inner_product(new_memory.embedding)
             stmt = (
-                select(
-                    MemoryModel,
-                    (1 - MemoryModel.embedding.cosine_distance(new_memory.embedding)).label('similarity')
-                )
+                select(MemoryModel, (-negative_ip).label('similarity'))
                 .where(
                     and_(
                         MemoryModel.user_id == user_id,
@@ -347,10 +514,11 @@ class VectorStoreRepository:
                         MemoryModel.id != new_memory.id,
                         # Check memories with moderate similarity (catches contradictions)
                         # Lower threshold (0.4) to catch opposite sentiments about same topic
-                        (1 - MemoryModel.embedding.cosine_distance(new_memory.embedding)) >= 0.4
+                        -negative_ip >= 0.4
                     )
                 )
-                .order_by((1 - MemoryModel.embedding.cosine_distance(new_memory.embedding)).desc())
+                # Ascending <#> so the HNSW index can serve the ORDER BY
+                .order_by(negative_ip)
                 .limit(5)
             )
             
@@ -331,6 +331,11 @@ class ChatService:
                 """Load user preferences in parallel."""
                 if not (self.preference_service and user_id):
                     return None
+                
+                # Step 2 already got the full merged preferences back from
+                # its UPDATE ... RETURNING; don't read them again
+                if preferences_updated:
+                    return updated_prefs
                     
                 try:
                     return await self.preference_service.get_user_preferences(user_id)
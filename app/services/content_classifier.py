@@ -4,11 +4,16 @@ import re
 import logging
 import unicodedata
 import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
 from dataclasses import dataclass
 from enum import Enum
 import json
 
+from app.core.config import settings
+
 if TYPE_CHECKING:
     from app.services.llm_client import LLMClient
 
@@ -59,6 +64,18 @@ class ContentClassifier:
         '🛏️': 'bed', '🌶️': 'spicy', '🔞': 'adult',
     }
     
+    # Precompiled forms of the maps above, used by _normalize_text: one
+    # translate() pass for leetspeak and one regex scan for all emoji
+    # (longest first, so '❤️' wins over a bare '❤')
+    _LEETSPEAK_TABLE = str.maketrans(LEETSPEAK_MAP)
+    _EMOJI_RE = re.compile('|'.join(map(re.escape, sorted(EMOJI_MAP, key=len, reverse=True))))
+    _WHITESPACE_RE = re.compile(r'\s+')
+    _SPACED_LETTERS_RE = (
+        (re.compile(r'\b([a-z])\s+([a-z])\s+([a-z])\s+([a-z])\b'), r'\1\2\3\4'),  # 4 letters
+        (re.compile(r'\b([a-z])\s+([a-z])\s+([a-z])\b'), r'\1\2\3'),  # 3 letters
+        (re.compile(r'\b([a-z])\s+([a-z])\b'), r'\1\2'),  # 2 letters
+    )
+    
     # Layer 2: Fast rules - IMMEDIATE escalation
     AGE_INDICATORS = [
         r'\b(teens?|teenagers?|underage|minors?|children|child|kids?|young|youth)\b',
@@ -149,6 +166,30 @@ class ContentClassifier:
         r'\b(education|educational|textbook|academic)\b',
     ]
     
+    # The pattern lists above, compiled once (case-insensitive) for the
+    # per-message layer checks
+    _AGE_INDICATORS_RE = [re.compile(pattern, re.IGNORECASE) for pattern in AGE_INDICATORS]
+    _COERCION_INDICATORS_RE = [re.compile(pattern, re.IGNORECASE) for pattern in COERCION_INDICATORS]
+    _EXPLICIT_ANATOMY_RE = [re.compile(pattern, re.IGNORECASE) for pattern in EXPLICIT_ANATOMY]
+    _SEXUAL_ACTS_RE = [re.compile(pattern, re.IGNORECASE) for pattern in SEXUAL_ACTS]
+    _FETISH_INDICATORS_RE = [re.compile(pattern, re.IGNORECASE) for pattern in FETISH_INDICATORS]
+    _SUGGESTIVE_CONTENT_RE = [re.compile(pattern, re.IGNORECASE) for pattern in SUGGESTIVE_CONTENT]
+    _RELATIONSHIP_ROLE_REQUESTS_RE = [re.compile(pattern, re.IGNORECASE) for pattern in RELATIONSHIP_ROLE_REQUESTS]
+    _STRONG_ROMANCE_PHRASES_RE = [re.compile(pattern, re.IGNORECASE) for pattern in STRONG_ROMANCE_PHRASES]
+    _EXPLICIT_REQUESTS_RE = [re.compile(pattern, re.IGNORECASE) for pattern in EXPLICIT_REQUESTS]
+    _CLINICAL_CONTEXT_RE = [re.compile(pattern, re.IGNORECASE) for pattern in CLINICAL_CONTEXT]
+    
+    # Every layer 2-3 pattern as one alternation: a single scan tells
+    # whether any rule can match at all (most messages match none)
+    _ANY_RULE_RE = re.compile(
+        '|'.join(f'(?:{pattern})' for pattern in (
+            AGE_INDICATORS + COERCION_INDICATORS + CLINICAL_CONTEXT +
+            EXPLICIT_ANATOMY + SEXUAL_ACTS + FETISH_INDICATORS + SUGGESTIVE_CONTENT +
+            RELATIONSHIP_ROLE_REQUESTS + STRONG_ROMANCE_PHRASES + EXPLICIT_REQUESTS
+        )),
+        re.IGNORECASE
+    )
+    
     # Layer 4: LLM Judge Configuration
     LLM_CONFIDENCE_THRESHOLD = 0.7  # Use LLM if pattern confidence below this
     
@@ -186,7 +227,9 @@ Respond with JSON only, no other text:
         """
         self.llm_client = llm_client
         self.enable_llm_judge = enable_llm_judge and llm_client is not None
-        self.llm_cache = {}  # Cache LLM results
+        # LRU of LLM results keyed by a digest of the normalized text
+        self.llm_cache: "OrderedDict[bytes, Dict]" = OrderedDict()
+        self._llm_cache_lock = threading.Lock()  # judges may run on a worker thread
         
         if self.enable_llm_judge:
             logger.info("ContentClassifier initialized with 4-layer detection (LLM judge enabled)")
@@ -203,6 +246,85 @@ Respond with JSON only, no other text:
         Returns:
             ClassificationResult with label, confidence, and details
         """
+        return self.classify_batch([text])[0]
+    
+    def classify_batch(self, texts: List[str]) -> List[ClassificationResult]:
+        """
+        Classify many messages at once (e.g. audit replays).
+        
+        Layers 1-3 run per message; the borderline ones then go to the LLM
+        judge together, awaited concurrently in one event loop, instead of
+        one blocking round-trip per message.
+        
+        Args:
+            texts: Input texts to classify
+            
+        Returns:
+            One ClassificationResult per input, in order
+        """
+        results: List[Optional[ClassificationResult]] = []
+        staged = {}  # index -> (normalized, classification, layer_results)
+        
+        for index, text in enumerate(texts):
+            outcome = self._classify_patterns(text)
+            if isinstance(outcome, ClassificationResult):
+                results.append(outcome)
+            else:
+                results.append(None)
+                staged[index] = outcome
+        
+        # Layer 4: LLM Judge (for borderline cases)
+        judged = []
+        if self.enable_llm_judge:
+            for index, (normalized, classification, _) in staged.items():
+                if self._should_use_llm_judge(classification):
+                    logger.info(
+                        f"Pattern confidence {classification['confidence']:.2f} triggers LLM judge"
+                    )
+                    judged.append(index)
+        
+        if judged:
+            # Cache hits are resolved here, so they never start an event loop
+            llm_results = [self._llm_cache_get(staged[index][0]) for index in judged]
+            misses = [i for i, llm_result in enumerate(llm_results) if llm_result is None]
+            if misses:
+                fetched = self._run_llm_judges([
+                    (staged[judged[i]][0], staged[judged[i]][1]) for i in misses
+                ])
+                for i, llm_result in zip(misses, fetched):
+                    llm_results[i] = llm_result
+            
+            for index, llm_result in zip(judged, llm_results):
+                if llm_result:
+                    normalized, classification, layer_results = staged[index]
+                    # Blend LLM result with pattern result
+                    classification = self._blend_results(classification, llm_result)
+                    layer_results["llm_judge"] = llm_result
+                    staged[index] = (normalized, classification, layer_results)
+                    logger.info(
+                        f"LLM judge result: {llm_result['label']} "
+                        f"(confidence: {llm_result['confidence']:.2f})"
+                    )
+        
+        for index, (normalized, classification, layer_results) in staged.items():
+            results[index] = ClassificationResult(
+                label=classification["label"],
+                confidence=classification["confidence"],
+                indicators=classification["indicators"],
+                normalized_text=normalized,
+                layer_results=layer_results
+            )
+        
+        return results
+    
+    def _classify_patterns(self, text: str):
+        """
+        Layers 1-3 for one message.
+        
+        Returns:
+            A final ClassificationResult when a fast rule decides, otherwise
+            (normalized, pattern classification, layer_results) for Layer 4
+        """
         if not text or len(text.strip()) < 3:
             return ClassificationResult(
                 label=ContentLabel.SAFE,
@@ -216,6 +338,13 @@ Respond with JSON only, no other text:
         normalized = self._normalize_text(text)
         layer_results = {"normalized": normalized}
         
+        # No rule pattern matches anywhere: layers 2-3 can only come back
+        # empty, so skip their per-pattern scans
+        if not self._ANY_RULE_RE.search(normalized):
+            classification = self._safe_pattern_result(self._empty_scores())
+            layer_results.update(classification["details"])
+            return normalized, classification, layer_results
+        
         # Layer 2: Fast rules (immediate escalation)
         minor_risk_score, minor_indicators = self._check_minor_risk(normalized)
         if minor_risk_score > 0:
@@ -254,48 +383,40 @@ Respond with JSON only, no other text:
         classification = self._pattern_classify(normalized)
         layer_results.update(classification["details"])
         
-        # Layer 4: LLM Judge (for borderline cases)
-        if self.enable_llm_judge and self._should_use_llm_judge(classification):
-            logger.info(
-                f"Pattern confidence {classification['confidence']:.2f} triggers LLM judge"
+        return normalized, classification, layer_results
+    
+    def _run_llm_judges(self, jobs: List[Tuple[str, Dict]]) -> List[Optional[Dict]]:
+        """
+        Run the LLM judge for several (normalized text, pattern result) pairs
+        concurrently from synchronous code.
+        
+        Returns:
+            One LLM result (or None) per job; all None if the judge failed
+        """
+        async def judge_all():
+            return await asyncio.gather(
+                *(self._llm_judge(normalized, classification) for normalized, classification in jobs)
             )
-            
-            try:
-                # Run async LLM call in a new event loop or use existing one
-                try:
-                    # Try to get existing loop
-                    loop = asyncio.get_event_loop()
-                    if loop.is_running():
-                        # If loop is running, we can't use asyncio.run()
-                        # Use run_coroutine_threadsafe or create task
-                        import concurrent.futures
-                        with concurrent.futures.ThreadPoolExecutor() as executor:
-                            future = executor.submit(asyncio.run, self._llm_judge(normalized, classification))
-                            llm_result = future.result(timeout=10)  # 10 second timeout
-                    else:
-                        llm_result = asyncio.run(self._llm_judge(normalized, classification))
-                except RuntimeError:
-                    # No event loop, create one
-                    llm_result = asyncio.run(self._llm_judge(normalized, classification))
-                
-                if llm_result:
-                    # Blend LLM result with pattern result
-                    classification = self._blend_results(classification, llm_result)
-                    layer_results["llm_judge"] = llm_result
-                    logger.info(
-                        f"LLM judge result: {llm_result['label']} "
-                        f"(confidence: {llm_result['confidence']:.2f})"
-                    )
-            except Exception as e:
-                logger.warning(f"LLM judge failed, using pattern result: {e}")
         
-        return ClassificationResult(
-            label=classification["label"],
-            confidence=classification["confidence"],
-            indicators=classification["indicators"],
-            normalized_text=normalized,
-            layer_results=layer_results
-        )
+        try:
+            # Run async LLM calls in a new event loop or use existing one
+            try:
+                # Try to get existing loop
+                loop = asyncio.get_event_loop()
+                if loop.is_running():
+                    # If loop is running, we can't use asyncio.run()
+                    # Run it on a worker thread with its own loop
+                    import concurrent.futures
+                    with concurrent.futures.ThreadPoolExecutor() as executor:
+                        future = executor.submit(asyncio.run, judge_all())
+                        return future.result(timeout=10)  # 10 second timeout
+                return asyncio.run(judge_all())
+            except RuntimeError:
+                # No event loop, create one
+                return asyncio.run(judge_all())
+        except Exception as e:
+            logger.warning(f"LLM judge failed, using pattern result: {e}")
+            return [None] * len(jobs)
     
     def _normalize_text(self, text: str) -> str:
         """
@@ -307,28 +428,25 @@ Respond with JSON only, no other text:
         - Emoji mapping
         - Spacing tricks
         """
-        # Unicode normalization
-        text = unicodedata.normalize('NFKC', text)
-        
-        # Emoji mapping
-        for emoji, word in self.EMOJI_MAP.items():
-            text = text.replace(emoji, f" {word} ")
+        # Unicode normalization and emoji mapping (pure ASCII text is already
+        # NFKC-normal and cannot contain emoji, so it skips both)
+        if not text.isascii():
+            text = unicodedata.normalize('NFKC', text)
+            text = self._EMOJI_RE.sub(lambda match: f" {self.EMOJI_MAP[match.group()]} ", text)
         
         # Collapse multiple spaces to single space
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = self._WHITESPACE_RE.sub(' ', text).strip()
         
         # Leetspeak mapping
-        for leet, char in self.LEETSPEAK_MAP.items():
-            text = text.replace(leet, char)
+        text = text.translate(self._LEETSPEAK_TABLE)
         
         # Lowercase for matching (do this before spacing removal)
         text = text.lower()
         
         # Remove single-letter spacing tricks (s e x -> sex, p o r n -> porn)
         # Handle sequences of 2-4 single letters separated by spaces
-        text = re.sub(r'\b([a-z])\s+([a-z])\s+([a-z])\s+([a-z])\b', r'\1\2\3\4', text)  # 4 letters
-        text = re.sub(r'\b([a-z])\s+([a-z])\s+([a-z])\b', r'\1\2\3', text)  # 3 letters
-        text = re.sub(r'\b([a-z])\s+([a-z])\b', r'\1\2', text)  # 2 letters
+        for pattern, replacement in self._SPACED_LETTERS_RE:
+            text = pattern.sub(replacement, text)
         
         return text
     
@@ -341,8 +459,8 @@ Respond with JSON only, no other text:
         """
         indicators = []
         
-        for pattern in self.AGE_INDICATORS:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in self._AGE_INDICATORS_RE:
+            matches = pattern.findall(text)
             if matches:
                 indicators.append(f"age_indicator: {matches[0]}")
         
@@ -357,8 +475,8 @@ Respond with JSON only, no other text:
         """
         indicators = []
         
-        for pattern in self.COERCION_INDICATORS:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in self._COERCION_INDICATORS_RE:
+            matches = pattern.findall(text)
             if matches:
                 indicators.append(f"coercion: {matches[0]}")
         
@@ -366,8 +484,8 @@ Respond with JSON only, no other text:
     
     def _is_clinical_context(self, text: str) -> bool:
         """Check if text is in clinical/medical context."""
-        for pattern in self.CLINICAL_CONTEXT:
-            if re.search(pattern, text, re.IGNORECASE):
+        for pattern in self._CLINICAL_CONTEXT_RE:
+            if pattern.search(text):
                 return True
         return False
     
@@ -377,47 +495,41 @@ Respond with JSON only, no other text:
         
         Returns dict with label, confidence, indicators, and details.
         """
-        scores = {
-            "anatomy": 0,
-            "sexual_acts": 0,
-            "fetish": 0,
-            "suggestive": 0,
-            "explicit_request": 0,
-        }
+        scores = self._empty_scores()
         
         all_indicators = []
         
         # Check explicit anatomy
-        for pattern in self.EXPLICIT_ANATOMY:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in self._EXPLICIT_ANATOMY_RE:
+            matches = pattern.findall(text)
             if matches:
                 scores["anatomy"] += len(matches)
                 all_indicators.append(f"anatomy: {matches[0]}")
         
         # Check sexual acts
-        for pattern in self.SEXUAL_ACTS:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in self._SEXUAL_ACTS_RE:
+            matches = pattern.findall(text)
             if matches:
                 scores["sexual_acts"] += len(matches)
                 all_indicators.append(f"sexual_act: {matches[0]}")
         
         # Check fetish indicators
-        for pattern in self.FETISH_INDICATORS:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in self._FETISH_INDICATORS_RE:
+            matches = pattern.findall(text)
             if matches:
                 scores["fetish"] += len(matches)
                 all_indicators.append(f"fetish: {matches[0]}")
         
         # Check suggestive content
-        for pattern in self.SUGGESTIVE_CONTENT:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in self._SUGGESTIVE_CONTENT_RE:
+            matches = pattern.findall(text)
             if matches:
                 scores["suggestive"] += len(matches)
                 all_indicators.append(f"suggestive: {matches[0]}")
 
         # Check relationship role requests (weighted)
-        for pattern in self.RELATIONSHIP_ROLE_REQUESTS:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in self._RELATIONSHIP_ROLE_REQUESTS_RE:
+            matches = pattern.findall(text)
             if matches:
                 # Weight higher so single "be my girlfriend" triggers ROMANCE routing reliably
                 scores["suggestive"] += 2
@@ -425,15 +537,15 @@ Respond with JSON only, no other text:
                 break
 
         # Check strong romance phrases (weighted)
-        for pattern in self.STRONG_ROMANCE_PHRASES:
-            if re.search(pattern, text, re.IGNORECASE):
+        for pattern in self._STRONG_ROMANCE_PHRASES_RE:
+            if pattern.search(text):
                 scores["suggestive"] += 2
                 all_indicators.append("suggestive: strong_romance_phrase")
                 break
         
         # Check explicit requests (weighted higher)
-        for pattern in self.EXPLICIT_REQUESTS:
-            if re.search(pattern, text, re.IGNORECASE):
+        for pattern in self._EXPLICIT_REQUESTS_RE:
+            if pattern.search(text):
                 scores["explicit_request"] += 3
                 all_indicators.append(f"explicit_request")
         
@@ -477,6 +589,22 @@ Respond with JSON only, no other text:
             }
         
         # Default to SAFE
+        return self._safe_pattern_result(scores)
+    
+    @staticmethod
+    def _empty_scores() -> Dict[str, int]:
+        """Zeroed Layer 3 category scores."""
+        return {
+            "anatomy": 0,
+            "sexual_acts": 0,
+            "fetish": 0,
+            "suggestive": 0,
+            "explicit_request": 0,
+        }
+    
+    @staticmethod
+    def _safe_pattern_result(scores: Dict[str, int]) -> Dict:
+        """Layer 3 result when no category is strong enough."""
         return {
             "label": ContentLabel.SAFE,
             "confidence": 0.95,
@@ -527,10 +655,9 @@ Respond with JSON only, no other text:
             LLM classification result or None if failed
         """
         # Check cache
-        cache_key = hash(text)
-        if cache_key in self.llm_cache:
-            logger.debug("LLM judge cache hit")
-            return self.llm_cache[cache_key]
+        cached = self._llm_cache_get(text)
+        if cached is not None:
+            return cached
         
         # Build prompt
         prompt = self._build_llm_prompt(text, pattern_result)
@@ -554,7 +681,7 @@ Respond with JSON only, no other text:
             
             # Validate
             if self._validate_llm_result(result):
-                self.llm_cache[cache_key] = result
+                self._llm_cache_put(text, result)
                 return result
             else:
                 logger.warning(f"Invalid LLM result: {result}")
@@ -567,6 +694,32 @@ Respond with JSON only, no other text:
             logger.warning(f"LLM judge error: {e}")
             return None
     
+    @staticmethod
+    def _llm_cache_key(text: str) -> bytes:
+        """128-bit BLAKE2b digest of normalized text (stable across processes, unlike hash())."""
+        return hashlib.blake2b(text.encode(), digest_size=16).digest()
+    
+    def _llm_cache_get(self, text: str) -> Optional[Dict]:
+        """Look up a cached LLM judge result for normalized text."""
+        key = self._llm_cache_key(text)
+        with self._llm_cache_lock:
+            result = self.llm_cache.get(key)
+            if result is not None:
+                self.llm_cache.move_to_end(key)
+                logger.debug("LLM judge cache hit")
+        return result
+    
+    def _llm_cache_put(self, text: str, result: Dict) -> None:
+        """Cache an LLM judge result, evicting the least recently used."""
+        if settings.content_llm_judge_cache_size <= 0:
+            return
+        key = self._llm_cache_key(text)
+        with self._llm_cache_lock:
+            self.llm_cache[key] = result
+            self.llm_cache.move_to_end(key)
+            while len(self.llm_cache) > settings.content_llm_judge_cache_size:
+                self.llm_cache.popitem(last=False)
+    
     def _build_llm_prompt(self, text: str, pattern_result: Dict) -> str:
         """
         Build classification prompt for LLM.
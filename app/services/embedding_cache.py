@@ -0,0 +1,115 @@
+"""Redis cache for query embeddings shared across worker processes."""
+
+import redis.asyncio as redis
+import logging
+from typing import Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """Cache of text embeddings (raw float32 bytes) keyed by a digest of the text."""
+    
+    def __init__(self, redis_url: Optional[str] = None, ttl: int = 3600):
+        """
+        Initialize embedding cache.
+        
+        Args:
+            redis_url: Redis connection URL (None disables caching)
+            ttl: Time-to-live for cached embeddings in seconds
+        """
+        self.redis_url = redis_url
+        self._client: Optional[redis.Redis] = None
+        self._enabled = bool(redis_url)
+        self.ttl = ttl
+        
+        if not self._enabled:
+            logger.info("EmbeddingCache: Redis not configured, caching disabled")
+    
+    async def _get_client(self) -> Optional[redis.Redis]:
+        """Get or create Redis client."""
+        if not self._enabled:
+            return None
+        
+        if self._client is None:
+            try:
+                self._client = redis.from_url(
+                    self.redis_url,
+                    decode_responses=False,  # Values are raw float32 bytes
+                    socket_connect_timeout=2,
+                    socket_keepalive=True
+                )
+                # Test connection
+                await self._client.ping()
+                logger.info("✅ EmbeddingCache: Connected to Redis")
+            except Exception as e:
+                logger.warning(f"⚠️ EmbeddingCache: Redis connection failed: {e}")
+                self._enabled = False
+                return None
+        
+        return self._client
+    
+    @staticmethod
+    def _make_key(digest: bytes) -> str:
+        """Generate Redis key for a text digest."""
+        return f"emb:{digest.hex()}"
+    
+    async def get_embedding(self, digest: bytes) -> Optional[np.ndarray]:
+        """
+        Get an embedding from cache.
+        
+        Args:
+            digest: Digest of the normalized text
+        
+        Returns:
+            Cached float32 embedding or None on cache miss
+        """
+        if not self._enabled:
+            return None
+        
+        try:
+            client = await self._get_client()
+            if not client:
+                return None
+            
+            cached = await client.get(self._make_key(digest))
+            return np.frombuffer(cached, dtype=np.float32) if cached is not None else None
+        
+        except Exception as e:
+            logger.warning(f"EmbeddingCache get error: {e}")
+            return None
+    
+    async def set_embedding(self, digest: bytes, embedding: np.ndarray):
+        """
+        Cache an embedding.
+        
+        Args:
+            digest: Digest of the normalized text
+            embedding: Embedding to cache
+        """
+        if not self._enabled:
+            return
+        
+        try:
+            client = await self._get_client()
+            if not client:
+                return
+            
+            await client.setex(
+                self._make_key(digest),
+                self.ttl,
+                np.asarray(embedding, dtype=np.float32).tobytes()
+            )
+        
+        except Exception as e:
+            logger.warning(f"EmbeddingCache set error: {e}")
+    
+    async def close(self):
+        """Close Redis connection."""
+        if self._client:
+            try:
+                await self._client.close()
+                logger.info("EmbeddingCache: Redis connection closed")
+            except Exception as e:
+                logger.warning(f"EmbeddingCache close error: {e}")
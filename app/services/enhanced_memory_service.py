@@ -1,12 +1,15 @@
 """Enhanced memory service with intelligence, consolidation, and temporal awareness."""
 
+import asyncio
 import logging
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 from uuid import UUID
 
-from sqlalchemy import select, and_, or_, func, desc
+import numpy as np
+from sqlalchemy import select, and_, or_, func, desc, inspect
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, undefer_group
 
 from app.models.database import MemoryModel
 from app.models.memory import Memory
@@ -14,6 +17,7 @@ from app.services.memory_importance import MemoryImportanceScorer
 from app.services.memory_categorizer import MemoryCategorizer
 from app.services.memory_consolidation import MemoryConsolidationEngine
 from app.utils.embeddings import EmbeddingGenerator
+from app.utils.quantization import dequantize_int8
 
 logger = logging.getLogger(__name__)
 
@@ -69,8 +73,101 @@ class EnhancedMemoryService:
             Created Memory object
         """
         # Generate embedding
-        embedding = self.embedding_generator.generate_embedding(content)
+        embedding = await self.embedding_generator.generate_embedding_async(content)
         
+        memory = self._build_memory_model(
+            user_id, conversation_id, content, embedding, memory_type, conversation_context
+        )
+        
+        self.db.add(memory)
+        await self.db.commit()
+        await self.db.refresh(memory)
+        
+        logger.info(
+            f"Stored memory for user {user_id}: category={memory.category}, "
+            f"importance={memory.importance:.2f}"
+        )
+        
+        # Check for consolidation opportunities (async)
+        await self._check_consolidation(user_id, memory)
+        
+        return self._model_to_memory(memory)
+    
+    async def store_memories(
+        self,
+        user_id: UUID,
+        conversation_id: UUID,
+        memories: List[Dict]
+    ) -> List[Memory]:
+        """
+        Store several memories at once.
+        
+        Like calling store_memory for each, but the embeddings are requested
+        together (coalesced into one encoder batch) and all rows are inserted
+        in a single commit. Memories of one batch are assumed distinct (e.g.
+        one extraction pass), so each is checked for consolidation against
+        existing memories only, not against the rest of the batch.
+        
+        Args:
+            user_id: User ID
+            conversation_id: Conversation ID
+            memories: Dicts with 'content' and optional 'memory_type'
+                (default 'fact') and 'conversation_context'
+            
+        Returns:
+            Created Memory objects, in input order
+        """
+        if not memories:
+            return []
+        
+        embeddings = await asyncio.gather(*(
+            self.embedding_generator.generate_embedding_async(mem['content'])
+            for mem in memories
+        ))
+        
+        models = [
+            self._build_memory_model(
+                user_id,
+                conversation_id,
+                mem['content'],
+                embedding,
+                mem.get('memory_type', 'fact'),
+                mem.get('conversation_context')
+            )
+            for mem, embedding in zip(memories, embeddings)
+        ]
+        
+        self.db.add_all(models)
+        await self.db.commit()
+        
+        # Reload server-side defaults (created_at) for all rows in one query
+        batch_ids = [memory.id for memory in models]
+        result = await self.db.execute(
+            select(MemoryModel)
+            .where(MemoryModel.id.in_(batch_ids))
+            .execution_options(populate_existing=True)
+        )
+        result.scalars().all()
+        
+        logger.info(f"Stored {len(models)} memories for user {user_id}")
+        
+        # Consolidation checks run one at a time: each may commit changes the
+        # next one should see
+        for memory in models:
+            await self._check_consolidation(user_id, memory, exclude_ids=batch_ids)
+        
+        return [self._model_to_memory(memory) for memory in models]
+    
+    def _build_memory_model(
+        self,
+        user_id: UUID,
+        conversation_id: UUID,
+        content: str,
+        embedding,
+        memory_type: str,
+        conversation_context: Optional[Dict]
+    ) -> MemoryModel:
+        """Categorize, score and build (not add) a new memory row."""
         # Categorize memory
         category = self.categorizer.categorize(content, memory_type)
         
@@ -84,8 +181,7 @@ class EnhancedMemoryService:
             conversation_context=conversation_context
         )
         
-        # Create memory model
-        memory = MemoryModel(
+        return MemoryModel(
             user_id=user_id,
             conversation_id=conversation_id,
             content=content,
@@ -99,20 +195,6 @@ class EnhancedMemoryService:
             decay_factor=1.0,
             is_active=True
         )
-        
-        self.db.add(memory)
-        await self.db.commit()
-        await self.db.refresh(memory)
-        
-        logger.info(
-            f"Stored memory for user {user_id}: category={category}, "
-            f"importance={importance_scores['final_importance']:.2f}"
-        )
-        
-        # Check for consolidation opportunities (async)
-        await self._check_consolidation(user_id, memory)
-        
-        return self._model_to_memory(memory)
     
     async def retrieve_memories(
         self,
@@ -138,10 +220,14 @@ class EnhancedMemoryService:
             List of Memory objects
         """
         # Generate query embedding
-        query_embedding = self.embedding_generator.generate_embedding(query_text)
-        
-        # Build query
-        stmt = select(MemoryModel).where(
+        query_embedding = await self.embedding_generator.generate_embedding_async(query_text)
+        
+        # Build query; rerank on the int8 embedding copy (half the bytes of
+        # the halfvec column, which stays in Postgres)
+        stmt = select(MemoryModel).options(
+            defer(MemoryModel.embedding),
+            undefer_group("embedding_i8")
+        ).where(
             MemoryModel.user_id == user_id
         )
         
@@ -168,11 +254,16 @@ class EnhancedMemoryService:
         result = await self.db.execute(stmt)
         memories = result.scalars().all()
         
-        # Calculate similarity scores and re-rank
+        # Calculate similarity scores (one matrix-vector product) and re-rank
+        candidate_embeddings = dequantize_int8(
+            [mem.embedding_i8 for mem in memories],
+            [mem.embedding_scale for mem in memories],
+            [mem.embedding_offset for mem in memories],
+            dimension=len(query_embedding)
+        )
+        similarities = self._batch_similarity(query_embedding, candidate_embeddings)
         scored_memories = []
-        for mem in memories:
-            # Calculate similarity (simplified - would use actual vector similarity)
-            similarity = self._calculate_simple_similarity(query_embedding, mem.embedding)
+        for mem, similarity in zip(memories, similarities.tolist()):
             
             # Apply temporal decay
             decay_adjusted_importance = self._apply_temporal_decay(mem)
@@ -417,13 +508,21 @@ class EnhancedMemoryService:
     async def _check_consolidation(
         self,
         user_id: UUID,
-        new_memory: MemoryModel
+        new_memory: MemoryModel,
+        exclude_ids: Optional[List[UUID]] = None
     ) -> None:
-        """Check if new memory should be consolidated with existing ones."""
+        """
+        Check if new memory should be consolidated with existing ones.
+        
+        exclude_ids (default: just the new memory) are left out of the
+        candidates; store_memories passes the whole batch.
+        """
         # Get recent memories in same category
         if not new_memory.category:
             return
         
+        excluded = exclude_ids if exclude_ids is not None else [new_memory.id]
+        
         stmt = (
             select(MemoryModel)
             .where(
@@ -431,7 +530,7 @@ class EnhancedMemoryService:
                     MemoryModel.user_id == user_id,
                     MemoryModel.category == new_memory.category,
                     MemoryModel.is_active == True,
-                    MemoryModel.id != new_memory.id
+                    MemoryModel.id.notin_(excluded)
                 )
             )
             .order_by(desc(MemoryModel.created_at))
@@ -444,10 +543,11 @@ class EnhancedMemoryService:
         # Convert to Memory objects for consolidation engine
         new_mem_obj = self._model_to_memory(new_memory)
         
-        # Check similarity with each
-        for mem in recent_memories:
-            # Calculate similarity
-            similarity = self._calculate_simple_similarity(new_memory.embedding, mem.embedding)
+        # Check similarity with each (computed for all in one pass)
+        similarities = self._batch_similarity(
+            new_memory.embedding, [mem.embedding for mem in recent_memories]
+        )
+        for mem, similarity in zip(recent_memories, similarities.tolist()):
             
             # Check if they should be consolidated
             if similarity > 0.7:  # Lower threshold to catch contradictions
@@ -529,23 +629,24 @@ class EnhancedMemoryService:
         
         return memory.importance * decay * memory.decay_factor
     
-    def _calculate_simple_similarity(self, emb1, emb2) -> float:
-        """Simple embedding similarity (placeholder for actual implementation)."""
-        try:
-            import numpy as np
-            arr1 = np.array(emb1)
-            arr2 = np.array(emb2)
-            
-            dot_product = np.dot(arr1, arr2)
-            norm1 = np.linalg.norm(arr1)
-            norm2 = np.linalg.norm(arr2)
-            
-            if norm1 > 0 and norm2 > 0:
-                return float(dot_product / (norm1 * norm2))
-        except:
-            pass
+    @staticmethod
+    def _batch_similarity(query_embedding, embeddings: List) -> np.ndarray:
+        """
+        Cosine similarity of one embedding against many.
+        
+        Stacks the candidates and scores them with a single BLAS matrix-vector
+        product instead of a Python loop of np.dot calls. Pairs that cannot be
+        scored (zero norm) get the neutral 0.5.
+        """
+        if not len(embeddings):
+            return np.empty(0, dtype=np.float32)
+        
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        query = np.asarray(query_embedding, dtype=np.float32)
         
-        return 0.5  # Default
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        dots = matrix @ query
+        return np.divide(dots, norms, out=np.full_like(dots, 0.5), where=norms > 0)
     
     def _model_to_memory(self, model: MemoryModel) -> Memory:
         """Convert MemoryModel to Memory domain object."""
@@ -561,7 +662,8 @@ class EnhancedMemoryService:
             id=model.id,
             conversation_id=model.conversation_id,
             content=model.content,
-            embedding=model.embedding,
+            # Not loaded when the query deferred it (int8 rerank path)
+            embedding=None if "embedding" in inspect(model).unloaded else model.embedding,
             memory_type=mem_type,
             importance=model.importance,
             created_at=model.created_at,
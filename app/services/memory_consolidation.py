@@ -48,6 +48,9 @@ class MemoryConsolidationEngine:
         """
         candidates = []
         
+        # Convert/normalize each embedding once, not once per pair
+        unit_embeddings = [self._unit_embedding(m) for m in memories]
+        
         for i in range(len(memories)):
             for j in range(i + 1, len(memories)):
                 mem1 = memories[i]
@@ -59,7 +62,11 @@ class MemoryConsolidationEngine:
                         continue
                 
                 # Calculate similarity
-                similarity = self._calculate_similarity(mem1, mem2)
+                emb1, emb2 = unit_embeddings[i], unit_embeddings[j]
+                if emb1 is not None and emb2 is not None:
+                    similarity = float(np.dot(emb1, emb2))
+                else:
+                    similarity = self._text_similarity(mem1.content, mem2.content)
                 
                 if similarity >= self.similarity_threshold:
                     candidates.append((mem1, mem2, similarity))
@@ -255,26 +262,37 @@ class MemoryConsolidationEngine:
         falls back to text similarity.
         """
         # Try embedding similarity first
-        if hasattr(memory1, 'embedding') and hasattr(memory2, 'embedding'):
-            if memory1.embedding is not None and memory2.embedding is not None:
-                try:
-                    emb1 = np.array(memory1.embedding)
-                    emb2 = np.array(memory2.embedding)
-                    
-                    # Cosine similarity
-                    dot_product = np.dot(emb1, emb2)
-                    norm1 = np.linalg.norm(emb1)
-                    norm2 = np.linalg.norm(emb2)
-                    
-                    if norm1 > 0 and norm2 > 0:
-                        similarity = dot_product / (norm1 * norm2)
-                        return float(similarity)
-                except Exception as e:
-                    logger.error(f"Error calculating embedding similarity: {e}")
+        emb1 = self._unit_embedding(memory1)
+        emb2 = self._unit_embedding(memory2)
+        if emb1 is not None and emb2 is not None:
+            return float(np.dot(emb1, emb2))
         
         # Fallback: Simple text similarity
         return self._text_similarity(memory1.content, memory2.content)
     
+    @staticmethod
+    def _unit_embedding(memory: Memory) -> Optional[np.ndarray]:
+        """
+        L2-normalized embedding of a memory as float32, or None if unusable.
+        
+        pgvector already returns embeddings as ndarrays, so np.asarray
+        avoids a copy for memories loaded from the database.
+        """
+        embedding = getattr(memory, 'embedding', None)
+        if embedding is None:
+            return None
+        
+        try:
+            vector = np.asarray(embedding, dtype=np.float32)
+            norm = np.linalg.norm(vector)
+        except Exception as e:
+            logger.error(f"Error calculating embedding similarity: {e}")
+            return None
+        
+        if norm > 0:
+            return vector / norm
+        return None
+    
     def _text_similarity(self, text1: str, text2: str) -> float:
         """Calculate basic text similarity using word overlap."""
         words1 = set(text1.lower().split())
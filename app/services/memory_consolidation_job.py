@@ -119,8 +119,9 @@ async def _consolidate_user_semantic_duplicates(
             continue
 
         # Find the most similar memory of the same type for this user (excluding self).
-        # Similarity = 1 - cosine_distance
-        sim_expr = (1 - MemoryModel.embedding.cosine_distance(mem.embedding))
+        # Embeddings are unit-norm: similarity = -(embedding <#> other)
+        negative_ip = MemoryModel.embedding.max_inner_product(mem.embedding)
+        sim_expr = -negative_ip
         stmt = (
             select(MemoryModel, sim_expr.label("similarity"))
             .where(
@@ -133,7 +134,8 @@ async def _consolidate_user_semantic_duplicates(
                     sim_expr >= similarity_threshold,
                 )
             )
-            .order_by(sim_expr.desc())
+            # Ascending <#> so the HNSW index can serve the ORDER BY
+            .order_by(negative_ip)
             .limit(3)
         )
         rows = (await db.execute(stmt)).all()
@@ -1,5 +1,6 @@
 """Memory extraction service for identifying and storing facts from conversations."""
 
+import asyncio
 import logging
 from typing import List, Optional
 from uuid import UUID
@@ -102,9 +103,12 @@ class MemoryExtractor:
             for idx, fact in enumerate(facts, 1):
                 logger.info(f"  └─ Fact {idx}: '{fact}'")
             
-            # Generate embeddings in batch
+            # Generate embeddings in batch (off the event loop: encoding is
+            # blocking CPU work)
             contents = [fact['content'] for fact in facts]
-            embeddings = self.embedding_generator.batch_generate_embeddings(contents)
+            embeddings = await asyncio.to_thread(
+                self.embedding_generator.batch_generate_embeddings, contents
+            )
             
             # Store each fact (with deduplication)
             stored_count = 0
@@ -63,7 +63,7 @@ class MemoryRetrieval:
             
             # Generate query embedding
             logger.debug(f"Generating embedding for query: {enhanced_query[:50]}...")
-            query_embedding = self.embedding_generator.generate_embedding(enhanced_query)
+            query_embedding = await self.embedding_generator.generate_embedding_async(enhanced_query)
             logger.info(f"Generated embedding with {len(query_embedding)} dimensions")
             
             # Search vector store (with personality filtering)
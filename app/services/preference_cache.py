@@ -0,0 +1,142 @@
+"""Redis cache for user communication preferences."""
+
+import redis.asyncio as redis
+import json
+import logging
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+
+class PreferenceCache:
+    """Cache for per-user communication preferences (read on every message)."""
+    
+    def __init__(self, redis_url: Optional[str] = None, ttl: int = 300):
+        """
+        Initialize preference cache.
+        
+        Args:
+            redis_url: Redis connection URL (None disables caching)
+            ttl: Time-to-live for cached preferences in seconds
+        """
+        self.redis_url = redis_url
+        self._client: Optional[redis.Redis] = None
+        self._enabled = bool(redis_url)
+        self.ttl = ttl  # Preferences change rarely; updates invalidate explicitly
+        
+        if not self._enabled:
+            logger.info("PreferenceCache: Redis not configured, caching disabled")
+    
+    async def _get_client(self) -> Optional[redis.Redis]:
+        """Get or create Redis client."""
+        if not self._enabled:
+            return None
+        
+        if self._client is None:
+            try:
+                self._client = redis.from_url(
+                    self.redis_url,
+                    decode_responses=True,
+                    socket_connect_timeout=2,
+                    socket_keepalive=True
+                )
+                # Test connection
+                await self._client.ping()
+                logger.info("✅ PreferenceCache: Connected to Redis")
+            except Exception as e:
+                logger.warning(f"⚠️ PreferenceCache: Redis connection failed: {e}")
+                self._enabled = False
+                return None
+        
+        return self._client
+    
+    @staticmethod
+    def _make_key(external_user_id: str) -> str:
+        """Generate Redis key for a user's preferences."""
+        return f"preferences:{external_user_id}"
+    
+    async def get_preferences(self, external_user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get user preferences from cache.
+        
+        Args:
+            external_user_id: User's external ID
+        
+        Returns:
+            Cached preferences ({} if the user has none) or None on cache miss
+        """
+        if not self._enabled:
+            return None
+        
+        try:
+            client = await self._get_client()
+            if not client:
+                return None
+            
+            cached = await client.get(self._make_key(external_user_id))
+            
+            if cached is not None:
+                logger.debug("✅ Preferences cache HIT: %s", external_user_id)
+                return json.loads(cached)
+            
+            logger.debug("❌ Preferences cache MISS: %s", external_user_id)
+            return None
+        
+        except Exception as e:
+            logger.warning(f"PreferenceCache get error: {e}")
+            return None
+    
+    async def set_preferences(self, external_user_id: str, preferences: Optional[Dict[str, Any]]):
+        """
+        Cache user preferences.
+        
+        Args:
+            external_user_id: User's external ID
+            preferences: Preferences dict (None is cached as {} so misses stay rare)
+        """
+        if not self._enabled:
+            return
+        
+        try:
+            client = await self._get_client()
+            if not client:
+                return
+            
+            await client.setex(
+                self._make_key(external_user_id),
+                self.ttl,
+                json.dumps(preferences or {}, default=str)
+            )
+        
+        except Exception as e:
+            logger.warning(f"PreferenceCache set error: {e}")
+    
+    async def invalidate(self, external_user_id: str):
+        """
+        Clear cached preferences (when updated or cleared).
+        
+        Args:
+            external_user_id: User's external ID
+        """
+        if not self._enabled:
+            return
+        
+        try:
+            client = await self._get_client()
+            if not client:
+                return
+            
+            await client.delete(self._make_key(external_user_id))
+            logger.debug("🗑️ Invalidated preferences cache for %s", external_user_id)
+        
+        except Exception as e:
+            logger.warning(f"PreferenceCache invalidation error: {e}")
+    
+    async def close(self):
+        """Close Redis connection."""
+        if self._client:
+            try:
+                await self._client.close()
+                logger.info("PreferenceCache: Redis connection closed")
+            except Exception as e:
+                logger.warning(f"PreferenceCache close error: {e}")
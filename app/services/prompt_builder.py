@@ -7,6 +7,29 @@ from app.models.memory import Memory, Message
 from app.core.config import settings
 
 
+# Goal progress guidance keyed by detected sentiment: (headline, follow-up tips)
+PROGRESS_SENTIMENT_GUIDANCE = {
+    'positive': (
+        "✅ Positive progress on: {goal}",
+        ("- Encourage them and acknowledge their hard work",),
+    ),
+    'negative': (
+        "⚠️ Struggling with: {goal}",
+        (
+            "- Show empathy and offer support",
+            "- Help them problem-solve or adjust their approach",
+        ),
+    ),
+}
+
+# Extra coaching tips per active goal category (order is preserved in prompts)
+GOAL_CATEGORY_TIPS = {
+    'learning': "- For learning goals: Share tips, encourage practice, track their progress",
+    'health': "- For health goals: Be supportive, celebrate consistency, encourage rest",
+    'career': "- For career goals: Offer strategic advice, build confidence, celebrate milestones",
+}
+
+
 class PromptBuilder:
     """Builds prompts for the LLM with persona, memories, and conversation history."""
     
@@ -623,23 +646,11 @@ class PromptBuilder:
         # Handle progress updates
         if goal_context.get('progress_updates'):
             for update in goal_context['progress_updates']:
-                if update['sentiment'] == 'positive':
-                    instructions.append(
-                        f"✅ Positive progress on: {update['goal']}"
-                    )
-                    instructions.append(
-                        "- Encourage them and acknowledge their hard work"
-                    )
-                elif update['sentiment'] == 'negative':
-                    instructions.append(
-                        f"⚠️ Struggling with: {update['goal']}"
-                    )
-                    instructions.append(
-                        "- Show empathy and offer support"
-                    )
-                    instructions.append(
-                        "- Help them problem-solve or adjust their approach"
-                    )
+                guidance = PROGRESS_SENTIMENT_GUIDANCE.get(update['sentiment'])
+                if guidance:
+                    headline, tips = guidance
+                    instructions.append(headline.format(goal=update['goal']))
+                    instructions.extend(tips)
         
         # Show active goals context
         active_goals = goal_context.get('active_goals', [])
@@ -669,19 +680,11 @@ class PromptBuilder:
             )
             
             # Add specific guidance based on goal categories
-            categories = set(g['category'] for g in active_goals)
-            if 'learning' in categories:
-                instructions.append(
-                    "- For learning goals: Share tips, encourage practice, track their progress"
-                )
-            if 'health' in categories:
-                instructions.append(
-                    "- For health goals: Be supportive, celebrate consistency, encourage rest"
-                )
-            if 'career' in categories:
-                instructions.append(
-                    "- For career goals: Offer strategic advice, build confidence, celebrate milestones"
-                )
+            categories = {g['category'] for g in active_goals}
+            instructions.extend(
+                tip for category, tip in GOAL_CATEGORY_TIPS.items()
+                if category in categories
+            )
         
         return instructions
     
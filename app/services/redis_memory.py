@@ -1,5 +1,6 @@
 """Redis-based short-term memory for distributed deployments."""
 
+import asyncio
 import json
 import logging
 from typing import List, Dict, Optional
@@ -51,7 +52,7 @@ class RedisConversationBuffer:
                 "Set REDIS_URL for distributed deployments."
             )
             from app.services.short_term_memory import ConversationBuffer
-            self._fallback = ConversationBuffer(max_size=max_size)
+            self._fallback = ConversationBuffer(max_messages=max_size)
         else:
             self._fallback = None
     
@@ -73,6 +74,7 @@ class RedisConversationBuffer:
                 await self._redis_client.ping()
                 self._connected = True
                 logger.info("✅ Connected to Redis for distributed memory")
+                self._check_event_loop()
             except Exception as e:
                 logger.error(f"❌ Failed to connect to Redis: {e}")
                 self._connected = False
@@ -80,10 +82,42 @@ class RedisConversationBuffer:
         
         return self._redis_client if self._connected else None
     
+    @staticmethod
+    def _check_event_loop() -> None:
+        """
+        Warn if the service is not running on uvloop.
+        
+        Every Redis round-trip is an await point, and the stock asyncio loop
+        pays roughly twice the scheduling cost per await compared to uvloop.
+        """
+        loop_module = type(asyncio.get_running_loop()).__module__
+        if not loop_module.startswith("uvloop"):
+            logger.warning(
+                "Redis memory is running on the default asyncio event loop. "
+                "Start uvicorn with '--loop uvloop' for lower per-message latency."
+            )
+    
     def _make_key(self, conversation_id: UUID) -> str:
         """Generate Redis key for conversation."""
         return f"conversation:{conversation_id}"
     
+    def _get_fallback_messages(self, conversation_id: UUID) -> List[Dict]:
+        """
+        Read messages from the in-memory fallback in the Redis dict shape.
+        
+        The fallback holds Message objects directly, so no JSON round-trip
+        is needed to produce the dicts callers expect.
+        """
+        return [
+            {
+                "role": msg.role,
+                "content": msg.content,
+                "timestamp": msg.timestamp.isoformat(),
+                "metadata": msg.metadata or {}
+            }
+            for msg in self._fallback.get_recent_messages(conversation_id)
+        ]
+    
     async def add_message(
         self,
         conversation_id: UUID,
@@ -116,14 +150,13 @@ class RedisConversationBuffer:
                 "metadata": metadata or {}
             }
             
-            # Add message to list
-            await client.rpush(key, json.dumps(message))
-            
-            # Trim to max size (keep last N messages)
-            await client.ltrim(key, -self.max_size, -1)
-            
-            # Set TTL
-            await client.expire(key, self.ttl_seconds)
+            # Append, trim to max size (keep last N messages) and set TTL
+            # in a single round-trip
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.rpush(key, json.dumps(message))
+                pipe.ltrim(key, -self.max_size, -1)
+                pipe.expire(key, self.ttl_seconds)
+                await pipe.execute()
             
         except Exception as e:
             logger.error(f"Failed to add message to Redis: {e}")
@@ -144,29 +177,31 @@ class RedisConversationBuffer:
         
         # Fallback to in-memory if Redis unavailable
         if client is None and self._fallback:
-            return self._fallback.get_messages(conversation_id)
+            return self._get_fallback_messages(conversation_id)
         
         try:
             key = self._make_key(conversation_id)
-            messages_json = await client.lrange(key, 0, -1)
+            
+            # Read and refresh TTL on access in a single round-trip
+            # (EXPIRE is a no-op for keys that do not exist)
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.lrange(key, 0, -1)
+                pipe.expire(key, self.ttl_seconds)
+                messages_json, _ = await pipe.execute()
             
             messages = []
             for msg_json in messages_json:
                 try:
                     messages.append(json.loads(msg_json))
                 except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse message JSON: {e}")
-            
-            # Refresh TTL on access
-            if messages:
-                await client.expire(key, self.ttl_seconds)
+                    logger.error("Failed to parse message JSON: %s", e)
             
             return messages
             
         except Exception as e:
             logger.error(f"Failed to get messages from Redis: {e}")
             if self._fallback:
-                return self._fallback.get_messages(conversation_id)
+                return self._get_fallback_messages(conversation_id)
             return []
     
     async def clear_conversation(self, conversation_id: UUID) -> None:
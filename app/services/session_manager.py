@@ -41,6 +41,10 @@ class SessionManager:
     - Age verification tracking
     - Session lock-in (prevents mode switching mid-conversation)
     - Explicit attempt tracking
+    
+    Deliberately lock-free: every method is synchronous and only touches
+    the in-memory dict (no await inside), so on the event loop each call
+    runs to completion without interleaving with other requests.
     """
     
     # Session lock-in: stay in explicit mode for N messages
@@ -65,14 +69,14 @@ class SessionManager:
         Returns:
             SessionState instance
         """
-        if conversation_id not in self.sessions:
-            self.sessions[conversation_id] = SessionState(
+        session = self.sessions.get(conversation_id)
+        if session is None:
+            session = self.sessions[conversation_id] = SessionState(
                 conversation_id=conversation_id,
                 user_id=user_id,
             )
-            logger.info(f"Created new session for conversation {conversation_id}")
+            logger.info("Created new session for conversation %s", conversation_id)
         
-        session = self.sessions[conversation_id]
         session.updated_at = datetime.utcnow()
         
         return session
@@ -89,7 +93,7 @@ class SessionManager:
             session.age_verified = True
             session.age_verified_at = datetime.utcnow()
             session.explicit_attempts_without_verification = 0
-            logger.info(f"Age verified for conversation {conversation_id}")
+            logger.info("Age verified for conversation %s", conversation_id)
     
     def is_age_verified(self, conversation_id: UUID) -> bool:
         """
@@ -160,22 +164,22 @@ class SessionManager:
         if route in (ModelRoute.EXPLICIT, ModelRoute.FETISH):
             session.route_lock_message_count = self.ROUTE_LOCK_MESSAGE_COUNT
             logger.info(
-                f"Route locked to {route} for {self.ROUTE_LOCK_MESSAGE_COUNT} messages "
-                f"(conversation {conversation_id})"
+                "Route locked to %s for %d messages (conversation %s)",
+                route, self.ROUTE_LOCK_MESSAGE_COUNT, conversation_id
             )
         
         # Decrement lock counter if locked
         elif session.route_lock_message_count > 0:
             session.route_lock_message_count -= 1
             logger.debug(
-                f"Route lock count: {session.route_lock_message_count} "
-                f"(conversation {conversation_id})"
+                "Route lock count: %d (conversation %s)",
+                session.route_lock_message_count, conversation_id
             )
         
         if previous_route != route:
             logger.info(
-                f"Route changed: {previous_route} -> {route} "
-                f"(conversation {conversation_id})"
+                "Route changed: %s -> %s (conversation %s)",
+                previous_route, route, conversation_id
             )
     
     def get_current_route(self, conversation_id: UUID) -> ModelRoute:
@@ -196,8 +200,8 @@ class SessionManager:
         # If locked, return locked route
         if session.route_lock_message_count > 0:
             logger.debug(
-                f"Route locked to {session.current_route} "
-                f"({session.route_lock_message_count} messages remaining)"
+                "Route locked to %s (%d messages remaining)",
+                session.current_route, session.route_lock_message_count
             )
             return session.current_route
         
@@ -227,7 +231,7 @@ class SessionManager:
         """
         if conversation_id in self.sessions:
             del self.sessions[conversation_id]
-            logger.info(f"Cleared session for conversation {conversation_id}")
+            logger.info("Cleared session for conversation %s", conversation_id)
     
     def cleanup_expired_sessions(self) -> int:
         """
@@ -249,7 +253,7 @@ class SessionManager:
             del self.sessions[conv_id]
         
         if expired:
-            logger.info(f"Cleaned up {len(expired)} expired sessions")
+            logger.info("Cleaned up %d expired sessions", len(expired))
         
         return len(expired)
     
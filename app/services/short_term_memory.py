@@ -43,7 +43,13 @@ class ConversationBuffer:
         # Thread lock for thread safety
         self._lock = threading.RLock()
     
-    def add_message(self, conversation_id: UUID, role: str, content: str) -> None:
+    def add_message(
+        self,
+        conversation_id: UUID,
+        role: str,
+        content: str,
+        metadata: Optional[Dict] = None
+    ) -> None:
         """
         Add a message to the conversation buffer.
         
@@ -51,12 +57,14 @@ class ConversationBuffer:
             conversation_id: Conversation identifier
             role: Message role ('user' or 'assistant')
             content: Message content
+            metadata: Optional metadata stored alongside the message
         """
         with self._lock:
             message = Message(
                 role=role,
                 content=content,
-                timestamp=datetime.utcnow()
+                timestamp=datetime.utcnow(),
+                metadata=metadata
             )
             
             self._messages[conversation_id].append(message)
@@ -68,7 +76,7 @@ class ConversationBuffer:
             # Update last access time
             self._last_access[conversation_id] = datetime.utcnow()
             
-            logger.debug(f"Added {role} message to conversation {conversation_id}")
+            logger.debug("Added %s message to conversation %s", role, conversation_id)
     
     def get_recent_messages(self, conversation_id: UUID, n: Optional[int] = None) -> List[Message]:
         """
@@ -116,7 +124,7 @@ class ConversationBuffer:
         with self._lock:
             self._summaries[conversation_id] = summary
             self._last_access[conversation_id] = datetime.utcnow()
-            logger.debug(f"Updated summary for conversation {conversation_id}")
+            logger.debug("Updated summary for conversation %s", conversation_id)
     
     def reset_conversation(self, conversation_id: UUID) -> None:
         """
@@ -128,7 +136,7 @@ class ConversationBuffer:
         with self._lock:
             if conversation_id in self._messages:
                 self._messages[conversation_id].clear()
-                logger.info(f"Reset conversation {conversation_id}")
+                logger.info("Reset conversation %s", conversation_id)
     
     def clear_conversation(self, conversation_id: UUID) -> None:
         """
@@ -144,7 +152,7 @@ class ConversationBuffer:
                 del self._summaries[conversation_id]
             if conversation_id in self._last_access:
                 del self._last_access[conversation_id]
-            logger.info(f"Cleared conversation {conversation_id}")
+            logger.info("Cleared conversation %s", conversation_id)
     
     def cleanup_expired(self) -> int:
         """
@@ -166,7 +174,7 @@ class ConversationBuffer:
                 self.clear_conversation(conv_id)
             
             if expired:
-                logger.info(f"Cleaned up {len(expired)} expired conversations")
+                logger.info("Cleaned up %d expired conversations", len(expired))
             
             return len(expired)
     
@@ -3,27 +3,38 @@
 import logging
 from typing import Optional, Dict
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, case, cast, func, literal, Text
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 
 from app.models.database import UserModel
 from app.services.preference_extractor import CommunicationPreferences, PreferenceExtractor
 
 logger = logging.getLogger(__name__)
 
+PREFERENCES_KEY = 'communication_preferences'
+
+# users.extra_metadata as a JSON object (NULL / JSON null treated as {})
+_user_metadata = case(
+    (func.jsonb_typeof(UserModel.extra_metadata) == 'object', UserModel.extra_metadata),
+    else_=literal({}, JSONB)
+)
+
 
 class UserPreferenceService:
     """Service for managing user preferences."""
     
-    def __init__(self, session: AsyncSession, llm_client=None):
+    def __init__(self, session: AsyncSession, llm_client=None, cache=None):
         """
         Initialize user preference service.
         
         Args:
             session: Database session
             llm_client: Optional LLM client for AI-based preference extraction
+            cache: Optional PreferenceCache for Redis caching
         """
         self.session = session
         self.extractor = PreferenceExtractor(llm_client=llm_client)
+        self.cache = cache
     
     async def get_user_preferences(self, external_user_id: str) -> Optional[Dict]:
         """
@@ -35,15 +46,23 @@ class UserPreferenceService:
         Returns:
             Preferences dictionary or None
         """
+        # Try cache first (read on every chat message, changes rarely)
+        if self.cache:
+            cached = await self.cache.get_preferences(external_user_id)
+            if cached is not None:
+                return cached or None
+        
+        # Only the preferences sub-document leaves the database
         result = await self.session.execute(
-            select(UserModel).where(UserModel.external_user_id == external_user_id)
+            select(UserModel.extra_metadata[PREFERENCES_KEY])
+            .where(UserModel.external_user_id == external_user_id)
         )
-        user = result.scalar_one_or_none()
+        preferences = result.scalar_one_or_none()
         
-        if not user or not user.extra_metadata:
-            return None
+        if self.cache:
+            await self.cache.set_preferences(external_user_id, preferences)
         
-        return user.extra_metadata.get('communication_preferences')
+        return preferences
     
     async def update_user_preferences(
         self,
@@ -61,39 +80,51 @@ class UserPreferenceService:
             
         Returns:
             Updated preferences dictionary
+            
+        The change is committed (and the cache entry dropped) before
+        returning.
         """
+        new_preferences = literal(preferences, JSONB)
+        if merge:
+            # Merge with existing preferences (only non-None values), or
+            # store the full dict if the user has none yet
+            changed = {k: v for k, v in preferences.items() if v is not None}
+            new_preferences = case(
+                (
+                    _user_metadata.has_key(PREFERENCES_KEY),
+                    _user_metadata[PREFERENCES_KEY].op('||')(literal(changed, JSONB))
+                ),
+                else_=new_preferences
+            )
+        
+        # Single UPDATE ... RETURNING: the JSONB merge runs in Postgres
         result = await self.session.execute(
-            select(UserModel).where(UserModel.external_user_id == external_user_id)
+            update(UserModel)
+            .where(UserModel.external_user_id == external_user_id)
+            .values(
+                extra_metadata=func.jsonb_set(
+                    _user_metadata,
+                    cast(literal([PREFERENCES_KEY]), ARRAY(Text)),
+                    new_preferences,
+                    True
+                )
+            )
+            .returning(UserModel.extra_metadata[PREFERENCES_KEY])
         )
-        user = result.scalar_one_or_none()
+        updated = result.one_or_none()
         
-        if not user:
+        if updated is None:
             raise ValueError(f"User not found: {external_user_id}")
         
-        # Initialize metadata if needed
-        if user.extra_metadata is None:
-            user.extra_metadata = {}
-        
-        if merge and 'communication_preferences' in user.extra_metadata:
-            # Merge with existing preferences
-            existing = user.extra_metadata['communication_preferences']
-            for key, value in preferences.items():
-                if value is not None:  # Only update non-None values
-                    existing[key] = value
-            user.extra_metadata['communication_preferences'] = existing
-        else:
-            # Replace preferences
-            user.extra_metadata['communication_preferences'] = preferences
-        
-        # Mark as modified for SQLAlchemy
-        from sqlalchemy.orm.attributes import flag_modified
-        flag_modified(user, 'extra_metadata')
-        
-        await self.session.flush()
+        # Commit before invalidating: a reader between the two would
+        # otherwise re-cache the old row for the whole TTL
+        await self.session.commit()
+        if self.cache:
+            await self.cache.invalidate(external_user_id)
         
         logger.info(f"Updated preferences for user {external_user_id}: {preferences}")
         
-        return user.extra_metadata['communication_preferences']
+        return updated[0]
     
     async def extract_and_update_preferences(
         self,
@@ -143,16 +174,22 @@ class UserPreferenceService:
         Args:
             external_user_id: User's external ID
         """
+        # Single UPDATE using jsonb - key; rows without preferences are untouched
         result = await self.session.execute(
-            select(UserModel).where(UserModel.external_user_id == external_user_id)
+            update(UserModel)
+            .where(
+                UserModel.external_user_id == external_user_id,
+                UserModel.extra_metadata.has_key(PREFERENCES_KEY)
+            )
+            .values(
+                extra_metadata=UserModel.extra_metadata.op('-', return_type=JSONB)(PREFERENCES_KEY)
+            )
         )
-        user = result.scalar_one_or_none()
-        
-        if user and user.extra_metadata:
-            if 'communication_preferences' in user.extra_metadata:
-                del user.extra_metadata['communication_preferences']
-                from sqlalchemy.orm.attributes import flag_modified
-                flag_modified(user, 'metadata')
-                await self.session.flush()
-                logger.info(f"Cleared preferences for user {external_user_id}")
+        
+        if result.rowcount:
+            # Committed first, as in update_user_preferences
+            await self.session.commit()
+            if self.cache:
+                await self.cache.invalidate(external_user_id)
+            logger.info(f"Cleared preferences for user {external_user_id}")
 
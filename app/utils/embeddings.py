@@ -1,15 +1,112 @@
 """Embedding generation using sentence-transformers."""
 
+import asyncio
+import hashlib
+import os
+import re
 import threading
+from collections import OrderedDict
 from typing import List, Optional
+import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
 import logging
 
 from app.core.config import settings
 from app.core.exceptions import EmbeddingGenerationError
+from app.services.embedding_cache import EmbeddingCache
 
 logger = logging.getLogger(__name__)
 
+# Runs of whitespace collapse to one space (single C-level scan, no token list)
+_WS_RE = re.compile(r"\s+")
+
+
+def _normalize_text(text: str) -> str:
+    """Collapse whitespace; the result is what gets encoded (and cached)."""
+    return _WS_RE.sub(" ", text).strip() if text else ""
+
+
+def _cache_key(normalized_text: str) -> bytes:
+    """128-bit BLAKE2b digest of normalized text (cache key, not a security boundary)."""
+    return hashlib.blake2b(normalized_text.encode(), digest_size=16).digest()
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent single-text embedding requests into micro-batches.
+    
+    Requests arriving within a short window are encoded together in one
+    batched forward pass (run in a worker thread), instead of one
+    batch-of-1 pass per request.
+    """
+    
+    def __init__(self, generator: 'EmbeddingGenerator', max_batch_size: int = 32, window_ms: float = 5.0):
+        """
+        Initialize the batcher.
+        
+        Args:
+            generator: Embedding generator used for the batched encode
+            max_batch_size: Maximum texts encoded in one forward pass
+            window_ms: How long to wait for sibling requests before encoding
+        """
+        self._generator = generator
+        self.max_batch_size = max_batch_size
+        self.window_seconds = window_ms / 1000
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+    
+    async def submit(self, text: str) -> np.ndarray:
+        """Queue a text for the next micro-batch and wait for its embedding."""
+        loop = asyncio.get_running_loop()
+        
+        # (Re)start the worker on the running loop
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        
+        future = loop.create_future()
+        self._queue.put_nowait((text, future))
+        return await future
+    
+    async def close(self) -> None:
+        """Stop the worker task."""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+    
+    async def _run(self) -> None:
+        """Drain the queue in micro-batches until cancelled."""
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            
+            # Give concurrent requests a moment to join this batch
+            if self.window_seconds > 0:
+                await asyncio.sleep(self.window_seconds)
+            while len(batch) < self.max_batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = await asyncio.to_thread(
+                    self._generator.batch_generate_embeddings, texts
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future), embedding in zip(batch, embeddings):
+                    if not future.done():
+                        future.set_result(embedding)
+
 
 class EmbeddingGenerator:
     """Thread-safe singleton for generating embeddings using sentence-transformers."""
@@ -17,31 +114,84 @@ class EmbeddingGenerator:
     _instance: Optional['EmbeddingGenerator'] = None
     _lock = threading.Lock()
     _model: Optional[SentenceTransformer] = None
+    _batcher: Optional[EmbeddingBatcher] = None
+    _shared_cache: Optional[EmbeddingCache] = None
     
     def __new__(cls):
-        """Ensure singleton instance."""
+        """Ensure singleton instance, loading the model exactly once."""
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:
-                    cls._instance = super().__new__(cls)
+                    instance = super().__new__(cls)
+                    # LRU of normalized-text digest -> embedding; encode calls
+                    # come from worker threads, hence the lock
+                    instance._cache = OrderedDict()
+                    instance._cache_lock = threading.Lock()
+                    # Load under the lock and publish only once fully loaded,
+                    # so concurrent cold-start callers never load it twice
+                    instance._load_model()
+                    cls._instance = instance
         return cls._instance
     
     def __init__(self):
-        """Initialize the embedding generator (lazy loading)."""
-        if self._model is None:
-            self._load_model()
+        """No-op: the model is loaded once in __new__."""
+    
+    def _cache_get(self, key: bytes) -> Optional[np.ndarray]:
+        """Look up an embedding in the in-process LRU."""
+        with self._cache_lock:
+            embedding = self._cache.get(key)
+            if embedding is not None:
+                self._cache.move_to_end(key)
+            return embedding
+    
+    def _cache_put(self, key: bytes, embedding: np.ndarray) -> np.ndarray:
+        """Store an embedding in the in-process LRU (read-only, it is shared)."""
+        embedding = np.array(embedding, dtype=np.float32)
+        embedding.setflags(write=False)
+        if settings.embedding_cache_size <= 0:
+            return embedding
+        with self._cache_lock:
+            self._cache[key] = embedding
+            self._cache.move_to_end(key)
+            while len(self._cache) > settings.embedding_cache_size:
+                self._cache.popitem(last=False)
+        return embedding
     
     def _load_model(self) -> None:
-        """Load the sentence-transformers model."""
+        """Load the sentence-transformers model and warm it up."""
         try:
-            logger.info(f"Loading embedding model: {settings.embedding_model}")
-            self._model = SentenceTransformer(settings.embedding_model)
-            logger.info(f"Embedding model loaded successfully. Dimension: {self._model.get_sentence_embedding_dimension()}")
+            # Sentence-transformer encode gets slower, not faster, past ~8 threads
+            num_threads = settings.embedding_num_threads or min(8, os.cpu_count() or 1)
+            torch.set_num_threads(num_threads)
+            
+            device = settings.embedding_device
+            if device == "auto":
+                device = "cuda" if torch.cuda.is_available() else "cpu"
+            
+            logger.info(f"Loading embedding model: {settings.embedding_model} (device: {device})")
+            self._model = SentenceTransformer(settings.embedding_model, device=device)
+            self._model.eval()
+            
+            if device.startswith("cuda"):
+                # Sentence-transformer encoders are fine in fp16; TF32 speeds
+                # up any remaining fp32 matmuls on Ampere+
+                self._model.half()
+                torch.backends.cuda.matmul.allow_tf32 = True
+            
+            # Run one encode at startup so lazy kernel/allocator setup is not
+            # paid by the first user request
+            with torch.inference_mode():
+                self._model.encode("warmup", convert_to_numpy=True, show_progress_bar=False)
+            
+            logger.info(
+                f"Embedding model loaded successfully. Dimension: {self._model.get_sentence_embedding_dimension()} "
+                f"(torch threads: {num_threads})"
+            )
         except Exception as e:
             logger.error(f"Failed to load embedding model: {e}")
             raise EmbeddingGenerationError(f"Failed to load embedding model: {e}")
     
-    def generate_embedding(self, text: str) -> List[float]:
+    def generate_embedding(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text.
         
@@ -49,28 +199,82 @@ class EmbeddingGenerator:
             text: Input text to embed
             
         Returns:
-            List of floats representing the embedding vector
+            1-D unit-norm float32 array (pgvector binds ndarrays directly)
             
         Raises:
             EmbeddingGenerationError: If embedding generation fails
         """
-        if not text or not text.strip():
+        # Normalize whitespace
+        text = _normalize_text(text)
+        if not text:
             raise EmbeddingGenerationError("Cannot generate embedding for empty text")
         
+        key = _cache_key(text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
         try:
-            # Normalize whitespace
-            text = " ".join(text.split())
-            
-            # Generate embedding
-            embedding = self._model.encode(text, convert_to_numpy=True)
-            
-            # Convert to list and return
-            return embedding.tolist()
+            # Generate embedding (no autograd bookkeeping)
+            with torch.inference_mode():
+                embedding = self._model.encode(
+                    text,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                    show_progress_bar=False
+                )
+            return self._cache_put(key, embedding)
         except Exception as e:
             logger.error(f"Failed to generate embedding: {e}")
             raise EmbeddingGenerationError(f"Failed to generate embedding: {e}")
     
-    def batch_generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+    async def generate_embedding_async(self, text: str) -> np.ndarray:
+        """
+        Generate embedding for a single text without blocking the event loop.
+        
+        Cached embeddings (in-process LRU, then the shared Redis cache when
+        Redis is enabled) are returned without touching the encoder; misses
+        are coalesced into micro-batches (see EmbeddingBatcher).
+        
+        Args:
+            text: Input text to embed
+            
+        Returns:
+            1-D unit-norm float32 array
+            
+        Raises:
+            EmbeddingGenerationError: If embedding generation fails
+        """
+        text = _normalize_text(text)
+        if not text:
+            raise EmbeddingGenerationError("Cannot generate embedding for empty text")
+        
+        key = _cache_key(text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
+        if self._shared_cache is None and settings.redis_enabled and settings.redis_url:
+            self._shared_cache = EmbeddingCache(settings.redis_url, ttl=settings.embedding_cache_ttl)
+        
+        if self._shared_cache is not None:
+            shared = await self._shared_cache.get_embedding(key)
+            if shared is not None:
+                return self._cache_put(key, shared)
+        
+        if self._batcher is None:
+            self._batcher = EmbeddingBatcher(
+                self,
+                max_batch_size=settings.embedding_batch_size,
+                window_ms=settings.embedding_coalesce_window_ms
+            )
+        embedding = await self._batcher.submit(text)
+        
+        if self._shared_cache is not None:
+            await self._shared_cache.set_embedding(key, embedding)
+        return embedding
+    
+    def batch_generate_embeddings(self, texts: List[str]) -> np.ndarray:
         """
         Generate embeddings for multiple texts (more efficient than individual calls).
         
@@ -78,27 +282,55 @@ class EmbeddingGenerator:
             texts: List of input texts to embed
             
         Returns:
-            List of embedding vectors
+            2-D float32 array of unit-norm rows, one per text
             
         Raises:
             EmbeddingGenerationError: If batch embedding generation fails
         """
         if not texts:
-            return []
+            return np.empty((0, self.dimension), dtype=np.float32)
         
         try:
             # Normalize whitespace for all texts
-            normalized_texts = [" ".join(text.split()) for text in texts]
+            normalized_texts = [_normalize_text(text) for text in texts]
+            keys = [_cache_key(text) for text in normalized_texts]
             
-            # Generate embeddings in batch
-            embeddings = self._model.encode(normalized_texts, convert_to_numpy=True, batch_size=32)
+            # Only encode texts not already cached
+            embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+            missing = []
+            for i, key in enumerate(keys):
+                cached = self._cache_get(key)
+                if cached is None:
+                    missing.append(i)
+                else:
+                    embeddings[i] = cached
             
-            # Convert to list of lists
-            return [emb.tolist() for emb in embeddings]
+            if missing:
+                # Generate embeddings in batch. encode() already length-sorts the
+                # inputs before splitting into mini-batches (and restores order),
+                # so each batch is padded only to its own longest text.
+                with torch.inference_mode():
+                    encoded = self._model.encode(
+                        [normalized_texts[i] for i in missing],
+                        convert_to_numpy=True,
+                        batch_size=settings.embedding_batch_size,
+                        normalize_embeddings=True,
+                        show_progress_bar=False
+                    )
+                for i, embedding in zip(missing, encoded):
+                    embeddings[i] = self._cache_put(keys[i], embedding)
+            return embeddings
         except Exception as e:
             logger.error(f"Failed to generate batch embeddings: {e}")
             raise EmbeddingGenerationError(f"Failed to generate batch embeddings: {e}")
     
+    async def close(self) -> None:
+        """Stop the micro-batching worker and close the shared cache, if started."""
+        if self._batcher is not None:
+            await self._batcher.close()
+        if self._shared_cache is not None:
+            await self._shared_cache.close()
+    
     @property
     def dimension(self) -> int:
         """Get the embedding dimension."""
@@ -1,16 +1,24 @@
 """Message journey logging for detailed tracking of each step."""
 
+import atexit
 import logging
+import queue
 import time
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from typing import Optional, Dict, Any
+from uuid import UUID
 
 # Create a separate logger for journeys
 journey_logger = logging.getLogger('message_journey')
 journey_logger.setLevel(logging.INFO)
 
-# Create file handler for journey logs
-journey_handler = logging.FileHandler('message_journey.log')
+# Create file handler for journey logs (rotated so the file stays bounded)
+journey_handler = RotatingFileHandler(
+    'message_journey.log',
+    maxBytes=50 * 1024 * 1024,
+    backupCount=5
+)
 journey_handler.setLevel(logging.INFO)
 
 # Create formatter with detailed format
@@ -27,11 +35,41 @@ class JourneyFormatter(logging.Formatter):
         return f"{timestamp} | {request_id} | USER: {user_id} | STEP: {step} | {record.getMessage()}"
 
 journey_handler.setFormatter(JourneyFormatter())
-journey_logger.addHandler(journey_handler)
+
+# The request path only enqueues records; a background thread does the
+# formatting and file writes
+_journey_queue: queue.Queue = queue.Queue(-1)
+journey_listener = QueueListener(_journey_queue, journey_handler, respect_handler_level=True)
+journey_listener.start()
+atexit.register(journey_listener.stop)
+
+journey_logger.addHandler(QueueHandler(_journey_queue))
 
 # Don't propagate to root logger (separate file)
 journey_logger.propagate = False
 
+_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+}
+
+# Bound logger methods, looked up once instead of an if/elif chain per call
+_LEVEL_FN = {
+    "DEBUG": journey_logger.debug,
+    "INFO": journey_logger.info,
+    "WARNING": journey_logger.warning,
+    "ERROR": journey_logger.error,
+}
+
+
+def _short_id(value) -> str:
+    """Short preview of an ID for log lines."""
+    if isinstance(value, UUID):
+        return value.hex[:8] + "..."
+    return str(value)[:8] + "..."
+
 
 class JourneyLogger:
     """Helper class for logging message journeys with detailed step tracking."""
@@ -48,6 +86,7 @@ class JourneyLogger:
         self.user_id = user_id
         self.start_time = time.time()
         self.last_step_time = self.start_time
+        self._extra = {'request_id': request_id, 'user_id': user_id}
         
     def _get_elapsed(self) -> tuple[float, float]:
         """Get elapsed time from start and from last step."""
@@ -73,6 +112,10 @@ class JourneyLogger:
             data: Optional data dictionary to include
             level: Log level (INFO, DEBUG, WARNING, ERROR)
         """
+        # Skip all message building for filtered levels (e.g. DEBUG chunks)
+        if not journey_logger.isEnabledFor(_LEVELS.get(level, logging.INFO)):
+            return
+        
         total_elapsed, step_elapsed = self._get_elapsed()
         
         # Format message with timing
@@ -83,22 +126,10 @@ class JourneyLogger:
             data_str = ", ".join(f"{k}={v}" for k, v in data.items())
             full_message += f" | {data_str}"
         
-        # Log with extra fields
-        extra = {
-            'request_id': self.request_id,
-            'step': step_name,
-            'user_id': self.user_id
-        }
-        
-        # Log at appropriate level
-        if level == "INFO":
-            journey_logger.info(full_message, extra=extra)
-        elif level == "DEBUG":
-            journey_logger.debug(full_message, extra=extra)
-        elif level == "WARNING":
-            journey_logger.warning(full_message, extra=extra)
-        elif level == "ERROR":
-            journey_logger.error(full_message, extra=extra)
+        # Log at appropriate level with extra fields
+        log_fn = _LEVEL_FN.get(level)
+        if log_fn is not None:
+            log_fn(full_message, extra={**self._extra, 'step': step_name})
     
     # Convenience methods for common steps
     
@@ -110,13 +141,13 @@ class JourneyLogger:
     def log_conversation_created(self, conversation_id: str):
         """Log new conversation creation."""
         self.log_step("CONVERSATION_CREATED", "New conversation created", {
-            "conversation_id": str(conversation_id)[:8] + "..."
+            "conversation_id": _short_id(conversation_id)
         })
     
     def log_user_resolved(self, user_db_id: str):
         """Log user resolution to database UUID."""
         self.log_step("USER_RESOLVED", "User resolved to database UUID", {
-            "user_db_id": str(user_db_id)[:8] + "..."
+            "user_db_id": _short_id(user_db_id)
         })
     
     def log_preferences_loaded(self, has_preferences: bool):
@@ -177,8 +208,9 @@ class JourneyLogger:
     
     def log_streaming_chunk(self, chunks_count: int):
         """Log streaming progress."""
-        if chunks_count % 50 == 0:  # Log every 50 chunks
-            self.log_step("STREAMING_PROGRESS", f"Streamed {chunks_count} chunks", level="DEBUG")
+        if chunks_count % 50:  # Log every 50 chunks
+            return
+        self.log_step("STREAMING_PROGRESS", f"Streamed {chunks_count} chunks", level="DEBUG")
     
     def log_streaming_complete(self, total_chunks: int, full_response_length: int):
         """Log streaming completion."""
@@ -0,0 +1,63 @@
+"""Int8 scalar quantization of embeddings with a per-vector scale/offset."""
+
+from typing import Optional, Sequence, Tuple
+import numpy as np
+
+
+def quantize_int8(embedding) -> Tuple[bytes, float, float]:
+    """
+    Quantize an embedding to one signed byte per dimension.
+    
+    Each vector is min/max normalized onto [-128, 127] (locally adaptive:
+    the range is per vector, not global), so it dequantizes as
+    ``(code + 128) * scale + offset``.
+    
+    Args:
+        embedding: 1-D embedding (any float array-like)
+    
+    Returns:
+        (codes as bytes, scale, offset)
+    """
+    vector = np.asarray(embedding, dtype=np.float32)
+    offset = float(vector.min())
+    value_range = float(vector.max()) - offset
+    
+    if value_range <= 0:
+        # Constant vector: every code maps back to the offset
+        return np.full(vector.shape, -128, dtype=np.int8).tobytes(), 0.0, offset
+    
+    codes = np.round((vector - offset) / value_range * 255 - 128).astype(np.int8)
+    return codes.tobytes(), value_range / 255, offset
+
+
+def dequantize_int8(
+    codes: Sequence[Optional[bytes]],
+    scales: Sequence[Optional[float]],
+    offsets: Sequence[Optional[float]],
+    dimension: int
+) -> np.ndarray:
+    """
+    Dequantize many int8-coded embeddings into one float32 matrix.
+    
+    Rows without codes come back as zero vectors (callers treat a zero norm
+    as "cannot score").
+    
+    Args:
+        codes: Per-row int8 codes from quantize_int8 (or None)
+        scales: Per-row scales
+        offsets: Per-row offsets
+        dimension: Embedding dimension
+    
+    Returns:
+        (len(codes), dimension) float32 array
+    """
+    matrix = np.zeros((len(codes), dimension), dtype=np.float32)
+    present = [i for i, code in enumerate(codes) if code is not None]
+    if not present:
+        return matrix
+    
+    stacked = np.frombuffer(b"".join(codes[i] for i in present), dtype=np.int8).reshape(len(present), dimension)
+    scale = np.asarray([scales[i] for i in present], dtype=np.float32)[:, None]
+    offset = np.asarray([offsets[i] for i in present], dtype=np.float32)[:, None]
+    matrix[present] = (stacked.astype(np.float32) + 128) * scale + offset
+    return matrix
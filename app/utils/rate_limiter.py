@@ -1,12 +1,17 @@
 """Rate limiting utilities."""
 
 from slowapi import Limiter
-from slowapi.util import get_remote_address
 from fastapi import Request
 
 
+def _client_address(request: Request) -> str:
+    """Client IP straight from the ASGI scope (same result as get_remote_address)."""
+    client = request.scope.get("client")
+    return client[0] if client and client[0] else "127.0.0.1"
+
+
 # Create rate limiter instance
-limiter = Limiter(key_func=get_remote_address)
+limiter = Limiter(key_func=_client_address)
 
 
 def get_rate_limit_key(request: Request) -> str:
@@ -22,5 +27,4 @@ def get_rate_limit_key(request: Request) -> str:
     Returns:
         Rate limit key string
     """
-    return get_remote_address(request)
-
+    return _client_address(request)
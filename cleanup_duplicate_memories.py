@@ -7,12 +7,11 @@ keeping only the most recent or most important version.
 """
 
 import asyncio
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, func, true, any_, all_, literal
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import aliased
 from app.models.database import MemoryModel, UserModel
-from app.utils.embeddings import get_embedding_generator
-import numpy as np
-from collections import defaultdict
 import os
 from dotenv import load_dotenv
 
@@ -24,10 +23,14 @@ POSTGRES_URL = os.getenv("POSTGRES_URL", "postgresql+asyncpg://postgres:postgres
 engine = create_async_engine(POSTGRES_URL, echo=False)
 AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Nearest neighbours inspected per memory when looking for semantic duplicates
+NEIGHBOURS_PER_MEMORY = 10
 
-def cosine_similarity(a, b):
-    """Calculate cosine similarity between two vectors."""
-    return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
+# Rows fetched per round-trip when streaming a user's memories
+STREAM_BATCH_SIZE = 1000
+
+# Ids per DELETE statement (bounds the size of each statement's WAL burst)
+DELETE_BATCH_SIZE = 10000
 
 
 async def cleanup_duplicates(user_external_id: str, similarity_threshold: float = 0.95, dry_run: bool = True):
@@ -55,39 +58,50 @@ async def cleanup_duplicates(user_external_id: str, similarity_threshold: float
         print(f"   Mode: {'DRY RUN (no changes)' if dry_run else 'LIVE (will delete)'}")
         print()
         
-        # Get all memories for user
-        result = await session.execute(
-            select(MemoryModel)
-            .where(MemoryModel.conversation_id.in_(
-                select(MemoryModel.conversation_id).where(
-                    MemoryModel.conversation_id.in_(
-                        select(UserModel.id).where(UserModel.id == user.id)
-                    )
-                )
-            ))
+        # Load only the columns we report on (embeddings stay in Postgres),
+        # streamed from a server-side cursor in batches
+        stream = await session.stream(
+            select(
+                MemoryModel.id,
+                MemoryModel.content,
+                MemoryModel.importance,
+                MemoryModel.created_at
+            )
+            .where(MemoryModel.user_id == user.id)
             .order_by(MemoryModel.created_at.desc())
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
         )
-        memories = result.scalars().all()
+        memories_by_id = {}
+        async for memory in stream:
+            memories_by_id[memory.id] = memory
+        total_memories = len(memories_by_id)
         
-        if not memories:
+        if not memories_by_id:
             print("ℹ️  No memories found")
             return
         
-        print(f"📊 Total memories: {len(memories)}")
+        print(f"📊 Total memories: {total_memories}")
         print()
         
-        # Group by content (exact duplicates)
-        content_groups = defaultdict(list)
-        for memory in memories:
-            content_groups[memory.content.strip().lower()].append(memory)
+        # Group by normalized-content hash in SQL (exact duplicates), newest
+        # first per group; served by the (user_id, content_hash) index
+        result = await session.execute(
+            select(
+                func.array_agg(
+                    aggregate_order_by(MemoryModel.id, MemoryModel.created_at.desc())
+                )
+            )
+            .where(MemoryModel.user_id == user.id)
+            .group_by(MemoryModel.content_hash)
+            .having(func.count() > 1)
+        )
         
-        # Find exact duplicates
-        exact_duplicates = []
-        for content, group in content_groups.items():
-            if len(group) > 1:
-                # Keep the most recent one, mark others for deletion
-                group.sort(key=lambda m: m.created_at, reverse=True)
-                exact_duplicates.extend(group[1:])  # Skip first (most recent)
+        # Keep the most recent one, mark others for deletion
+        exact_duplicates = [
+            memories_by_id[memory_id]
+            for (group_ids,) in result
+            for memory_id in group_ids[1:]
+        ]
         
         if exact_duplicates:
             print(f"🔴 Found {len(exact_duplicates)} EXACT duplicates:")
@@ -98,54 +112,71 @@ async def cleanup_duplicates(user_external_id: str, similarity_threshold: float
             print()
         
         # Find semantic duplicates (very similar but not exact)
-        embedding_gen = get_embedding_generator()
+        exact_ids = {m.id for m in exact_duplicates}
+        print(f"🔍 Checking {total_memories - len(exact_ids)} unique memories for semantic duplicates...")
         
-        # Get embeddings for all unique contents
-        unique_memories = []
-        seen_contents = set()
-        for memory in memories:
-            if memory.content.strip().lower() not in seen_contents:
-                unique_memories.append(memory)
-                seen_contents.add(memory.content.strip().lower())
+        # Nearest neighbours per memory via pgvector; only (id, id, similarity)
+        # rows leave the database
+        source = aliased(MemoryModel)
+        neighbour = aliased(MemoryModel)
+        exact_id_array = literal(list(exact_ids), ARRAY(UUID(as_uuid=True)))
+        # Unit-norm embeddings: cosine distance = 1 + (a <#> b). Ordering by
+        # that expression rather than the bare operator keeps each probe off
+        # the global HNSW index: an approximate scan there returns the
+        # nearest rows of every tenant (ef_search of them), and the user
+        # filter applied afterwards would leave few or none, silently
+        # missing duplicates. This is an exact scan of the user's own rows.
+        distance = 1 + neighbour.embedding.max_inner_product(source.embedding)
+        nearest = (
+            select(neighbour.id.label("neighbour_id"), distance.label("distance"))
+            .where(
+                neighbour.user_id == source.user_id,
+                neighbour.is_active == True,
+                # Exact duplicates (of this memory, or already being removed)
+                # must not use up the neighbour slots; this also excludes self
+                neighbour.content_hash != source.content_hash,
+                neighbour.id != all_(exact_id_array)
+            )
+            .order_by(distance)
+            .limit(NEIGHBOURS_PER_MEMORY)
+            .lateral()
+        )
+        result = await session.execute(
+            select(source.id, nearest.c.neighbour_id, (1 - nearest.c.distance).label("similarity"))
+            .join(nearest, true())
+            .where(
+                source.user_id == user.id,
+                source.id != all_(exact_id_array),
+                nearest.c.distance <= 1 - similarity_threshold
+            )
+            .order_by(nearest.c.distance)
+        )
         
-        print(f"🔍 Checking {len(unique_memories)} unique memories for semantic duplicates...")
+        # Each pair once regardless of which side found it
+        pairs = {}
+        for source_id, neighbour_id, similarity in result:
+            pairs.setdefault(frozenset((source_id, neighbour_id)), (source_id, neighbour_id, similarity))
         
         semantic_duplicates = []
-        checked = set()
+        duplicate_ids = set()
         
-        for i, memory1 in enumerate(unique_memories):
-            if memory1.id in [m.id for m in exact_duplicates]:
-                continue  # Skip if already marked as exact duplicate
+        for id1, id2, similarity in pairs.values():
+            memory1, memory2 = memories_by_id[id1], memories_by_id[id2]
             
-            for memory2 in unique_memories[i+1:]:
-                if memory2.id in [m.id for m in exact_duplicates]:
-                    continue
-                
-                pair_key = tuple(sorted([memory1.id, memory2.id]))
-                if pair_key in checked:
-                    continue
-                checked.add(pair_key)
-                
-                # Calculate similarity
-                if memory1.embedding and memory2.embedding:
-                    emb1 = np.array(memory1.embedding)
-                    emb2 = np.array(memory2.embedding)
-                    similarity = cosine_similarity(emb1, emb2)
-                    
-                    if similarity >= similarity_threshold:
-                        # Keep the one with higher importance, or more recent if same
-                        if memory1.importance > memory2.importance:
-                            duplicate = memory2
-                        elif memory2.importance > memory1.importance:
-                            duplicate = memory1
-                        elif memory1.created_at > memory2.created_at:
-                            duplicate = memory2
-                        else:
-                            duplicate = memory1
-                        
-                        if duplicate not in semantic_duplicates:
-                            semantic_duplicates.append(duplicate)
-                            print(f"   • Similar ({similarity:.2%}): \"{memory1.content[:40]}\" ≈ \"{memory2.content[:40]}\"")
+            # Keep the one with higher importance, or more recent if same
+            if memory1.importance > memory2.importance:
+                duplicate = memory2
+            elif memory2.importance > memory1.importance:
+                duplicate = memory1
+            elif memory1.created_at > memory2.created_at:
+                duplicate = memory2
+            else:
+                duplicate = memory1
+            
+            if duplicate.id not in duplicate_ids:
+                duplicate_ids.add(duplicate.id)
+                semantic_duplicates.append(duplicate)
+                print(f"   • Similar ({similarity:.2%}): \"{memory1.content[:40]}\" ≈ \"{memory2.content[:40]}\"")
         
         print()
         if semantic_duplicates:
@@ -159,11 +190,11 @@ async def cleanup_duplicates(user_external_id: str, similarity_threshold: float
         
         print("=" * 70)
         print(f"📊 SUMMARY:")
-        print(f"   Total memories: {len(memories)}")
+        print(f"   Total memories: {total_memories}")
         print(f"   Exact duplicates: {len(exact_duplicates)}")
         print(f"   Semantic duplicates: {len(semantic_duplicates)}")
         print(f"   Total to remove: {total_to_delete}")
-        print(f"   After cleanup: {len(memories) - total_to_delete}")
+        print(f"   After cleanup: {total_memories - total_to_delete}")
         print("=" * 70)
         print()
         
@@ -175,11 +206,17 @@ async def cleanup_duplicates(user_external_id: str, similarity_threshold: float
         if not dry_run:
             print("🗑️  Deleting duplicates...")
             
-            ids_to_delete = [m.id for m in exact_duplicates + semantic_duplicates]
+            ids_to_delete = list(exact_ids | duplicate_ids)
             
-            await session.execute(
-                delete(MemoryModel).where(MemoryModel.id.in_(ids_to_delete))
-            )
+            # id = ANY($1) with one array parameter: a single statement shape
+            # regardless of how many ids each batch holds
+            for start in range(0, len(ids_to_delete), DELETE_BATCH_SIZE):
+                batch = ids_to_delete[start:start + DELETE_BATCH_SIZE]
+                await session.execute(
+                    delete(MemoryModel).where(
+                        MemoryModel.id == any_(literal(batch, ARRAY(UUID(as_uuid=True))))
+                    )
+                )
             await session.commit()
             
             print(f"✅ Deleted {total_to_delete} duplicate memories")
@@ -201,7 +238,10 @@ async def main():
     if len(sys.argv) > 1 and not sys.argv[1].startswith("--"):
         user_id = sys.argv[1]
     
-    await cleanup_duplicates(user_id, similarity_threshold=0.95, dry_run=dry_run)
+    try:
+        await cleanup_duplicates(user_id, similarity_threshold=0.95, dry_run=dry_run)
+    finally:
+        await engine.dispose()
 
 
 if __name__ == "__main__":
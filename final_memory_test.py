@@ -5,11 +5,11 @@ import asyncio
 import sys
 sys.path.insert(0, '/home/bean12/Desktop/AI Service')
 
-from sqlalchemy import select, text
+from sqlalchemy import select, text, func
 from uuid import UUID
 from app.core.database import AsyncSessionLocal
 from app.models.database import UserModel, MemoryModel, ConversationModel
-from app.utils.embeddings import EmbeddingGenerator
+from app.utils.embeddings import get_embedding_generator
 from app.repositories.vector_store import VectorStoreRepository
 from app.core.config import settings
 
@@ -22,11 +22,26 @@ class Colors:
     RESET = '\033[0m'
     BOLD = '\033[1m'
 
+TEST_QUERIES = [
+    "What is my name?",
+    "What do I like to do?",
+    "Tell me about my job",
+]
+
+
+def embed_test_queries():
+    """Load the embedding model (first call only) and embed all test queries in one batch."""
+    return get_embedding_generator().batch_generate_embeddings(TEST_QUERIES)
+
+
 async def main():
     print(f"\n{Colors.BOLD}{'='*70}{Colors.RESET}")
     print(f"{Colors.BOLD}Final Memory System Test for myuser123{Colors.RESET}")
     print(f"{Colors.BOLD}{'='*70}{Colors.RESET}\n")
     
+    # Model load + encode run in a worker thread while steps 1-3 wait on the database
+    embedding_task = asyncio.create_task(asyncio.to_thread(embed_test_queries))
+    
     async with AsyncSessionLocal() as session:
         # 1. Find user
         print(f"{Colors.CYAN}1. Finding user...{Colors.RESET}")
@@ -43,16 +58,27 @@ async def main():
         
         # 2. Count memories
         print(f"\n{Colors.CYAN}2. Counting memories...{Colors.RESET}")
+        # Total via a window count alongside three samples: one round-trip,
+        # and no embedding column on the wire
         result = await session.execute(
-            select(MemoryModel).where(MemoryModel.user_id == user.id)
+            select(
+                MemoryModel.importance,
+                MemoryModel.content,
+                MemoryModel.conversation_id,
+                func.count().over().label('total')
+            )
+            .where(MemoryModel.user_id == user.id)
+            .order_by(MemoryModel.created_at.desc())
+            .limit(3)
         )
-        memories = result.scalars().all()
-        print(f"{Colors.GREEN}✓ User has {len(memories)} memories stored{Colors.RESET}")
+        memories = result.all()
+        total_memories = memories[0].total if memories else 0
+        print(f"{Colors.GREEN}✓ User has {total_memories} memories stored{Colors.RESET}")
         
         # Show sample memories
         if memories:
             print(f"{Colors.BLUE}Sample memories:{Colors.RESET}")
-            for i, mem in enumerate(memories[:3], 1):
+            for i, mem in enumerate(memories, 1):
                 print(f"  {i}. [{mem.importance:.2f}] {mem.content[:60]}...")
         
         # 3. Get conversation
@@ -68,27 +94,21 @@ async def main():
         print(f"\n{Colors.CYAN}4. Testing memory retrieval...{Colors.RESET}")
         print(f"{Colors.BLUE}Config threshold: {settings.memory_similarity_threshold}{Colors.RESET}")
         
-        # Generate embedding for test query
-        embed_gen = EmbeddingGenerator()
-        test_queries = [
-            "What is my name?",
-            "What do I like to do?",
-            "Tell me about my job",
-        ]
+        # Embeddings for the test queries (started before step 1)
+        query_embeddings = await embedding_task
         
         vector_store = VectorStoreRepository(session)
         
-        for query in test_queries:
+        # Test with config threshold: all queries in one LATERAL round-trip
+        retrieved_per_query = await vector_store.search_similar_multi(
+            conversation_id=conv_id,
+            query_embeddings=query_embeddings,
+            top_k=5,
+            min_similarity=settings.memory_similarity_threshold  # Use config value
+        )
+        
+        for query, query_embedding, retrieved in zip(TEST_QUERIES, query_embeddings, retrieved_per_query):
             print(f"\n{Colors.YELLOW}Query: '{query}'{Colors.RESET}")
-            query_embedding = embed_gen.generate_embedding(query)
-            
-            # Test with config threshold
-            retrieved = await vector_store.search_similar(
-                conversation_id=conv_id,
-                query_embedding=query_embedding,
-                top_k=5,
-                min_similarity=settings.memory_similarity_threshold  # Use config value
-            )
             
             if retrieved:
                 print(f"{Colors.GREEN}✓ Retrieved {len(retrieved)} memories:{Colors.RESET}")
@@ -117,7 +137,7 @@ async def main():
         print(f"\n{Colors.BOLD}{'='*70}{Colors.RESET}")
         print(f"{Colors.BOLD}SUMMARY{Colors.RESET}")
         print(f"{Colors.BOLD}{'='*70}{Colors.RESET}")
-        print(f"Total Memories: {len(memories)}")
+        print(f"Total Memories: {total_memories}")
         print(f"Config Threshold: {settings.memory_similarity_threshold}")
         
         if retrieved:
@@ -8,7 +8,6 @@ Create Date: 2024-01-15 12:00:00.000000
 from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from datetime import datetime
 
 # revision identifiers
 revision = '003_emotion_detection'
@@ -31,7 +30,7 @@ def upgrade():
         sa.Column('intensity', sa.String(20), nullable=False),
         sa.Column('indicators', JSONB, nullable=True),
         sa.Column('message_snippet', sa.Text, nullable=True),
-        sa.Column('detected_at', sa.DateTime, nullable=False, default=datetime.utcnow),
+        sa.Column('detected_at', sa.DateTime, nullable=False, server_default=sa.func.now()),
         
         # Foreign keys
         sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
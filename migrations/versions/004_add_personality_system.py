@@ -8,7 +8,6 @@ Create Date: 2024-01-15 15:00:00.000000
 from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from datetime import datetime
 
 # revision identifiers
 revision = '004_personality_system'
@@ -53,8 +52,8 @@ def upgrade():
         sa.Column('celebrates_wins', sa.Boolean, nullable=True, default=True),
         
         # Metadata
-        sa.Column('created_at', sa.DateTime, nullable=False, default=datetime.utcnow),
-        sa.Column('updated_at', sa.DateTime, nullable=False, default=datetime.utcnow),
+        sa.Column('created_at', sa.DateTime, nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime, nullable=False, server_default=sa.func.now()),
         sa.Column('version', sa.Integer, nullable=False, default=1),
         
         # Foreign keys
@@ -78,8 +77,8 @@ def upgrade():
         sa.Column('trust_level', sa.Float, nullable=False, default=5.0),
         
         # Timeline
-        sa.Column('first_interaction', sa.DateTime, nullable=False, default=datetime.utcnow),
-        sa.Column('last_interaction', sa.DateTime, nullable=False, default=datetime.utcnow),
+        sa.Column('first_interaction', sa.DateTime, nullable=False, server_default=sa.func.now()),
+        sa.Column('last_interaction', sa.DateTime, nullable=False, server_default=sa.func.now()),
         sa.Column('days_known', sa.Integer, nullable=False, default=0),
         
         # Milestones
@@ -90,7 +89,7 @@ def upgrade():
         sa.Column('negative_reactions', sa.Integer, nullable=False, default=0),
         
         # Metadata
-        sa.Column('updated_at', sa.DateTime, nullable=False, default=datetime.utcnow),
+        sa.Column('updated_at', sa.DateTime, nullable=False, server_default=sa.func.now()),
         
         # Foreign keys
         sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE')
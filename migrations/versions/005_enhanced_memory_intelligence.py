@@ -7,8 +7,6 @@ Create Date: 2024-01-15 18:00:00.000000
 """
 from alembic import op
 import sqlalchemy as sa
-from sqlalchemy.dialects.postgresql import UUID, JSONB
-from datetime import datetime
 
 # revision identifiers
 revision = '005_enhanced_memory'
@@ -20,18 +18,23 @@ depends_on = None
 def upgrade():
     """Add enhanced memory intelligence fields."""
     
-    # Add new columns to memories table
-    op.add_column('memories', sa.Column('user_id', UUID(as_uuid=True), nullable=True))
-    op.add_column('memories', sa.Column('category', sa.String(50), nullable=True))
-    op.add_column('memories', sa.Column('importance_scores', JSONB, nullable=True))
-    op.add_column('memories', sa.Column('updated_at', sa.DateTime, nullable=False, default=datetime.utcnow, server_default=sa.func.now()))
-    op.add_column('memories', sa.Column('last_accessed', sa.DateTime, nullable=True))
-    op.add_column('memories', sa.Column('access_count', sa.Integer, nullable=False, default=0, server_default='0'))
-    op.add_column('memories', sa.Column('decay_factor', sa.Float, nullable=False, default=1.0, server_default='1.0'))
-    op.add_column('memories', sa.Column('is_active', sa.Boolean, nullable=False, default=True, server_default='true'))
-    op.add_column('memories', sa.Column('consolidated_from', JSONB, nullable=True))
-    op.add_column('memories', sa.Column('superseded_by', UUID(as_uuid=True), nullable=True))
-    op.add_column('memories', sa.Column('related_entities', JSONB, nullable=True))
+    # Add new columns to memories table in one ALTER TABLE: a single
+    # ACCESS EXCLUSIVE lock and catalog update, and on PG 11+ the constant
+    # defaults are metadata-only (no table rewrite)
+    op.execute("""
+        ALTER TABLE memories
+            ADD COLUMN user_id UUID,
+            ADD COLUMN category VARCHAR(50),
+            ADD COLUMN importance_scores JSONB,
+            ADD COLUMN updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+            ADD COLUMN last_accessed TIMESTAMP WITHOUT TIME ZONE,
+            ADD COLUMN access_count INTEGER NOT NULL DEFAULT 0,
+            ADD COLUMN decay_factor FLOAT NOT NULL DEFAULT 1.0,
+            ADD COLUMN is_active BOOLEAN NOT NULL DEFAULT true,
+            ADD COLUMN consolidated_from JSONB,
+            ADD COLUMN superseded_by UUID,
+            ADD COLUMN related_entities JSONB
+    """)
     
     # Populate user_id from conversations (data migration)
     op.execute("""
@@ -46,9 +46,9 @@ def upgrade() -> None:
     )
     
     # Create indexes for goals
-    op.create_index('ix_goals_user_id', 'goals', ['user_id'])
-    op.create_index('ix_goals_status', 'goals', ['status'])
-    op.create_index('ix_goals_category', 'goals', ['category'])
+    # Goal lookups always filter by user first, then status/category
+    op.create_index('ix_goals_user_status_category', 'goals', ['user_id', 'status', 'category'])
+    op.create_index('ix_goals_user_last_mentioned', 'goals', ['user_id', sa.text('last_mentioned_at DESC')])
     op.create_index('ix_goals_target_date', 'goals', ['target_date'])
     op.create_index('ix_goals_last_mentioned_at', 'goals', ['last_mentioned_at'])
     
@@ -73,8 +73,7 @@ def upgrade() -> None:
     
     # Create indexes for goal_progress
     op.create_index('ix_goal_progress_goal_id', 'goal_progress', ['goal_id'])
-    op.create_index('ix_goal_progress_user_id', 'goal_progress', ['user_id'])
-    op.create_index('ix_goal_progress_created_at', 'goal_progress', ['created_at'])
+    op.create_index('ix_goal_progress_user_created', 'goal_progress', ['user_id', sa.text('created_at DESC')])
     op.create_index('ix_goal_progress_progress_type', 'goal_progress', ['progress_type'])
 
 
@@ -83,15 +82,13 @@ def downgrade() -> None:
     
     # Drop indexes
     op.drop_index('ix_goal_progress_progress_type', table_name='goal_progress')
-    op.drop_index('ix_goal_progress_created_at', table_name='goal_progress')
-    op.drop_index('ix_goal_progress_user_id', table_name='goal_progress')
+    op.drop_index('ix_goal_progress_user_created', table_name='goal_progress')
     op.drop_index('ix_goal_progress_goal_id', table_name='goal_progress')
     
     op.drop_index('ix_goals_last_mentioned_at', table_name='goals')
     op.drop_index('ix_goals_target_date', table_name='goals')
-    op.drop_index('ix_goals_category', table_name='goals')
-    op.drop_index('ix_goals_status', table_name='goals')
-    op.drop_index('ix_goals_user_id', table_name='goals')
+    op.drop_index('ix_goals_user_last_mentioned', table_name='goals')
+    op.drop_index('ix_goals_user_status_category', table_name='goals')
     
     # Drop tables
     op.drop_table('goal_progress')
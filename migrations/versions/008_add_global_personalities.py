@@ -22,31 +22,33 @@ def upgrade():
     """Add system user and 8 global personalities."""
     
     # Generate UUIDs for system user and personalities
-    system_user_id = str(uuid.uuid4())
+    system_user_id = uuid.uuid4()
     
     personality_ids = {
-        'elara': str(uuid.uuid4()),
-        'seraphina': str(uuid.uuid4()),
-        'isla': str(uuid.uuid4()),
-        'lyra': str(uuid.uuid4()),
-        'aria': str(uuid.uuid4()),
-        'nova': str(uuid.uuid4()),
-        'juniper': str(uuid.uuid4()),
-        'sloane': str(uuid.uuid4())
+        'elara': uuid.uuid4(),
+        'seraphina': uuid.uuid4(),
+        'isla': uuid.uuid4(),
+        'lyra': uuid.uuid4(),
+        'aria': uuid.uuid4(),
+        'nova': uuid.uuid4(),
+        'juniper': uuid.uuid4(),
+        'sloane': uuid.uuid4()
     }
     
     # Create system user for global personalities
-    op.execute(f"""
-        INSERT INTO users (id, external_user_id, display_name, created_at, last_active)
-        VALUES (
-            '{system_user_id}',
-            'system',
-            'System User (Global Personalities)',
-            NOW(),
-            NOW()
-        )
-        ON CONFLICT (external_user_id) DO NOTHING
-    """)
+    op.execute(
+        sa.text("""
+            INSERT INTO users (id, external_user_id, display_name, created_at, last_active)
+            VALUES (
+                :id,
+                'system',
+                'System User (Global Personalities)',
+                NOW(),
+                NOW()
+            )
+            ON CONFLICT (external_user_id) DO NOTHING
+        """).bindparams(sa.bindparam('id', system_user_id, type_=UUID(as_uuid=True)))
+    )
     
     print("✅ Created system user for global personalities")
     
@@ -103,29 +105,39 @@ def upgrade():
         }
     ]
     
-    for p in personalities:
-        op.execute(f"""
+    # One multi-row INSERT (single parse/plan/commit) with bound parameters;
+    # the owner is looked up so an already-existing system user is reused
+    values = ", ".join(
+        f"(:id{i}, :name{i}, :archetype{i})" for i in range(len(personalities))
+    )
+    params = []
+    for i, p in enumerate(personalities):
+        params += [
+            sa.bindparam(f"id{i}", p['id'], type_=UUID(as_uuid=True)),  # bound as uuid, no text cast
+            sa.bindparam(f"name{i}", p['name']),
+            sa.bindparam(f"archetype{i}", p['archetype']),
+        ]
+    
+    op.execute(
+        sa.text(f"""
             INSERT INTO personality_profiles (
                 id, user_id, personality_name, archetype, relationship_type,
                 humor_level, formality_level, enthusiasm_level, empathy_level,
                 directness_level, curiosity_level, supportiveness_level, playfulness_level,
                 custom_instructions, created_at, updated_at, version
             )
-            VALUES (
-                '{p['id']}',
-                '{system_user_id}',
-                '{p['name']}',
-                '{p['archetype']}',
-                'friend',
+            SELECT
+                v.id, u.id, v.name, v.archetype, 'friend',
                 5, 5, 7, 8, 5, 7, 8, 6,
                 'Global character - persona defined in Supabase',
-                NOW(),
-                NOW(),
-                1
-            )
+                NOW(), NOW(), 1
+            FROM (VALUES {values}) AS v (id, name, archetype)
+            JOIN users u ON u.external_user_id = 'system'
             ON CONFLICT (user_id, personality_name) DO NOTHING
-        """)
-        
+        """).bindparams(*params)
+    )
+    
+    for p in personalities:
         print(f"✅ Created global personality: {p['name']} ({p['description']})")
     
     print("✅ All 8 global personalities created successfully!")
@@ -0,0 +1,44 @@
+"""Add content hash to memories for exact-duplicate detection
+
+Revision ID: 009_memory_content_hash
+Revises: 008_global_personalities
+Create Date: 2024-01-22 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '009_memory_content_hash'
+down_revision = '008_global_personalities'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add generated content_hash column and per-user index."""
+    
+    # Generated by Postgres, so every insert/update path (and existing rows)
+    # gets a hash of the normalized content without application code
+    op.add_column(
+        'memories',
+        sa.Column(
+            'content_hash',
+            sa.LargeBinary,
+            sa.Computed("decode(md5(lower(trim(content))), 'hex')", persisted=True),
+            nullable=True
+        )
+    )
+    
+    op.create_index('ix_memories_user_content_hash', 'memories', ['user_id', 'content_hash'])
+    
+    print("✅ Added memories.content_hash")
+
+
+def downgrade():
+    """Remove content_hash column and index."""
+    
+    op.drop_index('ix_memories_user_content_hash', table_name='memories')
+    op.drop_column('memories', 'content_hash')
+    
+    print("✅ Removed memories.content_hash")
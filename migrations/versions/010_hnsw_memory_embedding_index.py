@@ -0,0 +1,38 @@
+"""Switch memory embedding index from IVFFlat to HNSW
+
+Revision ID: 010_hnsw_embedding_index
+Revises: 009_memory_content_hash
+Create Date: 2024-01-23 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = '010_hnsw_embedding_index'
+down_revision = '009_memory_content_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Rebuild ix_memories_embedding_cosine as an HNSW index."""
+    
+    op.drop_index('ix_memories_embedding_cosine', table_name='memories')
+    op.execute(
+        'CREATE INDEX ix_memories_embedding_cosine ON memories '
+        'USING hnsw (embedding vector_cosine_ops) WITH (m = 24, ef_construction = 128)'
+    )
+    
+    print("✅ Rebuilt memory embedding index as HNSW (m=24, ef_construction=128)")
+
+
+def downgrade():
+    """Restore the IVFFlat index."""
+    
+    op.drop_index('ix_memories_embedding_cosine', table_name='memories')
+    op.execute(
+        'CREATE INDEX ix_memories_embedding_cosine ON memories '
+        'USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100)'
+    )
+    
+    print("✅ Restored IVFFlat memory embedding index")
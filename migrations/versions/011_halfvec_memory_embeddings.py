@@ -0,0 +1,46 @@
+"""Store memory embeddings as halfvec
+
+Revision ID: 011_halfvec_embeddings
+Revises: 010_hnsw_embedding_index
+Create Date: 2024-01-23 12:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = '011_halfvec_embeddings'
+down_revision = '010_hnsw_embedding_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Convert memories.embedding to halfvec(384) and rebuild its HNSW index."""
+    
+    op.drop_index('ix_memories_embedding_cosine', table_name='memories')
+    op.execute(
+        'ALTER TABLE memories ALTER COLUMN embedding TYPE halfvec(384) '
+        'USING embedding::halfvec(384)'
+    )
+    op.execute(
+        'CREATE INDEX ix_memories_embedding_cosine ON memories '
+        'USING hnsw (embedding halfvec_cosine_ops) WITH (m = 24, ef_construction = 128)'
+    )
+    
+    print("✅ Converted memory embeddings to halfvec(384)")
+
+
+def downgrade():
+    """Convert memories.embedding back to vector(384)."""
+    
+    op.drop_index('ix_memories_embedding_cosine', table_name='memories')
+    op.execute(
+        'ALTER TABLE memories ALTER COLUMN embedding TYPE vector(384) '
+        'USING embedding::vector(384)'
+    )
+    op.execute(
+        'CREATE INDEX ix_memories_embedding_cosine ON memories '
+        'USING hnsw (embedding vector_cosine_ops) WITH (m = 24, ef_construction = 128)'
+    )
+    
+    print("✅ Converted memory embeddings back to vector(384)")
@@ -0,0 +1,38 @@
+"""Add binary-quantized memory embeddings for coarse similarity search
+
+Revision ID: 012_memory_embedding_bits
+Revises: 011_halfvec_embeddings
+Create Date: 2024-01-24 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = '012_memory_embedding_bits'
+down_revision = '011_halfvec_embeddings'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add generated embedding_bits column with an HNSW Hamming index."""
+    
+    op.execute(
+        'ALTER TABLE memories ADD COLUMN embedding_bits bit(384) '
+        'GENERATED ALWAYS AS (binary_quantize(embedding)::bit(384)) STORED'
+    )
+    op.execute(
+        'CREATE INDEX ix_memories_embedding_bits ON memories '
+        'USING hnsw (embedding_bits bit_hamming_ops)'
+    )
+    
+    print("✅ Added memories.embedding_bits with HNSW Hamming index")
+
+
+def downgrade():
+    """Remove embedding_bits column and index."""
+    
+    op.drop_index('ix_memories_embedding_bits', table_name='memories')
+    op.drop_column('memories', 'embedding_bits')
+    
+    print("✅ Removed memories.embedding_bits")
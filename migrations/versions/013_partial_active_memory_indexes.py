@@ -0,0 +1,58 @@
+"""Restrict memory vector indexes to active memories
+
+Revision ID: 013_partial_active_indexes
+Revises: 012_memory_embedding_bits
+Create Date: 2024-01-24 12:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = '013_partial_active_indexes'
+down_revision = '012_memory_embedding_bits'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Rebuild vector indexes as partial (is_active) and add (user_id, is_active)."""
+    
+    # Superseded/consolidated memories are never searched; keep them out of
+    # the graphs so traversal doesn't visit nodes that get filtered anyway
+    op.drop_index('ix_memories_embedding_cosine', table_name='memories')
+    op.execute(
+        'CREATE INDEX ix_memories_embedding_cosine ON memories '
+        'USING hnsw (embedding halfvec_cosine_ops) WITH (m = 24, ef_construction = 128) '
+        'WHERE is_active'
+    )
+    
+    op.drop_index('ix_memories_embedding_bits', table_name='memories')
+    op.execute(
+        'CREATE INDEX ix_memories_embedding_bits ON memories '
+        'USING hnsw (embedding_bits bit_hamming_ops) '
+        'WHERE is_active'
+    )
+    
+    op.create_index('ix_memories_user_active', 'memories', ['user_id', 'is_active'])
+    
+    print("✅ Rebuilt memory vector indexes over active memories")
+
+
+def downgrade():
+    """Restore full-table vector indexes."""
+    
+    op.drop_index('ix_memories_user_active', table_name='memories')
+    
+    op.drop_index('ix_memories_embedding_bits', table_name='memories')
+    op.execute(
+        'CREATE INDEX ix_memories_embedding_bits ON memories '
+        'USING hnsw (embedding_bits bit_hamming_ops)'
+    )
+    
+    op.drop_index('ix_memories_embedding_cosine', table_name='memories')
+    op.execute(
+        'CREATE INDEX ix_memories_embedding_cosine ON memories '
+        'USING hnsw (embedding halfvec_cosine_ops) WITH (m = 24, ef_construction = 128)'
+    )
+    
+    print("✅ Restored full-table memory vector indexes")
@@ -0,0 +1,85 @@
+"""Normalize memory embeddings and index them for inner product
+
+Revision ID: 014_unit_norm_embeddings
+Revises: 013_partial_active_indexes
+Create Date: 2024-01-25 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '014_unit_norm_embeddings'
+down_revision = '013_partial_active_indexes'
+branch_labels = None
+depends_on = None
+
+# Rows per normalization batch
+BACKFILL_BATCH_SIZE = 20000
+
+
+def upgrade():
+    """Store unit-norm embeddings and swap the cosine index for inner product."""
+    
+    # For unit vectors inner product == cosine similarity, without the
+    # per-probe normalization cosine distance does. Normalized in keyset
+    # batches committed one by one so locks and WAL stay bounded; this runs
+    # before the transactional DDL below and is idempotent (the index drop
+    # tolerates a missing index, rows already unit-norm are skipped), so a
+    # failed run can simply be retried. Zero vectors have no direction and
+    # are left as they are.
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_memories_embedding_cosine', table_name='memories', if_exists=True)
+        bind = op.get_bind()
+        bind.execute(sa.text("SET synchronous_commit = off"))
+        try:
+            last_id = '00000000-0000-0000-0000-000000000000'
+            while last_id is not None:
+                last_id = bind.execute(
+                    sa.text("""
+                        WITH batch AS (
+                            SELECT id FROM memories
+                            WHERE id > CAST(:last_id AS uuid)
+                            ORDER BY id
+                            LIMIT :batch_size
+                        ), updated AS (
+                            UPDATE memories m
+                            SET embedding = l2_normalize(m.embedding)
+                            FROM batch b
+                            WHERE m.id = b.id
+                              AND (m.embedding <#> m.embedding) <> 0
+                              AND abs(1 + (m.embedding <#> m.embedding)) >= 0.001
+                        )
+                        SELECT id FROM batch ORDER BY id DESC LIMIT 1
+                    """),
+                    {"last_id": last_id, "batch_size": BACKFILL_BATCH_SIZE}
+                ).scalar()
+        finally:
+            # The connection goes back to the pool either way
+            bind.execute(sa.text("RESET synchronous_commit"))
+    
+    op.execute(
+        'ALTER TABLE memories ADD CONSTRAINT ck_memories_embedding_unit_norm '
+        'CHECK ((embedding <#> embedding) = 0 OR abs(1 + (embedding <#> embedding)) < 0.01)'
+    )
+    op.execute(
+        'CREATE INDEX ix_memories_embedding_ip ON memories '
+        'USING hnsw (embedding halfvec_ip_ops) WITH (m = 24, ef_construction = 128) '
+        'WHERE is_active'
+    )
+    
+    print("✅ Normalized memory embeddings and rebuilt index with halfvec_ip_ops")
+
+
+def downgrade():
+    """Restore the cosine index (embeddings stay normalized)."""
+    
+    op.drop_index('ix_memories_embedding_ip', table_name='memories')
+    op.drop_constraint('ck_memories_embedding_unit_norm', 'memories', type_='check')
+    op.execute(
+        'CREATE INDEX ix_memories_embedding_cosine ON memories '
+        'USING hnsw (embedding halfvec_cosine_ops) WITH (m = 24, ef_construction = 128) '
+        'WHERE is_active'
+    )
+    
+    print("✅ Restored cosine memory embedding index")
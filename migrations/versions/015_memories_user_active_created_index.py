@@ -0,0 +1,40 @@
+"""Composite (user_id, is_active, created_at) index on memories
+
+Revision ID: 015_user_active_created_index
+Revises: 014_unit_norm_embeddings
+Create Date: 2024-01-25 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '015_user_active_created_index'
+down_revision = '014_unit_norm_embeddings'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Replace (user_id, is_active) with a covering (user_id, is_active, created_at DESC) index."""
+    
+    op.create_index(
+        'ix_memories_user_active_created',
+        'memories',
+        ['user_id', 'is_active', sa.text('created_at DESC')],
+        postgresql_include=['importance']
+    )
+    
+    # Prefix of the new index
+    op.drop_index('ix_memories_user_active', table_name='memories')
+    
+    print("✅ Added ix_memories_user_active_created")
+
+
+def downgrade():
+    """Restore the (user_id, is_active) index."""
+    
+    op.create_index('ix_memories_user_active', 'memories', ['user_id', 'is_active'])
+    op.drop_index('ix_memories_user_active_created', table_name='memories')
+    
+    print("✅ Removed ix_memories_user_active_created")
@@ -0,0 +1,43 @@
+"""Database-side now() defaults for emotion/personality timestamps
+
+Revision ID: 016_timestamp_server_defaults
+Revises: 015_user_active_created_index
+Create Date: 2024-01-26 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '016_timestamp_server_defaults'
+down_revision = '015_user_active_created_index'
+branch_labels = None
+depends_on = None
+
+# Columns that 003/004 created with a Python-side default only (no DEFAULT in the table)
+TIMESTAMP_COLUMNS = [
+    ('emotion_history', 'detected_at'),
+    ('personality_profiles', 'created_at'),
+    ('personality_profiles', 'updated_at'),
+    ('relationship_state', 'first_interaction'),
+    ('relationship_state', 'last_interaction'),
+    ('relationship_state', 'updated_at'),
+]
+
+
+def upgrade():
+    """Set DEFAULT now() on timestamp columns (metadata-only change)."""
+    
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(table, column, server_default=sa.func.now())
+    
+    print("✅ Added now() server defaults to emotion/personality timestamps")
+
+
+def downgrade():
+    """Drop the now() server defaults."""
+    
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(table, column, server_default=None)
+    
+    print("✅ Removed now() server defaults")
@@ -0,0 +1,37 @@
+"""GIN index on emotion_history.indicators
+
+Revision ID: 017_emotion_indicators_gin
+Revises: 016_timestamp_server_defaults
+Create Date: 2024-01-26 12:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = '017_emotion_indicators_gin'
+down_revision = '016_timestamp_server_defaults'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add jsonb_path_ops GIN index for indicator containment queries."""
+    
+    # jsonb_path_ops: smaller and faster than jsonb_ops, supports @> only
+    op.create_index(
+        'ix_emotion_history_indicators_gin',
+        'emotion_history',
+        ['indicators'],
+        postgresql_using='gin',
+        postgresql_ops={'indicators': 'jsonb_path_ops'}
+    )
+    
+    print("✅ Added GIN index on emotion_history.indicators")
+
+
+def downgrade():
+    """Remove the indicators GIN index."""
+    
+    op.drop_index('ix_emotion_history_indicators_gin', table_name='emotion_history')
+    
+    print("✅ Removed GIN index on emotion_history.indicators")
@@ -0,0 +1,46 @@
+"""BRIN indexes on emotion_history / goal_progress timestamps
+
+Revision ID: 018_time_series_brin_indexes
+Revises: 017_emotion_indicators_gin
+Create Date: 2024-01-27 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = '018_time_series_brin_indexes'
+down_revision = '017_emotion_indicators_gin'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add BRIN indexes on the append-only timestamp columns."""
+    
+    # Rows arrive in time order (and now carry time-ordered UUIDv7 keys), so
+    # a BRIN summary per 32 pages is enough to prune time-range scans
+    op.create_index(
+        'ix_emotion_history_detected_at_brin',
+        'emotion_history',
+        ['detected_at'],
+        postgresql_using='brin',
+        postgresql_with={'pages_per_range': 32}
+    )
+    op.create_index(
+        'ix_goal_progress_created_at_brin',
+        'goal_progress',
+        ['created_at'],
+        postgresql_using='brin',
+        postgresql_with={'pages_per_range': 32}
+    )
+    
+    print("✅ Added BRIN indexes on emotion_history.detected_at and goal_progress.created_at")
+
+
+def downgrade():
+    """Remove the BRIN indexes."""
+    
+    op.drop_index('ix_goal_progress_created_at_brin', table_name='goal_progress')
+    op.drop_index('ix_emotion_history_detected_at_brin', table_name='emotion_history')
+    
+    print("✅ Removed BRIN indexes on emotion_history / goal_progress")
@@ -0,0 +1,60 @@
+"""Replace single-column goal indexes with user-leading composites
+
+Revision ID: 019_goal_composite_indexes
+Revises: 018_time_series_brin_indexes
+Create Date: 2024-01-27 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '019_goal_composite_indexes'
+down_revision = '018_time_series_brin_indexes'
+branch_labels = None
+depends_on = None
+
+# Indexes 006 used to create, superseded by the composites below
+# (IF [NOT] EXISTS: databases created from the current 006 already match)
+SUPERSEDED_INDEXES = [
+    ('ix_goals_user_id', 'goals', ['user_id']),
+    ('ix_goals_status', 'goals', ['status']),
+    ('ix_goals_category', 'goals', ['category']),
+    ('ix_goal_progress_user_id', 'goal_progress', ['user_id']),
+    ('ix_goal_progress_created_at', 'goal_progress', ['created_at']),
+]
+
+
+def upgrade():
+    """Create the composite indexes, then drop the single-column ones."""
+    
+    op.create_index(
+        'ix_goals_user_status_category', 'goals', ['user_id', 'status', 'category'],
+        if_not_exists=True
+    )
+    op.create_index(
+        'ix_goals_user_last_mentioned', 'goals', ['user_id', sa.text('last_mentioned_at DESC')],
+        if_not_exists=True
+    )
+    op.create_index(
+        'ix_goal_progress_user_created', 'goal_progress', ['user_id', sa.text('created_at DESC')],
+        if_not_exists=True
+    )
+    
+    for name, table, _ in SUPERSEDED_INDEXES:
+        op.drop_index(name, table_name=table, if_exists=True)
+    
+    print("✅ Replaced single-column goal indexes with composite indexes")
+
+
+def downgrade():
+    """Restore the single-column indexes."""
+    
+    for name, table, columns in SUPERSEDED_INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+    
+    op.drop_index('ix_goal_progress_user_created', table_name='goal_progress')
+    op.drop_index('ix_goals_user_last_mentioned', table_name='goals')
+    op.drop_index('ix_goals_user_status_category', table_name='goals')
+    
+    print("✅ Restored single-column goal indexes")
@@ -0,0 +1,121 @@
+"""Int8 scalar-quantized copy of memory embeddings
+
+Revision ID: 020_memory_embedding_int8
+Revises: 019_goal_composite_indexes
+Create Date: 2024-01-28 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '020_memory_embedding_int8'
+down_revision = '019_goal_composite_indexes'
+branch_labels = None
+depends_on = None
+
+
+# Rows per backfill batch
+BACKFILL_BATCH_SIZE = 20000
+
+
+def upgrade():
+    """Add int8 embedding codes with per-vector scale/offset, maintained by a trigger, and backfill them."""
+    
+    # Idempotent throughout: the backfill below commits this DDL when its
+    # autocommit block starts, so a failed backfill must be re-runnable
+    op.execute("""
+        ALTER TABLE memories
+            ADD COLUMN IF NOT EXISTS embedding_i8 BYTEA,
+            ADD COLUMN IF NOT EXISTS embedding_scale FLOAT,
+            ADD COLUMN IF NOT EXISTS embedding_offset FLOAT
+    """)
+    
+    # Derived from the stored (normalized, fp16) embedding in Postgres, so
+    # every write path - ORM, Core or raw SQL - keeps the copy in step.
+    # Same scheme as app.utils.quantization.quantize_int8: code = round(u) - 128
+    # with u = (x - min) / (max - min) * 255; its two's-complement byte is round(u) # 128
+    op.execute("""
+        CREATE OR REPLACE FUNCTION memories_quantize_embedding() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            lo real;
+            hi real;
+        BEGIN
+            IF NEW.embedding IS NULL THEN
+                NEW.embedding_i8 := NULL;
+                NEW.embedding_scale := NULL;
+                NEW.embedding_offset := NULL;
+                RETURN NEW;
+            END IF;
+            
+            SELECT min(x), max(x) INTO lo, hi FROM unnest(NEW.embedding::real[]) AS x;
+            
+            SELECT decode(string_agg(
+                       lpad(to_hex(
+                           CASE WHEN hi > lo
+                                THEN round((e.x - lo) / (hi - lo) * 255)::int
+                                ELSE 0
+                           END # 128
+                       ), 2, '0'),
+                       '' ORDER BY e.ord
+                   ), 'hex')
+            INTO NEW.embedding_i8
+            FROM unnest(NEW.embedding::real[]) WITH ORDINALITY AS e(x, ord);
+            
+            NEW.embedding_scale := (hi - lo) / 255;
+            NEW.embedding_offset := lo;
+            RETURN NEW;
+        END
+        $$
+    """)
+    op.execute("DROP TRIGGER IF EXISTS trg_memories_quantize_embedding ON memories")
+    op.execute("""
+        CREATE TRIGGER trg_memories_quantize_embedding
+        BEFORE INSERT OR UPDATE OF embedding ON memories
+        FOR EACH ROW EXECUTE FUNCTION memories_quantize_embedding()
+    """)
+    
+    # Backfill through the trigger in keyset batches, each committed on its
+    # own so locks and WAL stay bounded; rows a previous run already
+    # backfilled are skipped
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        bind.execute(sa.text("SET synchronous_commit = off"))
+        try:
+            last_id = '00000000-0000-0000-0000-000000000000'
+            while last_id is not None:
+                last_id = bind.execute(
+                    sa.text("""
+                        WITH batch AS (
+                            SELECT id FROM memories
+                            WHERE id > CAST(:last_id AS uuid)
+                            ORDER BY id
+                            LIMIT :batch_size
+                        ), updated AS (
+                            UPDATE memories m
+                            SET embedding = m.embedding
+                            FROM batch b
+                            WHERE m.id = b.id AND m.embedding_i8 IS NULL
+                        )
+                        SELECT id FROM batch ORDER BY id DESC LIMIT 1
+                    """),
+                    {"last_id": last_id, "batch_size": BACKFILL_BATCH_SIZE}
+                ).scalar()
+        finally:
+            # The connection goes back to the pool either way
+            bind.execute(sa.text("RESET synchronous_commit"))
+    
+    print("✅ Added int8-quantized memory embeddings")
+
+
+def downgrade():
+    """Drop the int8 embedding trigger and columns."""
+    
+    op.execute("DROP TRIGGER IF EXISTS trg_memories_quantize_embedding ON memories")
+    op.execute("DROP FUNCTION IF EXISTS memories_quantize_embedding()")
+    op.drop_column('memories', 'embedding_offset')
+    op.drop_column('memories', 'embedding_scale')
+    op.drop_column('memories', 'embedding_i8')
+    
+    print("✅ Removed int8-quantized memory embeddings")
@@ -0,0 +1,49 @@
+"""Partial importance indexes for active-memory recall
+
+Revision ID: 021_memory_importance_indexes
+Revises: 020_memory_embedding_int8
+Create Date: 2024-01-28 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '021_memory_importance_indexes'
+down_revision = '020_memory_embedding_int8'
+branch_labels = None
+depends_on = None
+
+# (name, columns): all partial on is_active
+IMPORTANCE_INDEXES = [
+    ('ix_memories_user_active_importance', ['user_id', sa.text('importance DESC')]),
+    ('ix_memories_user_personality_active_importance', ['user_id', 'personality_id', sa.text('importance DESC')]),
+]
+
+
+def upgrade():
+    """Add (user_id[, personality_id], importance DESC) WHERE is_active indexes."""
+    
+    # WHERE user_id = ? AND is_active ORDER BY importance DESC LIMIT k becomes
+    # an index range scan instead of scan + sort; built concurrently so
+    # memory writes are not blocked
+    with op.get_context().autocommit_block():
+        for name, columns in IMPORTANCE_INDEXES:
+            op.create_index(
+                name, 'memories', columns,
+                postgresql_where=sa.text('is_active'),
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+    
+    print("✅ Added partial importance indexes on active memories")
+
+
+def downgrade():
+    """Remove the partial importance indexes."""
+    
+    with op.get_context().autocommit_block():
+        for name, _ in IMPORTANCE_INDEXES:
+            op.drop_index(name, table_name='memories', postgresql_concurrently=True, if_exists=True)
+    
+    print("✅ Removed partial importance indexes on active memories")
@@ -0,0 +1,62 @@
+"""Collapse personality_id indexes into one personality-leading composite
+
+Revision ID: 022_personality_composite_indexes
+Revises: 021_memory_importance_indexes
+Create Date: 2024-01-29 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = '022_personality_composite_indexes'
+down_revision = '021_memory_importance_indexes'
+branch_labels = None
+depends_on = None
+
+# (table, composite replacing both, superseded indexes)
+# IF [NOT] EXISTS: databases migrated while 007 built these itself already match
+PERSONALITY_INDEXES = [
+    ('conversations', 'ix_conversations_personality_user', [
+        ('ix_conversations_personality_id', ['personality_id']),
+        ('ix_conversations_user_personality', ['user_id', 'personality_id']),
+    ]),
+    ('memories', 'ix_memories_personality_user', [
+        ('ix_memories_personality_id', ['personality_id']),
+        ('ix_memories_user_personality', ['user_id', 'personality_id']),
+    ]),
+]
+
+
+def upgrade():
+    """Replace (personality_id) + (user_id, personality_id) with (personality_id, user_id)."""
+    
+    # (personality_id, user_id) answers user+personality equality lookups and
+    # the personality_id-only ON DELETE CASCADE scans; user-only queries keep
+    # their own user_id index. One btree fewer per write on each table.
+    with op.get_context().autocommit_block():
+        for table, name, superseded in PERSONALITY_INDEXES:
+            op.create_index(
+                name, table, ['personality_id', 'user_id'],
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+            for old_name, _ in superseded:
+                op.drop_index(old_name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    
+    print("✅ Collapsed personality_id indexes on conversations and memories")
+
+
+def downgrade():
+    """Restore the separate personality_id indexes."""
+    
+    with op.get_context().autocommit_block():
+        for table, name, superseded in PERSONALITY_INDEXES:
+            for old_name, columns in superseded:
+                op.create_index(
+                    old_name, table, columns,
+                    postgresql_concurrently=True,
+                    if_not_exists=True
+                )
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    
+    print("✅ Restored separate personality_id indexes")
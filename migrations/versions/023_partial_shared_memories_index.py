@@ -0,0 +1,47 @@
+"""Partial index for shared memories
+
+Revision ID: 023_partial_shared_memories_index
+Revises: 022_personality_composite_indexes
+Create Date: 2024-01-29 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '023_partial_shared_memories_index'
+down_revision = '022_personality_composite_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Replace the full is_shared index with (user_id) WHERE is_shared."""
+    
+    # is_shared is false for almost every row: the full boolean index was
+    # large and never selective. The partial one holds only shared rows and
+    # is untouched by writes of ordinary memories.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_memories_user_shared', 'memories', ['user_id'],
+            postgresql_where=sa.text('is_shared'),
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        op.drop_index('ix_memories_is_shared', table_name='memories', postgresql_concurrently=True, if_exists=True)
+    
+    print("✅ Replaced ix_memories_is_shared with a partial index")
+
+
+def downgrade():
+    """Restore the full is_shared index."""
+    
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_memories_is_shared', 'memories', ['is_shared'],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        op.drop_index('ix_memories_user_shared', table_name='memories', postgresql_concurrently=True, if_exists=True)
+    
+    print("✅ Restored full ix_memories_is_shared index")
@@ -0,0 +1,50 @@
+"""Promote the per-user unique indexes to named UNIQUE constraints
+
+Revision ID: 024_named_unique_constraints
+Revises: 023_partial_shared_memories_index
+Create Date: 2024-01-30 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = '024_named_unique_constraints'
+down_revision = '023_partial_shared_memories_index'
+branch_labels = None
+depends_on = None
+
+# (table, columns, existing unique index, constraint name)
+UNIQUE_CONSTRAINTS = [
+    ('personality_profiles', ['user_id', 'personality_name'],
+     'ix_personality_profiles_user_personality', 'uq_personality_profiles_user_personality'),
+    ('relationship_state', ['user_id', 'personality_id'],
+     'ix_relationship_state_user_personality', 'uq_relationship_state_user_personality'),
+]
+
+
+def upgrade():
+    """Attach the existing unique indexes as constraints (no rescan)."""
+    
+    # Databases migrated while 007 built the constraints already have them;
+    # the others (007 as released) have only the unique index, which USING INDEX adopts as-is
+    for table, _, index_name, constraint_name in UNIQUE_CONSTRAINTS:
+        op.execute(f"""
+            DO $$
+            BEGIN
+                IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = '{constraint_name}') THEN
+                    ALTER TABLE {table} ADD CONSTRAINT {constraint_name} UNIQUE USING INDEX {index_name};
+                END IF;
+            END $$;
+        """)
+    
+    print("✅ Promoted per-user unique indexes to UNIQUE constraints")
+
+
+def downgrade():
+    """Turn the constraints back into plain unique indexes."""
+    
+    for table, columns, index_name, constraint_name in UNIQUE_CONSTRAINTS:
+        op.drop_constraint(constraint_name, table, type_='unique')
+        op.create_index(index_name, table, columns, unique=True)
+    
+    print("✅ Reverted UNIQUE constraints to unique indexes")
@@ -5,9 +5,9 @@ User Data Inspector - Show all database information for a specific user
 
 import asyncio
 import sys
-from sqlalchemy import select, func, text
+from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, load_only
 from datetime import datetime
 from uuid import UUID
 
@@ -41,6 +41,25 @@ class Colors:
     END = '\033[0m'
 
 
+# Display lookup tables, built once at import rather than per call/row
+EMOTION_ICONS = {
+    'happy': '😊', 'sad': '😢', 'angry': '😠', 'anxious': '😰',
+    'excited': '🤩', 'grateful': '🙏', 'frustrated': '😤',
+    'lonely': '😔', 'proud': '😌', 'surprised': '😲',
+    'disappointed': '😞', 'confused': '😕', 'content': '😌',
+    'overwhelmed': '😵', 'hopeful': '🤞', 'bored': '😑'
+}
+
+# Indexed by a 0..1 score in tenths (see score_level)
+BARS = ["█" * i for i in range(11)]
+IMPORTANCE_COLORS = [Colors.RED] * 5 + [Colors.YELLOW] * 2 + [Colors.GREEN] * 4
+
+
+def score_level(score: float) -> int:
+    """Map a 0..1 score to a BARS / IMPORTANCE_COLORS index (0-10)"""
+    return max(0, min(10, int(score * 10)))
+
+
 def print_header(text: str, color: str = Colors.CYAN):
     """Print a formatted header"""
     print(f"\n{color}{Colors.BOLD}{'=' * 80}{Colors.END}")
@@ -115,6 +134,22 @@ async def show_user_data(external_user_id: str):
     engine = create_async_engine(postgres_url, echo=False)
     async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
     
+    async def query(stmt, extract):
+        """Run one statement on its own session (an AsyncSession must not be shared across tasks)."""
+        async with async_session() as query_session:
+            return extract(await query_session.execute(stmt))
+    
+    async def database_size():
+        """Pretty-printed database size, or the exception that prevented reading it."""
+        try:
+            # current_database(): whatever database the URL points at
+            return await query(
+                select(func.pg_size_pretty(func.pg_database_size(func.current_database()))),
+                lambda result: result.scalar()
+            )
+        except Exception as e:
+            return e
+    
     async with async_session() as session:
         
         # ==========================================
@@ -137,56 +172,202 @@ async def show_user_data(external_user_id: str):
         print_field("Created At", user.created_at)
         print_field("Last Active", user.last_active)
         
+        # ==========================================
+        # FETCH EVERYTHING ELSE CONCURRENTLY
+        # ==========================================
+        # Every query below depends only on user.id, so they are dispatched
+        # together (one pooled connection each) and the total wait is the
+        # slowest query rather than the sum of round-trips
+        (
+            total_conversations,
+            conversations,
+            type_counts,
+            memories,
+            superseded_count,
+            relationship,
+            personality,
+            emotions,
+            total_emotions,
+            status_counts,
+            active_goals,
+            completed_goals,
+            db_size,
+        ) = await asyncio.gather(
+            # Only the rows we display leave the database; totals are counted in SQL
+            query(
+                select(func.count()).select_from(ConversationModel)
+                .where(ConversationModel.user_id == user.id),
+                lambda result: result.scalar()
+            ),
+            query(
+                select(ConversationModel.id, ConversationModel.created_at, ConversationModel.updated_at)
+                .where(ConversationModel.user_id == user.id)
+                .order_by(ConversationModel.created_at.desc())
+                .limit(5),
+                lambda result: result.all()
+            ),
+            # Count by type (server-side histogram; its sum is the total)
+            query(
+                select(MemoryModel.memory_type, func.count())
+                .where(MemoryModel.user_id == user.id)
+                .where(MemoryModel.is_active == True)
+                .group_by(MemoryModel.memory_type),
+                lambda result: dict(result.all())
+            ),
+            # Top 10 only, and only the displayed columns (no embedding on the wire)
+            query(
+                select(
+                    MemoryModel.memory_type,
+                    MemoryModel.importance,
+                    MemoryModel.content,
+                    MemoryModel.created_at,
+                    MemoryModel.superseded_by
+                )
+                .where(MemoryModel.user_id == user.id)
+                .where(MemoryModel.is_active == True)
+                .order_by(MemoryModel.importance.desc())
+                .limit(10),
+                lambda result: result.all()
+            ),
+            # Superseded/inactive memories count
+            query(
+                select(func.count()).select_from(MemoryModel)
+                .where(MemoryModel.user_id == user.id)
+                .where(MemoryModel.is_active == False),
+                lambda result: result.scalar()
+            ),
+            # Entity queries load only the printed attributes (load_only), so
+            # wide text/JSONB columns we never show stay in the database
+            query(
+                select(RelationshipStateModel)
+                .options(load_only(
+                    RelationshipStateModel.total_messages,
+                    RelationshipStateModel.relationship_depth_score,
+                    RelationshipStateModel.trust_level,
+                    RelationshipStateModel.days_known,
+                    RelationshipStateModel.first_interaction,
+                    RelationshipStateModel.last_interaction,
+                    RelationshipStateModel.positive_reactions,
+                    RelationshipStateModel.negative_reactions,
+                    RelationshipStateModel.milestones
+                ))
+                .where(RelationshipStateModel.user_id == user.id),
+                lambda result: result.scalar_one_or_none()
+            ),
+            query(
+                select(PersonalityProfileModel)
+                .options(load_only(
+                    PersonalityProfileModel.version,
+                    PersonalityProfileModel.archetype,
+                    PersonalityProfileModel.relationship_type,
+                    PersonalityProfileModel.humor_level,
+                    PersonalityProfileModel.formality_level,
+                    PersonalityProfileModel.enthusiasm_level,
+                    PersonalityProfileModel.empathy_level,
+                    PersonalityProfileModel.directness_level,
+                    PersonalityProfileModel.curiosity_level,
+                    PersonalityProfileModel.supportiveness_level,
+                    PersonalityProfileModel.playfulness_level,
+                    PersonalityProfileModel.asks_questions,
+                    PersonalityProfileModel.uses_examples,
+                    PersonalityProfileModel.shares_opinions,
+                    PersonalityProfileModel.challenges_user,
+                    PersonalityProfileModel.celebrates_wins,
+                    PersonalityProfileModel.backstory,
+                    PersonalityProfileModel.speaking_style,
+                    PersonalityProfileModel.custom_instructions,
+                    PersonalityProfileModel.updated_at
+                ))
+                .where(PersonalityProfileModel.user_id == user.id),
+                lambda result: result.scalar_one_or_none()
+            ),
+            query(
+                select(EmotionHistoryModel)
+                .options(load_only(
+                    EmotionHistoryModel.emotion,
+                    EmotionHistoryModel.confidence,
+                    EmotionHistoryModel.intensity,
+                    EmotionHistoryModel.indicators,
+                    EmotionHistoryModel.message_snippet,
+                    EmotionHistoryModel.detected_at
+                ))
+                .where(EmotionHistoryModel.user_id == user.id)
+                .order_by(EmotionHistoryModel.detected_at.desc())
+                .limit(10),
+                lambda result: result.scalars().all()
+            ),
+            query(
+                select(func.count()).select_from(EmotionHistoryModel)
+                .where(EmotionHistoryModel.user_id == user.id),
+                lambda result: result.scalar()
+            ),
+            # Counts per status in SQL; fetch all active goals but only the 5 latest completed
+            query(
+                select(GoalModel.status, func.count())
+                .where(GoalModel.user_id == user.id)
+                .group_by(GoalModel.status),
+                lambda result: dict(result.all())
+            ),
+            query(
+                select(GoalModel)
+                .options(load_only(
+                    GoalModel.title,
+                    GoalModel.description,
+                    GoalModel.category,
+                    GoalModel.progress_percentage,
+                    GoalModel.mention_count,
+                    GoalModel.created_at,
+                    GoalModel.target_date,
+                    GoalModel.last_mentioned_at
+                ))
+                .where(GoalModel.user_id == user.id, GoalModel.status == 'active')
+                .order_by(GoalModel.created_at.desc()),
+                lambda result: result.scalars().all()
+            ),
+            query(
+                select(GoalModel)
+                .options(load_only(GoalModel.title, GoalModel.completed_at))
+                .where(GoalModel.user_id == user.id, GoalModel.status == 'completed')
+                .order_by(GoalModel.created_at.desc())
+                .limit(5),
+                lambda result: result.scalars().all()
+            ),
+            database_size(),
+        )
+        
         # ==========================================
         # 2. GET CONVERSATIONS
         # ==========================================
         print_section("💬 Conversations")
         
-        result = await session.execute(
-            select(ConversationModel)
-            .where(ConversationModel.user_id == user.id)
-            .order_by(ConversationModel.created_at.desc())
-        )
-        conversations = result.scalars().all()
-        
-        print(f"{Colors.BOLD}Total Conversations:{Colors.END} {len(conversations)}")
+        print(f"{Colors.BOLD}Total Conversations:{Colors.END} {total_conversations}")
         
-        for i, conv in enumerate(conversations[:5], 1):  # Show first 5
+        for i, conv in enumerate(conversations, 1):  # Show first 5
             print(f"\n  {Colors.CYAN}Conversation {i}:{Colors.END}")
             print_field("ID", conv.id, indent=1)
             print_field("Created", conv.created_at, indent=1)
             print_field("Updated", conv.updated_at, indent=1)
         
-        if len(conversations) > 5:
-            print(f"\n  {Colors.YELLOW}... and {len(conversations) - 5} more{Colors.END}")
+        if total_conversations > 5:
+            print(f"\n  {Colors.YELLOW}... and {total_conversations - 5} more{Colors.END}")
         
         # ==========================================
         # 3. GET MEMORIES
         # ==========================================
         print_section("🧠 Long-term Memories")
         
-        result = await session.execute(
-            select(MemoryModel)
-            .where(MemoryModel.user_id == user.id)
-            .where(MemoryModel.is_active == True)
-            .order_by(MemoryModel.importance.desc())
-        )
-        memories = result.scalars().all()
+        total_memories = sum(type_counts.values())
         
-        # Count by type
-        type_counts = {}
-        for mem in memories:
-            type_counts[mem.memory_type] = type_counts.get(mem.memory_type, 0) + 1
-        
-        print(f"{Colors.BOLD}Total Active Memories:{Colors.END} {len(memories)}")
+        print(f"{Colors.BOLD}Total Active Memories:{Colors.END} {total_memories}")
         print(f"{Colors.BOLD}By Type:{Colors.END}")
         for mem_type, count in sorted(type_counts.items()):
             print(f"  • {mem_type}: {count}")
         
         print(f"\n{Colors.BOLD}Top 10 Most Important Memories:{Colors.END}")
-        for i, mem in enumerate(memories[:10], 1):
-            importance_bar = "█" * int(mem.importance * 10)
-            importance_color = Colors.GREEN if mem.importance >= 0.7 else Colors.YELLOW if mem.importance >= 0.5 else Colors.RED
+        for i, mem in enumerate(memories, 1):
+            level = score_level(mem.importance)
+            importance_bar = BARS[level]
+            importance_color = IMPORTANCE_COLORS[level]
             
             print(f"\n  {Colors.CYAN}{i}. [{mem.memory_type}]{Colors.END} {importance_color}{importance_bar} {mem.importance:.2f}{Colors.END}")
             print(f"     {Colors.BOLD}\"{mem.content[:80]}...\"{Colors.END}" if len(mem.content) > 80 else f"     {Colors.BOLD}\"{mem.content}\"{Colors.END}")
@@ -194,13 +375,6 @@ async def show_user_data(external_user_id: str):
             if mem.superseded_by:
                 print_field("Superseded by", mem.superseded_by, indent=2)
         
-        # Show superseded memories count
-        result = await session.execute(
-            select(func.count()).select_from(MemoryModel)
-            .where(MemoryModel.user_id == user.id)
-            .where(MemoryModel.is_active == False)
-        )
-        superseded_count = result.scalar()
         if superseded_count > 0:
             print(f"\n  {Colors.YELLOW}📦 {superseded_count} superseded/inactive memories{Colors.END}")
         
@@ -209,11 +383,6 @@ async def show_user_data(external_user_id: str):
         # ==========================================
         print_section("💕 Relationship State")
         
-        result = await session.execute(
-            select(RelationshipStateModel).where(RelationshipStateModel.user_id == user.id)
-        )
-        relationship = result.scalar_one_or_none()
-        
         if relationship:
             print_field("Total Messages", relationship.total_messages)
             print_field("Relationship Depth Score", f"{relationship.relationship_depth_score:.1f}/10")
@@ -240,12 +409,6 @@ async def show_user_data(external_user_id: str):
         # ==========================================
         print_section("🎭 Personality Profile")
         
-        result = await session.execute(
-            select(PersonalityProfileModel)
-            .where(PersonalityProfileModel.user_id == user.id)
-        )
-        personality = result.scalar_one_or_none()
-        
         if personality:
             print_field("Version", personality.version)
             print_field("Archetype", personality.archetype)
@@ -300,28 +463,12 @@ async def show_user_data(external_user_id: str):
         # ==========================================
         print_section("😊 Emotion History")
         
-        result = await session.execute(
-            select(EmotionHistoryModel)
-            .where(EmotionHistoryModel.user_id == user.id)
-            .order_by(EmotionHistoryModel.detected_at.desc())
-            .limit(10)
-        )
-        emotions = result.scalars().all()
-        
         if emotions:
             print(f"{Colors.BOLD}Recent Emotions (last 10):{Colors.END}")
             
-            emotion_icons = {
-                'happy': '😊', 'sad': '😢', 'angry': '😠', 'anxious': '😰',
-                'excited': '🤩', 'grateful': '🙏', 'frustrated': '😤',
-                'lonely': '😔', 'proud': '😌', 'surprised': '😲',
-                'disappointed': '😞', 'confused': '😕', 'content': '😌',
-                'overwhelmed': '😵', 'hopeful': '🤞', 'bored': '😑'
-            }
-            
             for i, emotion in enumerate(emotions, 1):
-                icon = emotion_icons.get(emotion.emotion, '😐')
-                confidence_bar = "█" * int(emotion.confidence * 10)
+                icon = EMOTION_ICONS.get(emotion.emotion, '😐')
+                confidence_bar = BARS[score_level(emotion.confidence)]
                 print(f"\n  {i}. {icon} {Colors.BOLD}{emotion.emotion}{Colors.END} {Colors.CYAN}{confidence_bar}{Colors.END} ({emotion.confidence:.0%})")
                 print_field("Intensity", emotion.intensity, indent=2)
                 print_field("Detected", emotion.detected_at, indent=2)
@@ -339,19 +486,11 @@ async def show_user_data(external_user_id: str):
         # ==========================================
         print_section("🎯 Goals & Progress")
         
-        result = await session.execute(
-            select(GoalModel)
-            .where(GoalModel.user_id == user.id)
-            .order_by(GoalModel.created_at.desc())
-        )
-        goals = result.scalars().all()
+        total_goals = sum(status_counts.values())
         
-        if goals:
-            active_goals = [g for g in goals if g.status == 'active']
-            completed_goals = [g for g in goals if g.status == 'completed']
-            
-            print(f"{Colors.BOLD}Active Goals:{Colors.END} {len(active_goals)}")
-            print(f"{Colors.BOLD}Completed Goals:{Colors.END} {len(completed_goals)}")
+        if total_goals:
+            print(f"{Colors.BOLD}Active Goals:{Colors.END} {status_counts.get('active', 0)}")
+            print(f"{Colors.BOLD}Completed Goals:{Colors.END} {status_counts.get('completed', 0)}")
             
             if active_goals:
                 print(f"\n{Colors.BOLD}Active Goals:{Colors.END}")
@@ -372,7 +511,7 @@ async def show_user_data(external_user_id: str):
             
             if completed_goals:
                 print(f"\n{Colors.GREEN}{Colors.BOLD}✓ Completed Goals:{Colors.END}")
-                for goal in completed_goals[:5]:
+                for goal in completed_goals:
                     completed_date = f" ({goal.completed_at.strftime('%Y-%m-%d')})" if goal.completed_at else ""
                     print(f"  • {goal.title}{completed_date}")
         else:
@@ -383,32 +522,27 @@ async def show_user_data(external_user_id: str):
         # ==========================================
         print_header("📊 SUMMARY", Colors.GREEN)
         
-        print(f"{Colors.BOLD}Data Overview:{Colors.END}")
-        print(f"  • {Colors.CYAN}Conversations:{Colors.END} {len(conversations)}")
-        print(f"  • {Colors.CYAN}Active Memories:{Colors.END} {len(memories)}")
-        print(f"  • {Colors.CYAN}Emotions Recorded:{Colors.END} {len(emotions)}")
-        print(f"  • {Colors.CYAN}Goals:{Colors.END} {len(goals)}")
-        print(f"  • {Colors.CYAN}Personality Version:{Colors.END} {personality.version if personality else 'N/A'}")
+        # Collected and written in one go instead of a write per line
+        lines = [
+            f"{Colors.BOLD}Data Overview:{Colors.END}",
+            f"  • {Colors.CYAN}Conversations:{Colors.END} {total_conversations}",
+            f"  • {Colors.CYAN}Active Memories:{Colors.END} {total_memories}",
+            f"  • {Colors.CYAN}Emotions Recorded:{Colors.END} {total_emotions}",
+            f"  • {Colors.CYAN}Goals:{Colors.END} {total_goals}",
+            f"  • {Colors.CYAN}Personality Version:{Colors.END} {personality.version if personality else 'N/A'}",
+        ]
         if relationship:
-            print(f"  • {Colors.CYAN}Total Messages:{Colors.END} {relationship.total_messages}")
-            print(f"  • {Colors.CYAN}Days Known:{Colors.END} {relationship.days_known}")
+            lines.append(f"  • {Colors.CYAN}Total Messages:{Colors.END} {relationship.total_messages}")
+            lines.append(f"  • {Colors.CYAN}Days Known:{Colors.END} {relationship.days_known}")
         
         # Database size info
-        try:
-            # Extract database name from connection URL
-            import re
-            db_name_match = re.search(r'/([^/]+)(?:\?|$)', str(engine.url))
-            db_name = db_name_match.group(1) if db_name_match else 'ai_companion'
-            
-            result = await session.execute(
-                text(f"SELECT pg_size_pretty(pg_database_size('{db_name}'))")
-            )
-            db_size = result.scalar()
-            print(f"\n{Colors.BOLD}Database Size:{Colors.END} {db_size}")
-        except Exception as e:
-            print(f"\n{Colors.YELLOW}Database size unavailable:{Colors.END} {e}")
+        if isinstance(db_size, Exception):
+            lines.append(f"\n{Colors.YELLOW}Database size unavailable:{Colors.END} {db_size}")
+        else:
+            lines.append(f"\n{Colors.BOLD}Database Size:{Colors.END} {db_size}")
         
-        print(f"\n{Colors.GREEN}✅ Data inspection complete!{Colors.END}\n")
+        lines.append(f"\n{Colors.GREEN}✅ Data inspection complete!{Colors.END}\n")
+        sys.stdout.write("\n".join(lines) + "\n")
     
     await engine.dispose()
 
@@ -2,17 +2,31 @@
 """Test script for content routing system."""
 
 import asyncio
+import io
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from uuid import uuid4
 
 # Add parent directory to path
 sys.path.insert(0, '/home/bean12/Desktop/AI Service')
 
-from app.services.content_classifier import get_content_classifier, ContentLabel
+from app.services.content_classifier import get_content_classifier, ContentLabel, ClassificationResult
 from app.services.content_router import get_content_router, ModelRoute
 from app.services.session_manager import get_session_manager
 from app.services.content_audit_logger import get_audit_logger
 
+# Singletons resolved once for the whole script
+_CLASSIFIER = get_content_classifier()
+_ROUTER = get_content_router()
+_SESSIONS = get_session_manager()
+_AUDIT = get_audit_logger()
+
+# Conversation/user ids for the session and audit tests, generated up front
+# (next() on a list iterator is atomic, so concurrent tests can share it)
+_UUID_POOL = [uuid4() for _ in range(16)]
+_uuid_iter = iter(_UUID_POOL)
+
 
 def print_header(text: str):
     """Print a formatted header."""
@@ -33,7 +47,7 @@ def test_normalization():
     """Test text normalization."""
     print_header("Testing Normalization")
     
-    classifier = get_content_classifier()
+    normalize = _CLASSIFIER._normalize_text
     
     test_cases = [
         ("s3x", "sex", "Leetspeak"),
@@ -43,7 +57,7 @@ def test_normalization():
     ]
     
     for original, expected_word, test_type in test_cases:
-        normalized = classifier._normalize_text(original)
+        normalized = normalize(original)
         passed = expected_word in normalized
         print_result(
             f"{test_type}: '{original}' → '{normalized}'",
@@ -56,8 +70,6 @@ def test_classification():
     """Test content classification."""
     print_header("Testing Classification")
     
-    classifier = get_content_classifier()
-    
     test_cases = [
         ("How do I learn Python?", ContentLabel.SAFE, "Safe content"),
         ("You're so charming and attractive", ContentLabel.SUGGESTIVE, "Suggestive content"),
@@ -70,8 +82,10 @@ def test_classification():
         ("I have a medical question about anatomy", ContentLabel.SAFE, "Clinical context"),
     ]
     
-    for text, expected_label, description in test_cases:
-        result = classifier.classify(text)
+    # One batch call for all cases
+    results = _CLASSIFIER.classify_batch([text for text, _, _ in test_cases])
+    
+    for (text, expected_label, description), result in zip(test_cases, results):
         passed = result.label == expected_label
         
         print_result(
@@ -89,8 +103,7 @@ def test_routing():
     """Test content routing."""
     print_header("Testing Routing")
     
-    classifier = get_content_classifier()
-    router = get_content_router()
+    route_for = _ROUTER.route
     
     test_cases = [
         (ContentLabel.SAFE, ModelRoute.NORMAL, "Safe → Normal"),
@@ -103,7 +116,6 @@ def test_routing():
     
     for label, expected_route, description in test_cases:
         # Create mock classification result
-        from app.services.content_classifier import ClassificationResult
         classification = ClassificationResult(
             label=label,
             confidence=0.9,
@@ -112,7 +124,7 @@ def test_routing():
             layer_results={}
         )
         
-        route = router.route(classification)
+        route = route_for(classification)
         passed = route == expected_route
         
         print_result(
@@ -126,11 +138,11 @@ def test_session_management():
     """Test session management."""
     print_header("Testing Session Management")
     
-    session_manager = get_session_manager()
+    session_manager = _SESSIONS
     
     # Create test conversation
-    conversation_id = uuid4()
-    user_id = uuid4()
+    conversation_id = next(_uuid_iter)
+    user_id = next(_uuid_iter)
     
     # Test 1: Initial state
     session = session_manager.get_session(conversation_id, user_id)
@@ -180,9 +192,9 @@ def test_age_verification_flow():
     """Test age verification flow."""
     print_header("Testing Age Verification Flow")
     
-    session_manager = get_session_manager()
-    conversation_id = uuid4()
-    user_id = uuid4()
+    session_manager = _SESSIONS
+    conversation_id = next(_uuid_iter)
+    user_id = next(_uuid_iter)
     
     # Test 1: Explicit content without verification
     session = session_manager.get_session(conversation_id, user_id)
@@ -229,7 +241,8 @@ def test_refusal_handling():
     """Test refusal handling."""
     print_header("Testing Refusal Handling")
     
-    router = get_content_router()
+    should_refuse_route = _ROUTER.should_refuse
+    get_refusal_message = _ROUTER.get_refusal_message
     
     test_cases = [
         (ModelRoute.REFUSAL, "Non-consensual refusal"),
@@ -237,8 +250,8 @@ def test_refusal_handling():
     ]
     
     for route, description in test_cases:
-        should_refuse = router.should_refuse(route)
-        refusal_message = router.get_refusal_message(route)
+        should_refuse = should_refuse_route(route)
+        refusal_message = get_refusal_message(route)
         
         passed = should_refuse and len(refusal_message) > 0
         print_result(
@@ -252,11 +265,9 @@ def test_audit_logging():
     """Test audit logging."""
     print_header("Testing Audit Logging")
     
-    from app.services.content_classifier import ClassificationResult
-    
-    audit_logger = get_audit_logger()
-    conversation_id = uuid4()
-    user_id = uuid4()
+    audit_logger = _AUDIT
+    conversation_id = next(_uuid_iter)
+    user_id = next(_uuid_iter)
     
     # Create test classification
     classification = ClassificationResult(
@@ -294,7 +305,7 @@ def test_system_prompts():
     """Test system prompts."""
     print_header("Testing System Prompts")
     
-    router = get_content_router()
+    get_system_prompt = _ROUTER.get_system_prompt
     
     routes = [
         ModelRoute.NORMAL,
@@ -306,7 +317,7 @@ def test_system_prompts():
     ]
     
     for route in routes:
-        prompt = router.get_system_prompt(route)
+        prompt = get_system_prompt(route)
         passed = len(prompt) > 0
         
         print_result(
@@ -316,21 +327,70 @@ def test_system_prompts():
         )
 
 
+class _ThreadOutput(io.TextIOBase):
+    """sys.stdout stand-in: a thread with a capture buffer writes there."""
+    
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+    
+    def write(self, text):
+        return (getattr(self._local, "buffer", None) or self._stream).write(text)
+    
+    def flush(self):
+        self._stream.flush()
+    
+    def capture(self, test) -> str:
+        """Run test() on this thread and return what it printed."""
+        self._local.buffer = io.StringIO()
+        try:
+            test()
+            return self._local.buffer.getvalue()
+        finally:
+            del self._local.buffer
+
+
 def run_all_tests():
     """Run all tests."""
     print("\n" + "=" * 70)
     print("  CONTENT ROUTING SYSTEM - TEST SUITE")
     print("=" * 70)
     
+    # Independent tests run concurrently; the two that drive the shared
+    # session manager through a flow stay serial. Each test's output is
+    # captured and printed in the usual order.
+    concurrent_tests = [
+        test_normalization,
+        test_classification,
+        test_routing,
+        test_refusal_handling,
+        test_audit_logging,
+        test_system_prompts,
+    ]
+    serial_tests = [test_session_management, test_age_verification_flow]
+    
     try:
-        test_normalization()
-        test_classification()
-        test_routing()
-        test_session_management()
-        test_age_verification_flow()
-        test_refusal_handling()
-        test_audit_logging()
-        test_system_prompts()
+        real_stdout = sys.stdout
+        output = sys.stdout = _ThreadOutput(real_stdout)
+        try:
+            with ThreadPoolExecutor(max_workers=len(concurrent_tests)) as executor:
+                futures = {test: executor.submit(output.capture, test) for test in concurrent_tests}
+                captured = {test: output.capture(test) for test in serial_tests}
+                captured.update({test: future.result() for test, future in futures.items()})
+        finally:
+            sys.stdout = real_stdout
+        
+        for test in (
+            test_normalization,
+            test_classification,
+            test_routing,
+            test_session_management,
+            test_age_verification_flow,
+            test_refusal_handling,
+            test_audit_logging,
+            test_system_prompts,
+        ):
+            print(captured[test], end="")
         
         print("\n" + "=" * 70)
         print("  TEST SUITE COMPLETE")
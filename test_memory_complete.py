@@ -9,28 +9,51 @@ import json
 BASE_URL = "http://localhost:8000"
 
 
-def extract_response(sse_text):
-    """Extract text from SSE response."""
-    response_text = ""
-    for line in sse_text.split('\n'):
-        if line.startswith('data: '):
-            try:
-                data = json.loads(line[6:])
-                if data.get('type') == 'chunk':
-                    response_text += data.get('chunk', '')
-            except:
-                pass
-    return response_text
+# Chunk events (the server's json.dumps puts "type" first), so thinking and
+# done events are skipped without being parsed
+CHUNK_EVENT_PREFIX = 'data: {"type": "chunk"'
+DONE_EVENT_PREFIX = 'data: {"type": "done"'
+
+
+def extract_response(sse_lines):
+    """Extract text from SSE response lines."""
+    return "".join(
+        json.loads(line[6:]).get('chunk', '')
+        for line in sse_lines
+        if line.startswith(CHUNK_EVENT_PREFIX)
+    )
 
 
 async def chat(client, user_id, personality_name, message):
     """Send a chat message."""
-    response = await client.post(
-        f"{BASE_URL}/chat",
+    lines = []
+    async with client.stream(
+        "POST",
+        "/chat",
         headers={"X-User-Id": user_id},
         json={"message": message, "personality_name": personality_name}
-    )
-    return extract_response(response.text)
+    ) as response:
+        async for line in response.aiter_lines():
+            lines.append(line)
+            # Stop at the final event instead of waiting for the body to close
+            if line.startswith(DONE_EVENT_PREFIX):
+                break
+    return extract_response(lines)
+
+
+async def wait_for_memories(client, user_id, min_count, timeout=12.0):
+    """Poll memory status until min_count memories exist (or timeout)."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = await client.get(
+            "/memory/status",
+            headers={"X-User-Id": user_id},
+            params={"min_count": min_count}
+        )
+        if status.status_code == 200 and status.json()["ready"]:
+            return True
+        await asyncio.sleep(0.5)
+    return False
 
 
 async def test_memory():
@@ -40,7 +63,7 @@ async def test_memory():
     
     user_id = f"memtest_{int(time.time())}"
     
-    async with httpx.AsyncClient(timeout=30) as client:
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=httpx.Timeout(30.0, connect=5.0)) as client:
         # Turn 1
         print("\n[Turn 1] User: 'Hi, my name is Alex'")
         resp1 = await chat(client, user_id, "elara", "Hi, my name is Alex")
@@ -56,9 +79,12 @@ async def test_memory():
         resp3 = await chat(client, user_id, "elara", "My favorite color is purple")
         print(f"Elara: {resp3[:80]}...")
         
-        # Wait for background memory extraction
-        print("\n⏳ Waiting 12 seconds for background memory extraction...")
-        await asyncio.sleep(12)
+        # Wait for background memory extraction (polled, 12 seconds at most)
+        print("\n⏳ Waiting for background memory extraction...")
+        if await wait_for_memories(client, user_id, min_count=3):
+            print("✅ Memories stored")
+        else:
+            print("⚠️  Memories not all stored after 12 seconds, continuing")
         
         # Turn 4 - Test recall
         print("\n[Turn 4] User: 'What's my name?'")
@@ -3,7 +3,8 @@
 Comprehensive test for memory features with JWT authentication.
 """
 
-import requests
+import asyncio
+import httpx
 import json
 from datetime import datetime
 
@@ -40,11 +41,11 @@ def print_section(msg):
     print(f"{Colors.BOLD}{Colors.CYAN}{msg}{Colors.RESET}")
     print(f"{Colors.BOLD}{Colors.CYAN}{'='*70}{Colors.RESET}\n")
 
-def test_health():
+async def test_health(client):
     """Test 1: Health check"""
     print_section("TEST 1: Health Check")
     try:
-        response = requests.get(f"{API_URL}/health", timeout=5)
+        response = await client.get("/health")
         data = response.json()
         print_success(f"API is {data['status']}")
         print_info(f"  Version: {data.get('version', 'unknown')}")
@@ -55,7 +56,7 @@ def test_health():
         print_error(f"Health check failed: {e}")
         return False
 
-def test_chat_with_memory_extraction(message):
+async def test_chat_with_memory_extraction(client, message):
     """Test 2: Send message and extract memories"""
     print_section(f"TEST 2: Chat with Memory Extraction")
     print_info(f"Sending: '{message}'")
@@ -66,20 +67,11 @@ def test_chat_with_memory_extraction(message):
             "user_id": USER_ID
         }
         
-        response = requests.post(
-            f"{API_URL}/chat",
-            headers=HEADERS,
-            json=payload,
-            stream=True,
-            timeout=30
-        )
-        
         thinking_steps = []
         response_chunks = []
         
-        for line in response.iter_lines():
-            if line:
-                line_str = line.decode('utf-8')
+        async with client.stream("POST", "/chat", json=payload) as response:
+            async for line_str in response.aiter_lines():
                 if line_str.startswith('data: '):
                     try:
                         data = json.loads(line_str[6:])
@@ -125,16 +117,15 @@ def test_chat_with_memory_extraction(message):
         print_error(f"Chat request failed: {e}")
         return {'success': False, 'error': str(e)}
 
-def test_user_preferences():
+async def test_user_preferences(client):
     """Test 3: Get user preferences"""
-    print_section("TEST 3: User Preferences")
     try:
-        response = requests.get(
-            f"{API_URL}/user/preferences",
-            headers=HEADERS,
-            params={"user_id": USER_ID},
-            timeout=5
+        response = await client.get(
+            "/user/preferences",
+            params={"user_id": USER_ID}
         )
+        # Printed after the response so concurrent tests don't interleave
+        print_section("TEST 3: User Preferences")
         
         if response.status_code == 200:
             prefs = response.json()
@@ -149,16 +140,15 @@ def test_user_preferences():
         print_error(f"Preferences request failed: {e}")
         return False
 
-def test_goals():
+async def test_goals(client):
     """Test 4: Get user goals"""
-    print_section("TEST 4: User Goals")
     try:
-        response = requests.get(
-            f"{API_URL}/user/goals",
-            headers=HEADERS,
-            params={"user_id": USER_ID},
-            timeout=5
+        response = await client.get(
+            "/user/goals",
+            params={"user_id": USER_ID}
         )
+        # Printed after the response so concurrent tests don't interleave
+        print_section("TEST 4: User Goals")
         
         if response.status_code == 200:
             data = response.json()
@@ -175,16 +165,15 @@ def test_goals():
         print_error(f"Goals request failed: {e}")
         return False
 
-def test_personality():
+async def test_personality(client):
     """Test 5: Get personality profile"""
-    print_section("TEST 5: Personality Profile")
     try:
-        response = requests.get(
-            f"{API_URL}/user/personality",
-            headers=HEADERS,
-            params={"user_id": USER_ID},
-            timeout=5
+        response = await client.get(
+            "/user/personality",
+            params={"user_id": USER_ID}
         )
+        # Printed after the response so concurrent tests don't interleave
+        print_section("TEST 5: Personality Profile")
         
         if response.status_code == 200:
             data = response.json()
@@ -203,7 +192,7 @@ def test_personality():
         print_error(f"Personality request failed: {e}")
         return False
 
-def main():
+async def run_tests():
     print(f"\n{Colors.BOLD}{'='*70}{Colors.RESET}")
     print(f"{Colors.BOLD}Memory Features Comprehensive Test{Colors.RESET}")
     print(f"{Colors.BOLD}User: {USER_ID}{Colors.RESET}")
@@ -211,29 +200,39 @@ def main():
     
     results = {}
     
-    # Test 1: Health
-    results['health'] = test_health()
-    
-    if not results['health']:
-        print_error("\nServer not available. Exiting.")
-        return
-    
-    # Test 2: Chat with memory that should match existing memories
-    result = test_chat_with_memory_extraction("Hi! What do you know about me?")
-    results['chat_memory_retrieval'] = result.get('success', False)
-    
-    # Test 3: Chat with new information
-    result = test_chat_with_memory_extraction("By the way, I also enjoy reading science fiction books!")
-    results['chat_new_memory'] = result.get('success', False)
-    
-    # Test 4: Preferences
-    results['preferences'] = test_user_preferences()
-    
-    # Test 5: Goals
-    results['goals'] = test_goals()
-    
-    # Test 6: Personality
-    results['personality'] = test_personality()
+    # One pooled keep-alive client for every test; one timeout policy (fail
+    # fast if the server is down, allow slow streamed chat replies)
+    async with httpx.AsyncClient(
+        base_url=API_URL,
+        headers=HEADERS,
+        timeout=httpx.Timeout(30.0, connect=5.0)
+    ) as client:
+        # Test 1: Health
+        results['health'] = await test_health(client)
+        
+        if not results['health']:
+            print_error("\nServer not available. Exiting.")
+            return
+        
+        # Test 2: Chat with memory that should match existing memories
+        result = await test_chat_with_memory_extraction(client, "Hi! What do you know about me?")
+        results['chat_memory_retrieval'] = result.get('success', False)
+        
+        # Test 3: Chat with new information
+        result = await test_chat_with_memory_extraction(client, "By the way, I also enjoy reading science fiction books!")
+        results['chat_new_memory'] = result.get('success', False)
+        
+        # Tests 4-6: the reads are independent once the chats are written,
+        # so they run concurrently (one round-trip of wall time, not three)
+        (
+            results['preferences'],
+            results['goals'],
+            results['personality'],
+        ) = await asyncio.gather(
+            test_user_preferences(client),
+            test_goals(client),
+            test_personality(client),
+        )
     
     # Summary
     print_section("TEST SUMMARY")
@@ -251,6 +250,9 @@ def main():
     else:
         print(f"{Colors.YELLOW}{Colors.BOLD}⚠ Some features need attention{Colors.RESET}\n")
 
+def main():
+    asyncio.run(run_tests())
+
 if __name__ == "__main__":
     main()
 
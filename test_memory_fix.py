@@ -4,10 +4,55 @@
 import asyncio
 import httpx
 import time
+import json
 
 BASE_URL = "http://localhost:8000"
 
 
+async def iter_sse_payloads(sse_lines):
+    """Yield the JSON payload of each `data: ` line as it arrives."""
+    async for line in sse_lines:
+        # Comments, keep-alives and non-JSON markers ([DONE]) are skipped
+        # by the prefix check instead of failing inside json.loads
+        if line.startswith('data: {'):
+            yield line[6:]
+
+
+async def extract_response(sse_lines):
+    """Extract the chunk text from a streamed SSE response."""
+    parts = []
+    async for payload in iter_sse_payloads(sse_lines):
+        data = json.loads(payload)
+        if data.get('type') == 'chunk':
+            parts.append(data.get('chunk', ''))
+        # Stop at the final event instead of waiting for the body to close
+        if data.get('type') == 'done':
+            break
+    return "".join(parts)
+
+
+async def chat(client, personality_name, message):
+    """Send a chat message; return the status code and the response text."""
+    # Parse the stream line by line instead of buffering the whole body
+    async with client.stream(
+        "POST",
+        "/chat",
+        json={"message": message, "personality_name": personality_name}
+    ) as response:
+        return response.status_code, await extract_response(response.aiter_lines())
+
+
+async def wait_for_memories(client, min_count, timeout=10.0):
+    """Poll memory status until min_count memories exist (or timeout)."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = await client.get("/memory/status", params={"min_count": min_count})
+        if status.status_code == 200 and status.json()["ready"]:
+            return True
+        await asyncio.sleep(0.2)
+    return False
+
+
 async def test_memory_with_personality():
     """Test memory storage and retrieval with personality."""
     print("🧪 Testing Memory Storage with Personality\n")
@@ -15,47 +60,37 @@ async def test_memory_with_personality():
     
     user_id = f"memory_test_{int(time.time())}"
     
-    async with httpx.AsyncClient(timeout=30) as client:
+    # One client for every call: pooled keep-alive connections, and the
+    # user header is set once instead of per request
+    async with httpx.AsyncClient(
+        base_url=BASE_URL,
+        headers={"X-User-Id": user_id},
+        timeout=httpx.Timeout(30.0, connect=5.0)
+    ) as client:
         # Step 1: Tell Elara something memorable
         print("\n[Step 1] Telling Elara: 'My favorite color is purple'...")
-        response1 = await client.post(
-            f"{BASE_URL}/chat",
-            headers={"X-User-Id": user_id},
-            json={
-                "message": "Hi! My favorite color is purple and I love painting.",
-                "personality_name": "elara"  # ← THIS IS CRITICAL!
-            }
+        status1, _ = await chat(
+            client,
+            "elara",  # ← THIS IS CRITICAL!
+            "Hi! My favorite color is purple and I love painting."
         )
-        print(f"✓ Elara responded (Status: {response1.status_code})")
+        print(f"✓ Elara responded (Status: {status1})")
         
-        # Wait for memory extraction
-        print("   Waiting 10s for memory extraction...")
-        await asyncio.sleep(10)
+        # Wait for memory extraction (polled, 10s at most)
+        print("   Waiting for memory extraction...")
+        if not await wait_for_memories(client, min_count=1):
+            print("   ⚠️  No memory stored after 10s, continuing")
         
-        # Step 2: Ask Elara if she remembers
+        # Steps 2 and 3 ask different personalities and don't depend on each
+        # other, so both requests run at once
         print("\n[Step 2] Asking Elara: 'What's my favorite color?'...")
-        response2 = await client.post(
-            f"{BASE_URL}/chat",
-            headers={"X-User-Id": user_id},
-            json={
-                "message": "What's my favorite color?",
-                "personality_name": "elara"  # ← Must use same personality!
-            }
+        print("[Step 3] Asking Seraphina (different personality): 'What's my favorite color?'...")
+        (_, response_text), (_, response_text3) = await asyncio.gather(
+            chat(client, "elara", "What's my favorite color?"),  # ← Must use same personality!
+            chat(client, "seraphina", "What's my favorite color?")  # ← Different personality!
         )
         
-        # Extract response text
-        response_text = ""
-        for line in response2.text.split('\n'):
-            if line.startswith('data: '):
-                try:
-                    import json
-                    data = json.loads(line[6:])
-                    if data.get('type') == 'chunk':
-                        response_text += data.get('chunk', '')
-                except:
-                    pass
-        
-        print(f"✓ Elara responded: \"{response_text[:150]}...\"")
+        print(f"\n✓ Elara responded: \"{response_text[:150]}...\"")
         
         # Check if she remembers
         if 'purple' in response_text.lower():
@@ -64,29 +99,8 @@ async def test_memory_with_personality():
             print("\n❌ FAIL: Elara didn't remember the favorite color.")
             print(f"   Response didn't mention 'purple'")
         
-        # Step 3: Verify Seraphina DOESN'T know (different personality)
-        print("\n[Step 3] Asking Seraphina (different personality): 'What's my favorite color?'...")
-        response3 = await client.post(
-            f"{BASE_URL}/chat",
-            headers={"X-User-Id": user_id},
-            json={
-                "message": "What's my favorite color?",
-                "personality_name": "seraphina"  # ← Different personality!
-            }
-        )
-        
-        response_text3 = ""
-        for line in response3.text.split('\n'):
-            if line.startswith('data: '):
-                try:
-                    import json
-                    data = json.loads(line[6:])
-                    if data.get('type') == 'chunk':
-                        response_text3 += data.get('chunk', '')
-                except:
-                    pass
-        
-        print(f"✓ Seraphina responded: \"{response_text3[:150]}...\"")
+        # Verify Seraphina DOESN'T know (different personality)
+        print(f"\n✓ Seraphina responded: \"{response_text3[:150]}...\"")
         
         if 'purple' not in response_text3.lower() and ("don't" in response_text3.lower() or "not sure" in response_text3.lower()):
             print("\n✅ SUCCESS! Seraphina correctly doesn't know (memory isolation working!)")
@@ -10,6 +10,8 @@ This script tests:
 """
 
 import asyncio
+import contextvars
+import os
 import sys
 from datetime import datetime
 from uuid import uuid4, UUID
@@ -37,20 +39,53 @@ class Colors:
     BOLD = '\033[1m'
 
 
+# TEST_QUIET=1 keeps only errors and the summary
+QUIET = os.environ.get("TEST_QUIET") == "1"
+
+# Test output is buffered and written in one go per test. Tests run
+# concurrently get a buffer of their own (see run_buffered), which the
+# caller adds to the main one in order.
+_MAIN_OUTPUT = []
+_OUTPUT = contextvars.ContextVar("test_output", default=_MAIN_OUTPUT)
+
+
+def flush_output():
+    """Write buffered output with a single stdout write."""
+    output = _OUTPUT.get()
+    if output and output is _MAIN_OUTPUT:
+        sys.stdout.write("\n".join(output) + "\n")
+        output.clear()
+
+
+async def run_buffered(coro):
+    """Run a test (in its own task) and return (result, its output lines)."""
+    output = []
+    _OUTPUT.set(output)
+    return await coro, output
+
+
+def log(msg):
+    if not QUIET:
+        _OUTPUT.get().append(msg)
+
+
 def print_success(msg):
-    print(f"{Colors.GREEN}✓ {msg}{Colors.RESET}")
+    log(f"{Colors.GREEN}✓ {msg}{Colors.RESET}")
 
 
 def print_error(msg):
-    print(f"{Colors.RED}✗ {msg}{Colors.RESET}")
+    # Always shown, and flushed at once so it lands before any traceback
+    _OUTPUT.get().append(f"{Colors.RED}✗ {msg}{Colors.RESET}")
+    flush_output()
 
 
 def print_info(msg):
-    print(f"{Colors.BLUE}ℹ {msg}{Colors.RESET}")
+    log(f"{Colors.BLUE}ℹ {msg}{Colors.RESET}")
 
 
 def print_test(msg):
-    print(f"\n{Colors.BOLD}{Colors.CYAN}Testing: {msg}{Colors.RESET}")
+    flush_output()
+    log(f"\n{Colors.BOLD}{Colors.CYAN}Testing: {msg}{Colors.RESET}")
 
 
 async def test_database_connection(engine):
@@ -94,14 +129,22 @@ async def test_tables_exist(engine):
     try:
         from sqlalchemy import text
         async with engine.connect() as conn:
-            for table in required_tables:
-                # Simple approach - just try to count from the table
-                try:
-                    await conn.execute(text(f"SELECT COUNT(*) FROM {table}"))
-                    print_success(f"Table '{table}' exists")
-                except Exception as e:
-                    print_error(f"Table '{table}' does not exist: {e}")
-                    return False
+            # One catalog lookup for all tables (no table scans)
+            result = await conn.execute(
+                text(
+                    "SELECT tablename FROM pg_tables "
+                    "WHERE schemaname = 'public' AND tablename = ANY(:names)"
+                ),
+                {"names": required_tables}
+            )
+            existing = set(result.scalars().all())
+        
+        for table in required_tables:
+            if table in existing:
+                print_success(f"Table '{table}' exists")
+            else:
+                print_error(f"Table '{table}' does not exist")
+                return False
         return True
     except Exception as e:
         print_error(f"Failed to verify tables: {e}")
@@ -126,9 +169,10 @@ async def test_create_test_user(session: AsyncSession):
                 email="test@memory.test",
                 display_name="Memory Test User"
             )
+            # id is generated client-side (uuid4) and the session does not
+            # expire on commit, so no refresh round trip is needed
             session.add(user)
             await session.commit()
-            await session.refresh(user)
             print_success(f"Created test user: {user.id}")
         
         return user
@@ -148,7 +192,6 @@ async def test_create_conversation(session: AsyncSession, user_id: UUID):
         )
         session.add(conversation)
         await session.commit()
-        await session.refresh(conversation)
         print_success(f"Created conversation: {conversation.id}")
         return conversation
     except Exception as e:
@@ -157,48 +200,45 @@ async def test_create_conversation(session: AsyncSession, user_id: UUID):
         return None
 
 
-async def test_store_memories(session: AsyncSession, user_id: UUID, conversation_id: UUID):
+async def test_store_memories(memory_service: EnhancedMemoryService, user_id: UUID, conversation_id: UUID):
     """Test 6: Store memories in database."""
     print_test("Memory Storage")
     
     try:
-        embedding_gen = EmbeddingGenerator()
-        memory_service = EnhancedMemoryService(session, embedding_gen)
-        
         test_memories = [
             {
                 "content": "I love playing tennis on weekends",
-                "type": "preference",
-                "context": {"emotion": "happy", "intensity": "medium"}
+                "memory_type": "preference",
+                "conversation_context": {"emotion": "happy", "intensity": "medium"}
             },
             {
                 "content": "My birthday is on March 15th",
-                "type": "fact",
-                "context": None
+                "memory_type": "fact",
+                "conversation_context": None
             },
             {
                 "content": "I'm learning Python programming",
-                "type": "event",
-                "context": {"emotion": "excited", "intensity": "high"}
+                "memory_type": "event",
+                "conversation_context": {"emotion": "excited", "intensity": "high"}
             },
             {
                 "content": "I prefer coffee over tea in the morning",
-                "type": "preference",
-                "context": None
+                "memory_type": "preference",
+                "conversation_context": None
             },
         ]
         
+        # One batched embedding call and one commit for all four
+        memories = await memory_service.store_memories(
+            user_id=user_id,
+            conversation_id=conversation_id,
+            memories=test_memories
+        )
+        
         stored_ids = []
-        for mem_data in test_memories:
-            memory = await memory_service.store_memory(
-                user_id=user_id,
-                conversation_id=conversation_id,
-                content=mem_data["content"],
-                memory_type=mem_data["type"],
-                conversation_context=mem_data["context"]
-            )
+        for memory in memories:
             stored_ids.append(memory.id)
-            print_success(f"  Stored: '{mem_data['content'][:50]}...' (importance: {memory.importance:.2f})")
+            print_success(f"  Stored: '{memory.content[:50]}...' (importance: {memory.importance:.2f})")
         
         print_success(f"Successfully stored {len(stored_ids)} memories")
         return stored_ids
@@ -209,14 +249,11 @@ async def test_store_memories(session: AsyncSession, user_id: UUID, conversation
         return []
 
 
-async def test_retrieve_memories(session: AsyncSession, user_id: UUID):
+async def test_retrieve_memories(memory_service: EnhancedMemoryService, user_id: UUID):
     """Test 7: Retrieve memories from database."""
     print_test("Memory Retrieval")
     
     try:
-        embedding_gen = EmbeddingGenerator()
-        memory_service = EnhancedMemoryService(session, embedding_gen)
-        
         # Test query
         query = "What do I like to do for fun?"
         memories = await memory_service.retrieve_memories(
@@ -229,7 +266,7 @@ async def test_retrieve_memories(session: AsyncSession, user_id: UUID):
         print_success(f"Retrieved {len(memories)} relevant memories:")
         
         for i, mem in enumerate(memories, 1):
-            print(f"  {i}. {mem.content[:60]}... (importance: {mem.importance:.2f})")
+            log(f"  {i}. {mem.content[:60]}... (importance: {mem.importance:.2f})")
         
         return len(memories) > 0
     except Exception as e:
@@ -239,7 +276,7 @@ async def test_retrieve_memories(session: AsyncSession, user_id: UUID):
         return False
 
 
-async def test_memory_persistence(session: AsyncSession, user_id: UUID):
+async def test_memory_persistence(session: AsyncSession, user_id: UUID, session_factory: async_sessionmaker):
     """Test 8: Verify memories persist across sessions."""
     print_test("Memory Persistence")
     
@@ -247,23 +284,27 @@ async def test_memory_persistence(session: AsyncSession, user_id: UUID):
         # Close and reopen session to simulate new connection
         await session.close()
         
-        # Create new session
-        from app.core.database import get_db
-        new_session = await anext(get_db())
-        
-        # Query directly from database
-        result = await new_session.execute(
-            select(MemoryModel).where(MemoryModel.user_id == user_id)
-        )
-        memories = result.scalars().all()
-        
-        print_success(f"Found {len(memories)} persisted memories in fresh session")
-        
-        for mem in memories[:3]:  # Show first 3
-            print(f"  - {mem.content[:60]}...")
+        # Fresh session from the same factory; the context manager closes it
+        # and returns its connection to the pool
+        async with session_factory() as new_session:
+            # Query directly from database: a count plus the first three
+            # contents, without loading the embedding columns
+            count = await new_session.scalar(
+                select(func.count()).select_from(MemoryModel)
+                .where(MemoryModel.user_id == user_id)
+            )
+            preview = await new_session.scalars(
+                select(MemoryModel.content)
+                .where(MemoryModel.user_id == user_id)
+                .limit(3)
+            )
+            
+            print_success(f"Found {count} persisted memories in fresh session")
+            
+            for content in preview:  # Show first 3
+                log(f"  - {content[:60]}...")
         
-        await new_session.close()
-        return len(memories) > 0
+        return count > 0
     except Exception as e:
         print_error(f"Failed to verify persistence: {e}")
         import traceback
@@ -271,25 +312,22 @@ async def test_memory_persistence(session: AsyncSession, user_id: UUID):
         return False
 
 
-async def test_memory_stats(session: AsyncSession, user_id: UUID):
+async def test_memory_stats(memory_service: EnhancedMemoryService, user_id: UUID):
     """Test 9: Get memory statistics."""
     print_test("Memory Statistics")
     
     try:
-        embedding_gen = EmbeddingGenerator()
-        memory_service = EnhancedMemoryService(session, embedding_gen)
-        
         stats = await memory_service.get_memory_stats(user_id)
         
         print_success(f"Total memories: {stats['total_memories']}")
         print_info("Breakdown by category:")
         for cat in stats['by_category']:
-            print(f"  - {cat['category']}: {cat['count']} memories (avg importance: {cat['avg_importance']})")
+            log(f"  - {cat['category']}: {cat['count']} memories (avg importance: {cat['avg_importance']})")
         
         if stats['most_accessed']:
             print_info("Most accessed memories:")
             for mem in stats['most_accessed'][:3]:
-                print(f"  - {mem['content']} (accessed {mem['access_count']} times)")
+                log(f"  - {mem['content']} (accessed {mem['access_count']} times)")
         
         return True
     except Exception as e:
@@ -297,14 +335,11 @@ async def test_memory_stats(session: AsyncSession, user_id: UUID):
         return False
 
 
-async def test_memory_by_category(session: AsyncSession, user_id: UUID):
+async def test_memory_by_category(memory_service: EnhancedMemoryService, user_id: UUID):
     """Test 10: Filter memories by category."""
     print_test("Category Filtering")
     
     try:
-        embedding_gen = EmbeddingGenerator()
-        memory_service = EnhancedMemoryService(session, embedding_gen)
-        
         # Try different categories
         categories = ['personal_fact', 'preference', 'goal']
         
@@ -368,6 +403,9 @@ async def main():
         engine, class_=AsyncSession, expire_on_commit=False
     )
     
+    # One embedding generator (model load) for the whole run
+    embedding_gen = EmbeddingGenerator()
+    
     async with AsyncSessionLocal() as session:
         # Test 4-5: Setup
         user = await test_create_test_user(session)
@@ -380,20 +418,32 @@ async def main():
             print_error("\nCannot proceed without conversation!")
             return
         
-        # Test 6-10: Core memory operations
-        results['storage'] = len(await test_store_memories(session, user.id, conversation.id)) > 0
-        results['retrieval'] = await test_retrieve_memories(session, user.id)
-        results['persistence'] = await test_memory_persistence(session, user.id)
+        # Test 6-10: Core memory operations (one memory service per session)
+        memory_service = EnhancedMemoryService(session, embedding_gen)
+        results['storage'] = len(await test_store_memories(memory_service, user.id, conversation.id)) > 0
+        results['retrieval'] = await test_retrieve_memories(memory_service, user.id)
+        results['persistence'] = await test_memory_persistence(session, user.id, AsyncSessionLocal)
+        
+        # Stats and categories only read, so each gets its own session and
+        # they run concurrently (retrieval above updates access counts,
+        # which the stats report, so it stays serial)
+        async def with_service(test):
+            async with AsyncSessionLocal() as new_session:
+                memory_service = EnhancedMemoryService(new_session, embedding_gen)
+                return await run_buffered(test(memory_service, user.id))
         
-        # Reopen session after persistence test closed it
-        async with AsyncSessionLocal() as new_session:
-            results['stats'] = await test_memory_stats(new_session, user.id)
-            results['categories'] = await test_memory_by_category(new_session, user.id)
+        (results['stats'], stats_output), (results['categories'], categories_output) = await asyncio.gather(
+            with_service(test_memory_stats),
+            with_service(test_memory_by_category)
+        )
+        flush_output()
+        _MAIN_OUTPUT.extend(stats_output + categories_output)
         
         # Optional cleanup
         # await cleanup_test_data(session)
     
     await engine.dispose()
+    flush_output()
     
     # Summary
     print(f"\n{Colors.BOLD}{'='*70}{Colors.RESET}")
@@ -15,6 +15,22 @@ async def test_root_endpoint(client):
     assert "version" in data
 
 
+def test_sse_frame_matches_json_dumps():
+    """Token frames are built without json.dumps but must match it exactly."""
+    import json
+    from app.api.routes import _sse_frame
+    
+    events = [
+        {"type": "chunk", "chunk": ' say "hi"\n\\ caf\u00e9 \U0001f600', "conversation_id": str(uuid4())},
+        {"type": "chunk", "chunk": "", "conversation_id": str(uuid4())},
+        {"type": "thinking", "step": "memories_retrieved", "data": {"count": 2}},
+        {"type": "done", "conversation_id": str(uuid4())},
+    ]
+    
+    for event in events:
+        assert _sse_frame(event) == f"data: {json.dumps(event)}\n\n"
+
+
 @pytest.mark.asyncio
 async def test_health_endpoint(client):
     """Test health check endpoint."""
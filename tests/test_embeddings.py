@@ -1,5 +1,6 @@
 """Tests for embedding generation."""
 
+import numpy as np
 import pytest
 from app.utils.embeddings import EmbeddingGenerator, get_embedding_generator
 
@@ -18,9 +19,9 @@ def test_generate_embedding():
     
     embedding = generator.generate_embedding(text)
     
-    assert isinstance(embedding, list)
-    assert len(embedding) == 384  # all-MiniLM-L6-v2 dimension
-    assert all(isinstance(x, float) for x in embedding)
+    assert isinstance(embedding, np.ndarray)
+    assert embedding.shape == (384,)  # all-MiniLM-L6-v2 dimension
+    assert embedding.dtype == np.float32
 
 
 def test_batch_generate_embeddings():
@@ -51,3 +52,30 @@ def test_embedding_dimension():
     generator = get_embedding_generator()
     assert generator.dimension == 384
 
+
+class _RecordingGenerator:
+    """Stand-in generator that records each batched encode call."""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def batch_generate_embeddings(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+
+async def test_embedding_batcher_coalesces_concurrent_requests():
+    """Test that concurrent single-text requests share one batched encode."""
+    import asyncio
+    from app.utils.embeddings import EmbeddingBatcher
+    
+    generator = _RecordingGenerator()
+    batcher = EmbeddingBatcher(generator, window_ms=5)
+    
+    try:
+        results = await asyncio.gather(*(batcher.submit("x" * n) for n in range(1, 6)))
+    finally:
+        await batcher.close()
+    
+    assert results == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+    assert generator.calls == [["x", "xx", "xxx", "xxxx", "xxxxx"]]
@@ -102,3 +102,31 @@ def test_format_memory_for_display():
     assert "0.75" in formatted
     assert "0.92" in formatted
 
+
+def test_goal_instructions_progress_and_categories():
+    """Test goal guidance for progress sentiment and active goal categories."""
+    builder = PromptBuilder()
+    
+    instructions = builder._build_goal_instructions({
+        'progress_updates': [
+            {'goal': 'Learn Spanish', 'sentiment': 'negative'},
+            {'goal': 'Run a 5k', 'sentiment': 'neutral'},
+        ],
+        'active_goals': [
+            {'title': 'Get promoted', 'category': 'career', 'progress_percentage': 10},
+            {'title': 'Learn Spanish', 'category': 'learning', 'progress_percentage': 40},
+        ],
+    })
+    
+    assert "⚠️ Struggling with: Learn Spanish" in instructions
+    assert "- Help them problem-solve or adjust their approach" in instructions
+    assert not any("Run a 5k" in line and "progress on" in line for line in instructions)
+    
+    learning = instructions.index(
+        "- For learning goals: Share tips, encourage practice, track their progress"
+    )
+    career = instructions.index(
+        "- For career goals: Offer strategic advice, build confidence, celebrate milestones"
+    )
+    assert learning < career
+    assert not any(line.startswith("- For health goals") for line in instructions)
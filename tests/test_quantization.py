@@ -0,0 +1,46 @@
+"""Tests for int8 embedding quantization."""
+
+import numpy as np
+from app.utils.quantization import quantize_int8, dequantize_int8
+
+
+def test_quantize_round_trip():
+    """Dequantized vectors stay close to the originals and keep their ranking."""
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(50, 384)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    
+    quantized = [quantize_int8(e) for e in embeddings]
+    codes, scales, offsets = zip(*quantized)
+    
+    assert all(len(c) == 384 for c in codes)
+    
+    restored = dequantize_int8(codes, scales, offsets, dimension=384)
+    
+    assert restored.dtype == np.float32
+    assert np.abs(restored - embeddings).max() < 0.01
+    
+    query = embeddings[0]
+    exact = embeddings @ query
+    approx = restored @ query / np.linalg.norm(restored, axis=1)
+    assert np.argmax(approx) == np.argmax(exact) == 0
+    assert np.abs(approx - exact).max() < 0.01
+
+
+def test_dequantize_missing_rows_are_zero():
+    """Rows without codes dequantize to zero vectors."""
+    codes, scale, offset = quantize_int8(np.linspace(-1, 1, 8))
+    
+    restored = dequantize_int8([None, codes], [None, scale], [None, offset], dimension=8)
+    
+    assert not restored[0].any()
+    np.testing.assert_allclose(restored[1], np.linspace(-1, 1, 8), atol=0.01)
+
+
+def test_quantize_constant_vector():
+    """A constant vector (zero range) does not divide by zero."""
+    codes, scale, offset = quantize_int8(np.full(4, 0.5))
+    
+    restored = dequantize_int8([codes], [scale], [offset], dimension=4)
+    
+    np.testing.assert_allclose(restored[0], np.full(4, 0.5))
@@ -113,3 +113,26 @@ async def test_delete_low_importance_memories(db_session):
     
     assert len(results) == 2
 
+
+@pytest.mark.parametrize("query_count", [1, 3])
+@pytest.mark.parametrize("user_external_id", [None, "user_123"])
+def test_similar_multi_query_compiles(query_count, user_external_id):
+    """Test the multi-query statement compiles for PostgreSQL (LATERAL correlation)."""
+    from sqlalchemy.dialects import postgresql
+    
+    stmt = VectorStoreRepository._similar_multi_query(
+        query_embeddings=[[0.1] * 384] * query_count,
+        top_k=5,
+        min_similarity=0.5,
+        user_id=uuid4(),
+        personality_id=uuid4(),
+        user_external_id=user_external_id
+    )
+    
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    
+    assert "JOIN LATERAL" in sql
+    # The lateral keeps its own scan of memories, ordered on the indexed column
+    lateral = sql.split("JOIN LATERAL", 1)[1]
+    assert "FROM memories" in lateral
+    assert "ORDER BY memories.embedding <#> q.vec" in lateral